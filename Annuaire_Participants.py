@@ -0,0 +1,185 @@
+# --- Annuaire des participants: email unique, recherche par préfixe, import en masse ---
+import unicodedata
+from bisect import bisect_left, insort
+
+
+def normaliser_email(email):
+    return email.strip().casefold()
+
+
+def normaliser_nom(texte):
+    """Minuscules sans accents, pour que "élo" retrouve "Éloïse"."""
+    texte = texte.strip().casefold()
+    if texte.isascii():
+        return texte
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def _cles_nom(nom):
+    # Chaque mot du nom est indexé: la saisie du nom de famille retrouve aussi le participant.
+    complet = normaliser_nom(nom)
+    return set(complet.split()) | {complet}
+
+
+class ErreurEmailDuplique(ValueError):
+    """Un participant utilise déjà cet email (après normalisation)."""
+    def __init__(self, email, participant_existant):
+        super().__init__(f"L'email {email} est déjà utilisé par {participant_existant.nom} ({participant_existant.id}).")
+        self.participant_existant = participant_existant
+
+
+class AnnuaireParticipants:
+    """Participants indexés par ID, par email normalisé (unique) et par préfixe de nom.
+
+    S'utilise comme le dictionnaire {id: Participant} qu'il remplace (get, values, in, len...).
+    L'index des noms est une liste triée de (clé, id): une recherche par préfixe est une
+    dichotomie suivie d'un parcours des seules entrées correspondantes.
+    """
+    def __init__(self):
+        self._par_id = {}
+        self._par_email = {}
+        self._index_noms = []
+
+    # --- Interface dictionnaire ---
+    def __len__(self):
+        return len(self._par_id)
+
+    def __iter__(self):
+        return iter(self._par_id)
+
+    def __contains__(self, participant_id):
+        return participant_id in self._par_id
+
+    def __getitem__(self, participant_id):
+        return self._par_id[participant_id]
+
+    def get(self, participant_id, defaut=None):
+        return self._par_id.get(participant_id, defaut)
+
+    def values(self):
+        return self._par_id.values()
+
+    def items(self):
+        return self._par_id.items()
+
+    # --- Recherche ---
+    def par_email(self, email):
+        return self._par_email.get(normaliser_email(email))
+
+    def rechercher(self, prefixe, limite=20):
+        """Participants dont un mot du nom (ou le nom complet) commence par `prefixe`, triés par nom
+        (sans accents ni casse). Au-delà de `limite`, ceux dont le mot trouvé vient en premier sont retenus."""
+        prefixe = normaliser_nom(prefixe)
+        trouves = {}
+        position = bisect_left(self._index_noms, (prefixe, ""))
+        while position < len(self._index_noms) and len(trouves) < limite:
+            cle, participant_id = self._index_noms[position]
+            if not cle.startswith(prefixe):
+                break
+            trouves.setdefault(participant_id, self._par_id[participant_id])
+            position += 1
+        # L'index est dans l'ordre des mots trouvés (ex: "Martin Dupont" avant "Alice Durand" pour "du").
+        return sorted(trouves.values(), key=lambda participant: (normaliser_nom(participant.nom), participant.id))
+
+    # --- Mise à jour ---
+    def verifier(self, participant):
+        """Lève ErreurEmailDuplique si l'email est déjà pris par un autre participant (sans rien modifier)."""
+        existant = self._par_email.get(normaliser_email(participant.email))
+        if existant is not None and existant is not participant:
+            raise ErreurEmailDuplique(participant.email, existant)
+
+    def ajouter(self, participant):
+        self.verifier(participant)
+        self._par_id[participant.id] = participant
+        self._par_email[normaliser_email(participant.email)] = participant
+        for cle in _cles_nom(participant.nom):
+            insort(self._index_noms, (cle, participant.id))
+        return participant
+
+    def charger(self, participants):
+        """Ajout en masse (ex: restauration): l'index des noms n'est trié qu'une fois. Les doublons
+        d'email antérieurs à l'annuaire restent accessibles par ID; l'email désigne le premier."""
+        for participant in participants:
+            self._par_id[participant.id] = participant
+            self._par_email.setdefault(normaliser_email(participant.email), participant)
+            self._index_noms.extend((cle, participant.id) for cle in _cles_nom(participant.nom))
+        self._index_noms.sort()
+
+    def renommer(self, participant, nom):
+        for cle in _cles_nom(participant.nom):
+            position = bisect_left(self._index_noms, (cle, participant.id))
+            if position < len(self._index_noms) and self._index_noms[position] == (cle, participant.id):
+                del self._index_noms[position]
+        participant.nom = nom
+        for cle in _cles_nom(nom):
+            insort(self._index_noms, (cle, participant.id))
+
+    def upsert_lot(self, lignes, creer):
+        """Crée ou met à jour des participants à partir de dicts {nom, email, est_etudiant}, dédoublonnés par
+        email normalisé. `creer(nom, email, est_etudiant)` construit un nouveau participant.
+        Retourne (crees, mis_a_jour)."""
+        dernieres = {}
+        for ligne in lignes:
+            if not ligne.get("email") or not ligne.get("nom"):
+                raise ValueError(f"Nom et email requis: {ligne!r}")
+            dernieres[normaliser_email(ligne["email"])] = ligne  # la dernière occurrence l'emporte
+
+        crees, mis_a_jour, nouvelles_cles = [], [], []
+        for email, ligne in dernieres.items():
+            est_etudiant = ligne.get("est_etudiant", True)
+            existant = self._par_email.get(email)
+            if existant is None:
+                participant = creer(ligne["nom"].strip(), ligne["email"].strip(), est_etudiant)
+                self._par_id[participant.id] = participant
+                self._par_email[email] = participant
+                nouvelles_cles.extend((cle, participant.id) for cle in _cles_nom(participant.nom))
+                crees.append(participant)
+            elif existant.nom != ligne["nom"].strip() or existant.est_etudiant != est_etudiant:
+                if existant.nom != ligne["nom"].strip():
+                    self.renommer(existant, ligne["nom"].strip())
+                existant.est_etudiant = est_etudiant
+                mis_a_jour.append(existant)
+        if nouvelles_cles:
+            # Fusion en un seul tri plutôt qu'une insertion triée par ligne.
+            self._index_noms.extend(nouvelles_cles)
+            self._index_noms.sort()
+        return crees, mis_a_jour
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    import random
+    import time
+    from types import SimpleNamespace
+
+    random.seed(1)
+    prenoms = ["Éloïse", "Amine", "Chloé", "Yanis", "Inès", "Lucas", "Sarah", "Mehdi", "Léa", "Hugo"]
+    noms = ["Martin", "Benali", "Dubois", "Trabelsi", "Lefèvre", "Haddad", "Moreau", "Garcia"]
+    compteur = iter(range(1, 10 ** 7))
+    creer = lambda nom, email, est_etudiant: SimpleNamespace(id=f"P{next(compteur):06d}", nom=nom, email=email,
+                                                             est_etudiant=est_etudiant)
+    lignes = [{"nom": f"{random.choice(prenoms)} {random.choice(noms)} {i}", "email": f"Etudiant{i}@Univ.fr",
+               "est_etudiant": True} for i in range(300000)]
+
+    annuaire = AnnuaireParticipants()
+    debut = time.perf_counter()
+    crees, _ = annuaire.upsert_lot(lignes, creer)
+    print(f"Import de {len(crees)} participants: {time.perf_counter() - debut:.2f}s")
+
+    debut = time.perf_counter()
+    crees, mis_a_jour = annuaire.upsert_lot(lignes[:50000] + [{"nom": "Nouvel Étudiant", "email": "nouveau@univ.fr"}], creer)
+    print(f"Ré-import de 50001 lignes: {len(crees)} créé(s), {len(mis_a_jour)} mis à jour en {time.perf_counter() - debut:.2f}s")
+
+    debut = time.perf_counter()
+    for i in range(10000):
+        annuaire.par_email(f"  etudiant{i}@UNIV.fr ")
+    print(f"Recherche par email: {(time.perf_counter() - debut) / 10000 * 1e6:.2f} µs")
+    debut = time.perf_counter()
+    for prefixe in ["elo", "Tra", "chloé mar", "leF"] * 2500:
+        annuaire.rechercher(prefixe)
+    print(f"Recherche par préfixe (20 résultats): {(time.perf_counter() - debut) / 10000 * 1e6:.1f} µs")
+    try:
+        annuaire.ajouter(creer("Doublon", "ETUDIANT42@univ.fr", True))
+    except ErreurEmailDuplique as e:
+        print(e)
@@ -0,0 +1,64 @@
+# --- Mesure de la création en lot (EvenementFactory.creer_evenements_batch) face à la création unitaire ---
+import sys
+import time
+from datetime import date, timedelta
+
+from appEven import ErreurCreationLot, EvenementFactory
+
+
+def lignes_exemple(nb):
+    """Lignes telles qu'issues d'un CSV: valeurs textuelles, un type sur trois."""
+    premier_jour = date(2025, 9, 1)
+    lignes = []
+    for i in range(nb):
+        ligne = {"nom": f"Événement {i}", "description": "Import", "date": (premier_jour + timedelta(days=i % 365)).isoformat()}
+        if i % 3 == 0:
+            ligne.update(type="Conference", nombre_places=str(50 + i % 200), speaker_principal=f"Orateur {i % 97}")
+        elif i % 3 == 1:
+            ligne.update(type="Hackathon", sponsor=f"Sponsor {i % 13}", duree_heures="24")
+        else:
+            ligne.update(type="Seminaire", domaine="Informatique")
+        lignes.append(ligne)
+    return lignes
+
+
+def creer_un_par_un(factory, lignes):
+    evenements = []
+    for ligne in lignes:
+        valeurs = dict(ligne)
+        evenements.append(factory.creer_evenement(valeurs.pop("type"), valeurs.pop("nom"), valeurs.pop("description"),
+                                                  date.fromisoformat(valeurs.pop("date")), **valeurs))
+    return evenements
+
+
+if __name__ == "__main__":
+    nb = int(sys.argv[1]) if sys.argv[1:] else 100000
+    factory = EvenementFactory()
+    lignes = lignes_exemple(nb)
+
+    debut = time.perf_counter()
+    creer_un_par_un(factory, lignes)
+    unitaire = time.perf_counter() - debut
+    debut = time.perf_counter()
+    evenements = factory.creer_evenements_batch(lignes)
+    lot = time.perf_counter() - debut
+    print(f"{nb} lignes: création unitaire {unitaire:.2f}s, creer_evenements_batch {lot:.2f}s "
+          f"({nb / lot:,.0f} événements/s)")
+    assert len(evenements) == nb and evenements[0].nombre_places == 50 and evenements[1].duree_heures == 24
+
+    # Un lot avec 1 % de lignes fautives est refusé en entier, sans consommer d'identifiant.
+    fautives = [dict(ligne) for ligne in lignes]
+    for i in range(0, nb, 100):
+        fautives[i]["type"] = "Atelier" if i % 200 else fautives[i]["type"]
+        fautives[i].pop("nom")
+    dernier_id = evenements[-1].id
+    debut = time.perf_counter()
+    try:
+        factory.creer_evenements_batch(fautives)
+        raise AssertionError("le lot fautif aurait dû être refusé")
+    except ErreurCreationLot as e:
+        refus = time.perf_counter() - debut
+        print(f"Lot fautif refusé en {refus:.2f}s: {len(e.erreurs)} ligne(s) signalée(s), ex. {e.erreurs[0]}")
+        assert len(e.erreurs) == len(range(0, nb, 100))
+    suivant = factory.creer_evenements_batch(lignes[:1])[0].id
+    print(f"Identifiants: dernier créé {dernier_id}, suivant {suivant} (aucun consommé par le lot refusé)")
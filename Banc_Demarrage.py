@@ -0,0 +1,89 @@
+# --- Mesure du démarrage de EventApp: délai avant premier affichage et durée du chargement complet ---
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from Journal import JournalEvenements
+
+# Budget du premier affichage (secondes): au-delà, le banc échoue (code de sortie 1).
+BUDGET_PREMIER_AFFICHAGE = 0.5
+# Budget de l'ouverture de chaque autre onglet (construit et rempli à sa première sélection), données chargées.
+BUDGET_ONGLET = 0.3
+
+
+def preparer_journal(dossier, nb_evenements, nb_participants, nb_inscriptions):
+    """Écrit un journal de taille réaliste, avec snapshot, comme après plusieurs mois d'utilisation."""
+    journal = JournalEvenements(dossier, snapshot_tous_les=0)
+    for i in range(1, nb_evenements + 1):
+        journal.ajouter("creer_evenement", {"id": f"EV{i:03d}", "type": "Seminaire", "nom": f"Séminaire {i}",
+                                            "description": "Introduction", "date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                                            "recurrence": None, "domaine": "Informatique"})
+    for i in range(1, nb_participants + 1):
+        journal.ajouter("creer_participant", {"id": f"P{i:03d}", "nom": f"Étudiant {i}", "email": f"e{i}@univ.fr",
+                                              "est_etudiant": i % 5 != 0})
+    for i in range(nb_inscriptions):
+        journal.ajouter("inscrire_participant", {"participant_id": f"P{1 + i % nb_participants:03d}",
+                                                 "evenement_id": f"EV{1 + i % nb_evenements:03d}",
+                                                 "date_occurrence": None, "date_inscription": "2025-09-01"})
+    journal.ecrire_snapshot()
+    journal.fermer()
+
+
+def mesurer_demarrage(dossier):
+    """Retourne (premier affichage, chargement complet, {onglet: première ouverture}) en secondes, mesurés avec
+    une vraie boucle Tk."""
+    from appEven import EventApp
+
+    debut = time.perf_counter()
+    app = EventApp(dossier_journal=os.path.join(dossier, "journal"),
+                   fichier_notifications=os.path.join(dossier, "notifications.log.gz"),
+                   fichier_regles=os.path.join(dossier, "regles.ini"),
+                   fichier_cache=os.path.join(dossier, "cache.sqlite"),
+                   fichier_catalogue=os.path.join(dossier, "catalogue.evcat"),
+                   fichier_presences=os.path.join(dossier, "presences.jsonl"),
+                   fichier_cle_badges=os.path.join(dossier, "cle_badges.bin"),
+                   fichier_rappels=os.path.join(dossier, "rappels.sqlite"), dossier_site=os.path.join(dossier, "site"),
+                   fichier_boites=os.path.join(dossier, "boites.sqlite"),
+                   port_pointage=None, port_flux=None)
+    app.update()  # la fenêtre et le premier onglet sont dessinés
+    premier_affichage = time.perf_counter() - debut
+    while not app.chargement_termine:
+        app.update()
+        time.sleep(0.001)
+    chargement = time.perf_counter() - debut
+    onglets = {}
+    for index, (cle, titre, _) in enumerate(app.ONGLETS[1:], 1):
+        debut = time.perf_counter()
+        app.notebook.select(index)
+        app._construire_onglet(cle)  # sans attendre <<NotebookTabChanged>>: la sélection seule ne garantit pas l'ordre
+        app.update()
+        onglets[titre] = time.perf_counter() - debut
+    app._fermer()
+    return premier_affichage, chargement, onglets
+
+
+if __name__ == "__main__":
+    nb_evenements, nb_participants, nb_inscriptions = (int(n) for n in (sys.argv[1:] or [20000, 50000, 200000]))
+    dossier = tempfile.mkdtemp(prefix="demarrage_")
+    try:
+        preparer_journal(os.path.join(dossier, "journal"), nb_evenements, nb_participants, nb_inscriptions)
+        debut = time.perf_counter()
+        JournalEvenements(os.path.join(dossier, "journal")).fermer()
+        print(f"Relecture seule du journal ({nb_evenements} événements, {nb_participants} participants, "
+              f"{nb_inscriptions} inscriptions): {time.perf_counter() - debut:.2f}s")
+
+        premier_affichage, chargement, onglets = mesurer_demarrage(dossier)
+        print(f"Premier affichage: {premier_affichage * 1000:.0f} ms (budget {BUDGET_PREMIER_AFFICHAGE * 1000:.0f} ms), "
+              f"chargement complet: {chargement:.2f}s")
+        for titre, duree in onglets.items():
+            print(f"Ouverture de l'onglet « {titre} »: {duree * 1000:.0f} ms (budget {BUDGET_ONGLET * 1000:.0f} ms)")
+        if premier_affichage > BUDGET_PREMIER_AFFICHAGE:
+            print("ÉCHEC: budget du premier affichage dépassé.")
+            sys.exit(1)
+        if max(onglets.values()) > BUDGET_ONGLET:
+            print("ÉCHEC: budget d'ouverture d'un onglet dépassé.")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)  # la génération complète du site peut encore écrire
@@ -0,0 +1,281 @@
+# --- Boîtes de réception par participant: journal compact en ajout seul, compteurs de non-lus, pagination ---
+import sqlite3
+import threading
+import time
+
+# Entrées par segment du journal d'un participant: une page ne décode que les segments qu'elle couvre.
+TAILLE_SEGMENT = 64
+
+
+def _varint(entier, sortie):
+    while entier >= 0x80:
+        sortie.append((entier & 0x7F) | 0x80)
+        entier >>= 7
+    sortie.append(entier)
+
+
+def _entiers(donnees):
+    entier, decalage = 0, 0
+    for octet in donnees:
+        entier |= (octet & 0x7F) << decalage
+        if octet & 0x80:
+            decalage += 7
+        else:
+            yield entier
+            entier, decalage = 0, 0
+
+
+class BoitesReception:
+    """Une boîte de réception par participant, stockée dans SQLite.
+
+    Le texte d'une notification est écrit une seule fois (table `messages`); la boîte d'un participant
+    est un journal en ajout seul, découpé en segments de TAILLE_SEGMENT entrées, où chaque entrée tient
+    en quelques octets: écart d'horodatage et écart d'identifiant de message avec l'entrée précédente,
+    en entiers de longueur variable. L'en-tête de chaque boîte (nombre d'entrées, nombre lues, dernière
+    entrée) est gardé en mémoire: compteurs de non-lus sans lecture disque.
+
+    Comme pour les présences (Controle_Presence.py), les écritures sont groupées par un thread dédié:
+    une diffusion à 100 000 inscrits est une seule transaction, et `deposer` ne paie jamais l'écriture.
+    Ce thread lit aussi les en-têtes à l'ouverture, pendant que l'application démarre.
+    Les entrées d'une boîte sont numérotées dans l'ordre d'arrivée (rang); `page` lit de la plus récente
+    à la plus ancienne, à partir d'un curseur.
+    """
+    def __init__(self, chemin, horloge=time.time, delai_ecriture=0.2):
+        self.chemin = chemin
+        self.delai_ecriture = delai_ecriture
+        self._horloge = horloge
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, evenement_id TEXT, "
+                                "type TEXT, texte TEXT)")
+        # Chaque segment porte aussi la dernière entrée de la boîte: un ajout ne met à jour qu'une ligne.
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS segments (participant_id TEXT, segment INTEGER, "
+                                "base_horodatage INTEGER, base_message INTEGER, nb INTEGER, horodatage INTEGER, "
+                                "message INTEGER, donnees BLOB, PRIMARY KEY (participant_id, segment)) WITHOUT ROWID")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS lectures (participant_id TEXT PRIMARY KEY, lus INTEGER) "
+                                "WITHOUT ROWID")
+        self._connexion.commit()
+        self._entetes = None  # participant_id -> [nb, lus, horodatage, message], lu par le thread d'écriture
+        self._prochain_message = None
+        self._entetes_lus = threading.Event()
+        self._verrou = threading.Lock()
+        self._ecrit = threading.Condition(self._verrou)
+        self._messages, self._segments, self._ajouts, self._lectures = [], [], [], []
+        self._lots_prepares = self._lots_ecrits = 0
+        self._reveil = threading.Event()
+        self._arret = False
+        self._ecrivain = threading.Thread(target=self._boucle_ecriture, name="ecriture-boites", daemon=True)
+        self._ecrivain.start()
+
+    def _lire_entetes(self, connexion):
+        entetes = {participant_id: [segment * TAILLE_SEGMENT + nb, 0, horodatage, message]
+                   for participant_id, segment, nb, horodatage, message in connexion.execute(
+                       "SELECT participant_id, MAX(segment), nb, horodatage, message FROM segments "
+                       "GROUP BY participant_id")}
+        for participant_id, lus in connexion.execute("SELECT participant_id, lus FROM lectures"):
+            if participant_id in entetes:
+                entetes[participant_id][1] = lus
+        dernier = connexion.execute("SELECT MAX(id) FROM messages").fetchone()[0]
+        self._entetes, self._prochain_message = entetes, (dernier or 0) + 1
+
+    def _charger_entetes(self):
+        # Lus en arrière-plan dès l'ouverture: n'attend que si la boîte sert avant la fin de la lecture.
+        self._entetes_lus.wait()
+        return self._entetes
+
+    # --- Écriture ---
+    def deposer(self, participant_ids, evenement_id, type_message, texte, horodatage=None):
+        """Ajoute une notification aux boîtes des participants (doublons ignorés). Retourne le nombre de boîtes."""
+        destinataires = dict.fromkeys(participant_ids)
+        if not destinataires:
+            return 0
+        entetes = self._charger_entetes()
+        instant = int(self._horloge() if horodatage is None else horodatage)
+        message_id = self._prochain_message
+        self._prochain_message += 1
+        segments, ajouts = [], []
+        encodages = {}  # (écart d'horodatage, écart de message) -> octets: les boîtes d'une diffusion se ressemblent
+        for participant_id in destinataires:
+            entete = entetes.get(participant_id)
+            if entete is None:
+                entete = entetes[participant_id] = [0, 0, 0, 0]
+            nb, _, precedent, message_precedent = entete
+            instant_entree = max(instant, precedent)  # horloge reculée: l'écart reste positif
+            ecarts = (instant_entree - precedent, message_id - message_precedent)
+            entree = encodages.get(ecarts)
+            if entree is None:
+                octets = bytearray()
+                _varint(ecarts[0], octets)
+                _varint(ecarts[1], octets)
+                entree = encodages[ecarts] = bytes(octets)
+            segment, position = divmod(nb, TAILLE_SEGMENT)
+            if position == 0:
+                segments.append((participant_id, segment, precedent, message_precedent, 1, instant_entree, message_id, entree))
+            else:
+                ajouts.append((entree, instant_entree, message_id, participant_id, segment))
+            entete[0], entete[2], entete[3] = nb + 1, instant_entree, message_id
+        with self._verrou:
+            self._messages.append((message_id, evenement_id, type_message, texte))
+            self._segments.extend(segments)
+            self._ajouts.extend(ajouts)
+            self._reveil.set()
+        return len(destinataires)
+
+    def marquer_lus(self, participant_ids, jusqua=None):
+        """Marque comme lues les entrées de rang < `jusqua` (toutes si None). Retourne le nombre marqué."""
+        entetes = self._charger_entetes()
+        marquees, lectures = 0, []
+        for participant_id in dict.fromkeys(participant_ids):
+            entete = entetes.get(participant_id)
+            if entete is None:
+                continue
+            limite = entete[0] if jusqua is None else min(entete[0], jusqua)
+            if limite > entete[1]:
+                marquees += limite - entete[1]
+                entete[1] = limite
+                lectures.append((participant_id, limite))
+        if lectures:
+            with self._verrou:
+                self._lectures.extend(lectures)
+                self._reveil.set()
+        return marquees
+
+    def _boucle_ecriture(self):
+        connexion = sqlite3.connect(self.chemin)
+        try:
+            try:
+                self._lire_entetes(connexion)
+            finally:
+                self._entetes_lus.set()
+            while True:
+                self._reveil.wait(self.delai_ecriture)
+                self._reveil.clear()
+                with self._verrou:
+                    messages, segments, ajouts, lectures = self._messages, self._segments, self._ajouts, self._lectures
+                    self._messages, self._segments, self._ajouts, self._lectures = [], [], [], []
+                    lot, arret = self._lots_prepares, self._arret
+                if messages or lectures:
+                    with connexion:
+                        connexion.executemany("INSERT INTO messages VALUES (?, ?, ?, ?)", messages)
+                        # Segments créés avant les ajouts: un ajout peut viser un segment ouvert dans le même lot.
+                        connexion.executemany("INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", segments)
+                        connexion.executemany("UPDATE segments SET donnees = CAST(donnees || ? AS BLOB), nb = nb + 1, "
+                                              "horodatage = ?, message = ? WHERE participant_id = ? AND segment = ?", ajouts)
+                        connexion.executemany("INSERT OR REPLACE INTO lectures VALUES (?, ?)", lectures)
+                with self._ecrit:
+                    self._lots_ecrits = lot
+                    self._ecrit.notify_all()
+                if arret:
+                    return
+        finally:
+            connexion.close()
+
+    def vider(self):
+        """Attend que les notifications déjà déposées (et les marques de lecture) soient écrites."""
+        with self._ecrit:
+            self._lots_prepares += 1
+            cible = self._lots_prepares
+            self._reveil.set()
+            self._ecrit.wait_for(lambda: self._lots_ecrits >= cible)
+
+    # --- Lecture ---
+    def taille(self, participant_id):
+        entete = self._charger_entetes().get(participant_id)
+        return entete[0] if entete else 0
+
+    def non_lus(self, participant_id):
+        entete = self._charger_entetes().get(participant_id)
+        return entete[0] - entete[1] if entete else 0
+
+    def page(self, participant_id, curseur=None, taille=20):
+        """Retourne (entrées de la plus récente à la plus ancienne, curseur suivant ou None en fin de boîte).
+        Chaque entrée: {"rang", "horodatage", "evenement_id", "type", "texte", "lu"}."""
+        self.vider()
+        entete = self._charger_entetes().get(participant_id)
+        fin = min(entete[0], entete[0] if curseur is None else curseur) if entete else 0
+        debut = max(0, fin - taille)
+        if fin <= 0:
+            return [], None
+        entrees = []
+        for segment, instant, message_id, donnees in self._connexion.execute(
+                "SELECT segment, base_horodatage, base_message, donnees FROM segments WHERE participant_id = ? "
+                "AND segment BETWEEN ? AND ? ORDER BY segment",
+                (participant_id, debut // TAILLE_SEGMENT, (fin - 1) // TAILLE_SEGMENT)):
+            valeurs = _entiers(donnees)
+            for rang, ecart in enumerate(valeurs, segment * TAILLE_SEGMENT):
+                instant += ecart
+                message_id += next(valeurs)
+                if debut <= rang < fin:
+                    entrees.append((rang, instant, message_id))
+        identifiants = sorted({message_id for _, _, message_id in entrees})
+        messages = {ligne[0]: ligne[1:] for ligne in self._connexion.execute(
+            f"SELECT id, evenement_id, type, texte FROM messages WHERE id IN ({','.join('?' * len(identifiants))})",
+            identifiants)}
+        page = [{"rang": rang, "horodatage": instant, "evenement_id": messages[message_id][0],
+                 "type": messages[message_id][1], "texte": messages[message_id][2], "lu": rang < entete[1]}
+                for rang, instant, message_id in reversed(entrees)]
+        return page, (debut or None)
+
+    def fermer(self):
+        with self._verrou:
+            self._arret = True
+        self._reveil.set()
+        self._ecrivain.join()
+        self._connexion.close()
+
+
+# --- Mesure: diffusions à 100 000 inscrits, puis lecture et marquage en masse ---
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    nb_participants, nb_diffusions = 100_000, 20
+    participants = [f"P{i:06d}" for i in range(nb_participants)]
+    instant = [1_760_000_000]
+    chemin = os.path.join(tempfile.mkdtemp(prefix="boites_"), "boites.sqlite")
+    boites = BoitesReception(chemin, horloge=lambda: instant[0])
+
+    depots, ecritures = [], []
+    for version in range(nb_diffusions):
+        debut = time.perf_counter()
+        boites.deposer(participants, "EV001", "mise_a_jour_evenement", f"L'événement 'Forum' a été mis à jour (v{version}).")
+        depots.append(time.perf_counter() - debut)
+        boites.vider()
+        ecritures.append(time.perf_counter() - debut - depots[-1])
+        instant[0] += 3600
+    print(f"Diffusion à {nb_participants} boîtes: dépôt en {sum(depots) / nb_diffusions * 1000:.0f} ms, écriture groupée "
+          f"(thread dédié, une transaction) en {sum(ecritures) / nb_diffusions * 1000:.0f} ms en moyenne")
+
+    # Diffusion par lots (DiffusionParLots): chaque passage de la boucle Tk ne dépose qu'un lot de 500 boîtes.
+    pire_lot = 0.0
+    for debut_lot in range(0, nb_participants, 500):
+        debut = time.perf_counter()
+        boites.deposer(participants[debut_lot:debut_lot + 500], "EV001", "annulation_evenement", "L'événement 'Forum' est annulé.")
+        pire_lot = max(pire_lot, time.perf_counter() - debut)
+    boites.vider()
+    print(f"Diffusion par lots de 500 boîtes: lot le plus long {pire_lot * 1000:.1f} ms")
+
+    # Quelques notifications individuelles entre les diffusions.
+    for i in range(0, nb_participants, 10):
+        boites.deposer([participants[i]], "EV002", "inscription_validee", "Votre inscription à Atelier est validée.")
+    boites.fermer()
+    entrees = nb_participants * (nb_diffusions + 1) + nb_participants // 10
+    print(f"Base: {os.path.getsize(chemin) / entrees:.1f} octets par entrée ({entrees} entrées)")
+
+    boites = BoitesReception(chemin, horloge=lambda: instant[0])
+    debut = time.perf_counter()
+    page, curseur = boites.page("P000010", taille=5)
+    print(f"Première page (réouverture comprise) en {(time.perf_counter() - debut) * 1000:.0f} ms, "
+          f"{boites.non_lus('P000010')} non lus:")
+    for entree in page:
+        print(f"  #{entree['rang']} {time.strftime('%Y-%m-%d %H:%M', time.gmtime(entree['horodatage']))} {entree['texte']}")
+    debut = time.perf_counter()
+    while curseur is not None:
+        page, curseur = boites.page("P000010", curseur, taille=5)
+    print(f"Pages suivantes jusqu'à la fin en {(time.perf_counter() - debut) * 1000:.1f} ms")
+    debut = time.perf_counter()
+    marquees = boites.marquer_lus(participants)
+    boites.vider()
+    print(f"Tout marquer comme lu: {marquees} entrées dans {nb_participants} boîtes en "
+          f"{(time.perf_counter() - debut) * 1000:.0f} ms; non lus de P000010: {boites.non_lus('P000010')}")
+    boites.fermer()
@@ -0,0 +1,234 @@
+# --- Cache à deux niveaux partagé entre processus (LRU local + cache local partagé) ---
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+# Opérations du flux d'événements du domaine qui rendent obsolète la valeur d'un événement.
+OPERATIONS_INVALIDANTES = ("creer_evenement", "mettre_a_jour_description", "modifier_places", "modifier_date",
+                           "annuler_evenement")
+
+
+class CacheLRU:
+    """Niveau 1: cache du processus, borné, éviction du moins récemment utilisé."""
+    def __init__(self, capacite=1024):
+        self.capacite = capacite
+        self._entrees = OrderedDict()
+
+    def obtenir(self, cle):
+        entree = self._entrees.get(cle)
+        if entree is not None:
+            self._entrees.move_to_end(cle)
+        return entree
+
+    def placer(self, cle, version, valeur, version_objet=0):
+        self._entrees[cle] = (version, valeur, version_objet)
+        self._entrees.move_to_end(cle)
+        if len(self._entrees) > self.capacite:
+            self._entrees.popitem(last=False)
+
+    def retirer(self, cle):
+        self._entrees.pop(cle, None)
+
+
+class CachePartageLocal:
+    """Niveau 2: cache partagé par tous les processus de la machine (fichier SQLite en mode WAL,
+    qui joue le rôle d'un Redis local). Les invalidations sont journalisées avec un numéro de
+    version croissant et un horodatage, pour que chaque processus puisse les rattraper.
+    Chaque valeur porte aussi la version de l'objet dont elle est tirée (`version_objet`): un processus
+    en retard ne remplace pas la valeur calculée par un processus à jour."""
+    def __init__(self, chemin):
+        self._connexion = sqlite3.connect(chemin, timeout=5, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS valeurs (cle TEXT PRIMARY KEY, version INTEGER, valeur TEXT, "
+                                "version_objet INTEGER DEFAULT 0)")
+        if "version_objet" not in {colonne[1] for colonne in self._connexion.execute("PRAGMA table_info(valeurs)")}:
+            # Cache créé par une version précédente: ses valeurs comptent comme les plus anciennes.
+            self._connexion.execute("ALTER TABLE valeurs ADD COLUMN version_objet INTEGER DEFAULT 0")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS invalidations "
+                                "(version INTEGER PRIMARY KEY AUTOINCREMENT, cle TEXT, horodatage REAL)")
+        self._connexion.execute("CREATE INDEX IF NOT EXISTS invalidations_cle ON invalidations (cle, version)")
+        # Version sous laquelle les invalidations ont été purgées (seule la dernière de chaque clé est gardée).
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS purge (id INTEGER PRIMARY KEY CHECK (id = 0), avant_version INTEGER)")
+
+    def obtenir(self, cle):
+        ligne = self._connexion.execute("SELECT version, valeur, version_objet FROM valeurs WHERE cle = ?", (cle,)).fetchone()
+        if ligne is None:
+            return None
+        return ligne[0], json.loads(ligne[1]), ligne[2]
+
+    def placer(self, cle, version, valeur, version_objet=0):
+        # Une valeur calculée avant une invalidation plus récente, ou tirée d'un objet plus ancien que
+        # celui de la valeur en place, ne doit pas écraser l'état courant.
+        self._connexion.execute(
+            "INSERT INTO valeurs (cle, version, valeur, version_objet) SELECT ?, ?, ?, ? "
+            "WHERE ? >= (SELECT COALESCE(MAX(version), 0) FROM invalidations WHERE cle = ?) "
+            "ON CONFLICT(cle) DO UPDATE SET version = excluded.version, valeur = excluded.valeur, "
+            "version_objet = excluded.version_objet "
+            "WHERE excluded.version >= valeurs.version AND excluded.version_objet >= valeurs.version_objet",
+            (cle, version, json.dumps(valeur, ensure_ascii=False), version_objet, version, cle))
+
+    def invalider(self, cle):
+        with self._connexion:
+            self._connexion.execute("BEGIN IMMEDIATE")
+            curseur = self._connexion.execute("INSERT INTO invalidations (cle, horodatage) VALUES (?, ?)", (cle, time.time()))
+            self._connexion.execute("DELETE FROM valeurs WHERE cle = ?", (cle,))
+        return curseur.lastrowid
+
+    def version_courante(self, cle):
+        ligne = self._connexion.execute("SELECT MAX(version) FROM invalidations WHERE cle = ?", (cle,)).fetchone()
+        return ligne[0] or 0
+
+    def invalidations_depuis(self, version):
+        return self._connexion.execute("SELECT version, cle, horodatage FROM invalidations WHERE version > ? ORDER BY version",
+                                       (version,)).fetchall()
+
+    def derniere_version(self):
+        return self._connexion.execute("SELECT COALESCE(MAX(version), 0) FROM invalidations").fetchone()[0]
+
+    def version_avant_horodatage(self, horodatage):
+        ligne = self._connexion.execute("SELECT MAX(version) FROM invalidations WHERE horodatage < ?", (horodatage,)).fetchone()
+        return ligne[0] or 0
+
+    def purger_invalidations(self, avant_version):
+        with self._connexion:
+            self._connexion.execute("BEGIN IMMEDIATE")
+            self._connexion.execute("DELETE FROM invalidations WHERE version < ? AND version NOT IN "
+                                    "(SELECT MAX(version) FROM invalidations GROUP BY cle)", (avant_version,))
+            self._connexion.execute("INSERT INTO purge (id, avant_version) VALUES (0, ?) ON CONFLICT(id) DO UPDATE "
+                                    "SET avant_version = MAX(avant_version, excluded.avant_version)", (avant_version,))
+
+    def purge_avant(self):
+        ligne = self._connexion.execute("SELECT avant_version FROM purge WHERE id = 0").fetchone()
+        return ligne[0] if ligne else 0
+
+    def fermer(self):
+        self._connexion.close()
+
+
+class CacheDeuxNiveaux:
+    """Lecture traversante L1 (processus) -> L2 (partagé) -> magasin persistant (`charger(cle)`).
+
+    Chaque processus rattrape les invalidations des autres au plus toutes les `intervalle_synchro`
+    secondes: c'est la borne de la fenêtre d'obsolescence, mesurée dans `statistiques()`.
+    Le journal des invalidations est purgé par `purger(retention)`; un processus resté inactif plus
+    longtemps que la rétention ne peut plus les rattraper une à une et vide alors son cache L1.
+
+    `version_objet(cle)` donne la version locale de l'objet: une valeur tirée d'une version plus ancienne
+    (placée par un processus qui n'avait pas encore reçu la modification) est rechargée, et jamais
+    placée par-dessus une valeur plus récente.
+    """
+    def __init__(self, chemin_partage, charger, capacite_l1=1024, intervalle_synchro=0.05, version_objet=None):
+        self.l1 = CacheLRU(capacite_l1)
+        self.l2 = CachePartageLocal(chemin_partage)
+        self._charger = charger
+        self._version_objet = version_objet
+        self.intervalle_synchro = intervalle_synchro
+        self._version_vue = self.l2.derniere_version()
+        self._derniere_synchro = time.monotonic()
+        self.succes_l1 = self.succes_l2 = self.echecs = 0
+        self.invalidations_recues = 0
+        self.obsolescence_max = self.obsolescence_totale = 0.0
+
+    def obtenir(self, cle):
+        self.synchroniser()
+        version_objet = self._version_objet(cle) if self._version_objet else 0
+        entree = self.l1.obtenir(cle)
+        if entree is not None and entree[2] >= version_objet:
+            self.succes_l1 += 1
+            return entree[1]
+        entree = self.l2.obtenir(cle)
+        if entree is not None and entree[2] >= version_objet:
+            self.succes_l2 += 1
+            self.l1.placer(cle, *entree)
+            return entree[1]
+        self.echecs += 1
+        version = self.l2.version_courante(cle)
+        valeur = self._charger(cle)
+        if valeur is not None:
+            self.l2.placer(cle, version, valeur, version_objet)
+            self.l1.placer(cle, version, valeur, version_objet)
+        return valeur
+
+    def invalider(self, cle):
+        self.l1.retirer(cle)
+        return self.l2.invalider(cle)
+
+    def appliquer_evenement_domaine(self, operation, donnees):
+        """Branché sur le flux de mutations (journal): invalide les clés touchées."""
+        if operation in OPERATIONS_INVALIDANTES:
+            self.invalider(donnees["id"])
+
+    def synchroniser(self, forcer=False):
+        maintenant = time.monotonic()
+        if not forcer and maintenant - self._derniere_synchro < self.intervalle_synchro:
+            return
+        self._derniere_synchro = maintenant
+        horloge = time.time()
+        purge_avant = self.l2.purge_avant()
+        if self._version_vue + 1 < purge_avant:
+            # Des invalidations non vues ont été purgées: tout le niveau 1 est suspect.
+            self.l1 = CacheLRU(self.l1.capacite)
+            self._version_vue = purge_avant - 1
+        for version, cle, horodatage in self.l2.invalidations_depuis(self._version_vue):
+            self.l1.retirer(cle)
+            self._version_vue = version
+            self.invalidations_recues += 1
+            retard = max(0.0, horloge - horodatage)
+            self.obsolescence_totale += retard
+            self.obsolescence_max = max(self.obsolescence_max, retard)
+
+    def purger(self, retention=300):
+        """Oublie les invalidations de plus de `retention` secondes (sauf la dernière de chaque clé)."""
+        avant_version = self.l2.version_avant_horodatage(time.time() - retention)
+        if avant_version:
+            self.l2.purger_invalidations(avant_version)
+        return avant_version
+
+    def statistiques(self):
+        lectures = self.succes_l1 + self.succes_l2 + self.echecs
+        return {
+            "lectures": lectures,
+            "taux_succes_l1": self.succes_l1 / lectures if lectures else 0.0,
+            "taux_succes_l2": self.succes_l2 / lectures if lectures else 0.0,
+            "taux_echec": self.echecs / lectures if lectures else 0.0,
+            "invalidations_recues": self.invalidations_recues,
+            "obsolescence_max_s": self.obsolescence_max,
+            "obsolescence_moyenne_s": self.obsolescence_totale / self.invalidations_recues if self.invalidations_recues else 0.0,
+        }
+
+    def fermer(self):
+        self.l2.fermer()
+
+
+# --- Exemple d'utilisation: plusieurs processus qui partagent le cache ---
+def _lecteur(chemin, nb_lectures, resultats):
+    magasin = {f"EV{i:03d}": f"Détails {i} v0" for i in range(200)}
+    cache = CacheDeuxNiveaux(chemin, magasin.get)
+    for n in range(nb_lectures):
+        cache.obtenir(f"EV{n % 200:03d}")
+    resultats.put(cache.statistiques())
+    cache.fermer()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import os
+    import tempfile
+
+    chemin = os.path.join(tempfile.mkdtemp(prefix="cache_"), "cache.sqlite")
+    resultats = multiprocessing.Queue()
+    lecteurs = [multiprocessing.Process(target=_lecteur, args=(chemin, 50000, resultats)) for _ in range(3)]
+    for lecteur in lecteurs:
+        lecteur.start()
+
+    ecrivain = CacheDeuxNiveaux(chemin, lambda cle: None)
+    for i in range(300):
+        ecrivain.appliquer_evenement_domaine("mettre_a_jour_description", {"id": f"EV{i % 200:03d}"})
+        time.sleep(0.002)
+    for lecteur in lecteurs:
+        lecteur.join()
+    for _ in lecteurs:
+        stats = resultats.get()
+        print({cle: round(valeur, 4) if isinstance(valeur, float) else valeur for cle, valeur in stats.items()})
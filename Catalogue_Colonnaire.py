@@ -0,0 +1,365 @@
+# --- Snapshot colonnaire du catalogue, lu sans désérialisation via mmap ---
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from datetime import date
+
+from Recurrence import RegleRecurrence
+
+MAGIC = b"EVCAT\x00\x00\x01"
+VERSION_FORMAT = 3
+# magic | version | nombre de lignes | nombre de types | position du tas de chaînes
+EN_TETE = struct.Struct("<8sIIIQ")
+COLONNES_CHAINES = ("id", "nom", "description", "details", "specifiques")
+
+
+def _aligner(position, alignement=8):
+    return (position + alignement - 1) // alignement * alignement
+
+
+def _disposition(nb_lignes, nb_types):
+    """Positions des colonnes, entièrement déterminées par le nombre de lignes et de types."""
+    positions = {}
+    position = EN_TETE.size
+    positions["types"] = position
+    position = _aligner(position + nb_types * 8)
+    positions["type"] = position
+    position = _aligner(position + nb_lignes)
+    positions["annule"] = position
+    position = _aligner(position + nb_lignes)
+    positions["date"] = position
+    position = _aligner(position + nb_lignes * 4)
+    positions["version"] = position
+    position = _aligner(position + nb_lignes * 4)
+    for colonne in COLONNES_CHAINES:
+        positions[colonne] = position
+        position = _aligner(position + nb_lignes * 8)
+    positions["tas"] = position
+    return positions
+
+
+def _lire_generation(chemin):
+    """Nom du fichier de données courant, lu dans le fichier pointeur `chemin` (None s'il n'existe pas)."""
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def ligne_catalogue(evenement):
+    """Valeurs d'un événement telles qu'écrites dans le catalogue: (id, type, annulé, jour ordinal, version,
+    nom, description, détails, champs spécifiques en JSON). Un tuple de valeurs simples, qui peut être
+    gardé d'une publication à l'autre tant que la version de l'événement ne change pas.
+
+    L'événement doit exposer id, nom, description, date, version, type_evenement, est_annule,
+    get_details() et champs_specifiques(); la récurrence éventuelle est rangée avec les champs spécifiques."""
+    specifiques = dict(evenement.champs_specifiques())
+    recurrence = getattr(evenement, "recurrence", None)
+    if recurrence is not None:
+        specifiques["recurrence"] = recurrence.serialiser()
+    return (evenement.id, evenement.type_evenement, bool(getattr(evenement, "est_annule", False)),
+            evenement.date.toordinal(), evenement.version, evenement.nom, evenement.description,
+            evenement.get_details(), json.dumps(specifiques, ensure_ascii=False, default=str))
+
+
+def ecrire_catalogue(chemin, evenements):
+    """Écrit le catalogue des événements (voir `ligne_catalogue` et `ecrire_lignes`)."""
+    ecrire_lignes(chemin, [ligne_catalogue(evenement) for evenement in evenements])
+
+
+def ecrire_lignes(chemin, lignes):
+    """Écrit le catalogue (trié par ID) dans un nouveau fichier de données `chemin.N`, puis publie ce
+    nom en remplaçant atomiquement le petit fichier pointeur `chemin`. Ne lit que les `lignes`
+    (voir `ligne_catalogue`): peut s'exécuter hors du thread qui modifie les événements.
+
+    Un fichier projeté (mmap) ne peut pas être remplacé ni supprimé sous Windows: les données ne sont
+    donc jamais écrasées. La génération précédente est gardée pour les lecteurs en train de l'ouvrir;
+    les plus anciennes sont supprimées dès que plus aucun lecteur ne les projette."""
+    lignes = sorted(lignes, key=lambda ligne: ligne[0])
+    noms_types = sorted({ligne[1] for ligne in lignes})
+    index_types = {nom: i for i, nom in enumerate(noms_types)}
+
+    tas = bytearray()
+    def ranger(texte):
+        donnees = texte.encode("utf-8")
+        position = len(tas)
+        tas.extend(donnees)
+        return position, len(donnees)
+
+    table_types = array("I")
+    for nom in noms_types:
+        table_types.extend(ranger(nom))
+
+    col_type = bytearray()
+    col_annule = bytearray()
+    col_date = array("i")
+    col_version = array("i")
+    cols_chaines = {colonne: array("I") for colonne in COLONNES_CHAINES}
+    for evenement_id, type_evenement, est_annule, jour, version, nom, description, details, specifiques in lignes:
+        col_type.append(index_types[type_evenement])
+        col_annule.append(est_annule)
+        col_date.append(jour)
+        col_version.append(version)
+        cols_chaines["id"].extend(ranger(evenement_id))
+        cols_chaines["nom"].extend(ranger(nom))
+        cols_chaines["description"].extend(ranger(description))
+        cols_chaines["details"].extend(ranger(details))
+        cols_chaines["specifiques"].extend(ranger(specifiques))
+
+    positions = _disposition(len(lignes), len(noms_types))
+    courant = _lire_generation(chemin)
+    generation = int(courant.rsplit(".", 1)[1]) + 1 if courant else 1
+    donnees = f"{chemin}.{generation}"
+    with open(donnees, "wb") as f:
+        f.write(EN_TETE.pack(MAGIC, VERSION_FORMAT, len(lignes), len(noms_types), positions["tas"]))
+        for nom_colonne, contenu in [("types", table_types), ("type", col_type), ("annule", col_annule),
+                                     ("date", col_date), ("version", col_version)] + \
+                                    [(c, cols_chaines[c]) for c in COLONNES_CHAINES] + [("tas", tas)]:
+            f.write(b"\x00" * (positions[nom_colonne] - f.tell()))
+            f.write(contenu if isinstance(contenu, (bytes, bytearray)) else contenu.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    _publier_generation(chemin, os.path.basename(donnees))
+    _supprimer_generations(chemin, garder=(generation, generation - 1))
+
+
+def _publier_generation(chemin, nom_donnees, tentatives=20):
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        f.write(nom_donnees)
+        f.flush()
+        os.fsync(f.fileno())
+    for tentative in range(tentatives):
+        try:
+            os.replace(temporaire, chemin)
+            return
+        except PermissionError:
+            # Windows: un lecteur lit le pointeur à cet instant (lecture de quelques octets).
+            if tentative == tentatives - 1:
+                raise
+            time.sleep(0.01)
+
+
+def _supprimer_generations(chemin, garder):
+    dossier, prefixe = os.path.split(chemin)
+    prefixe += "."
+    for nom in os.listdir(dossier or "."):
+        suffixe = nom[len(prefixe):] if nom.startswith(prefixe) else ""
+        if suffixe.isdigit() and int(suffixe) not in garder:
+            try:
+                os.remove(os.path.join(dossier, nom))
+            except OSError:
+                pass  # encore projeté par un lecteur (Windows): supprimé à une prochaine publication
+
+
+class VueEvenement:
+    """Événement lu directement dans le fichier projeté: chaque attribut est décodé à la demande.
+    Expose la même interface que Evenement pour les afficheurs (Bridge) et le proxy."""
+    __slots__ = ("_projection", "_ligne")
+
+    def __init__(self, projection, ligne):
+        self._projection = projection
+        self._ligne = ligne
+
+    id = property(lambda self: self._projection._chaine("id", self._ligne))
+    nom = property(lambda self: self._projection._chaine("nom", self._ligne))
+    description = property(lambda self: self._projection._chaine("description", self._ligne))
+    date = property(lambda self: date.fromordinal(self._projection._dates[self._ligne]))
+    version = property(lambda self: self._projection._versions[self._ligne])
+    type_evenement = property(lambda self: self._projection.types[self._projection._types[self._ligne]])
+    est_annule = property(lambda self: bool(self._projection._annules[self._ligne]))
+    recurrence = property(lambda self: RegleRecurrence.deserialiser(
+        json.loads(self._projection._chaine("specifiques", self._ligne)).get("recurrence")))
+
+    def get_details(self):
+        return self._projection._chaine("details", self._ligne)
+
+    def champs_specifiques(self):
+        specifiques = json.loads(self._projection._chaine("specifiques", self._ligne))
+        specifiques.pop("recurrence", None)
+        return specifiques
+
+    def __getattr__(self, nom):
+        # Champs spécifiques (sponsor, domaine, ...): seule cette lecture désérialise, et seulement cette ligne.
+        specifiques = json.loads(self._projection._chaine("specifiques", self._ligne))
+        if nom in specifiques:
+            return specifiques[nom]
+        raise AttributeError(nom)
+
+
+class _Projection:
+    """Une génération du fichier de données, projetée en mémoire. Les vues qui la référencent restent
+    valides après la reprise d'une génération plus récente."""
+    def __init__(self, chemin):
+        with open(chemin, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        vue = memoryview(self._mmap)
+        magic, version, n, nb_types, position_tas = EN_TETE.unpack_from(vue)
+        if magic != MAGIC or version != VERSION_FORMAT:
+            raise ValueError(f"Format de catalogue non reconnu: {chemin}")
+        positions = _disposition(n, nb_types)
+        self.nb_evenements = n
+        self._tas = position_tas
+        self._vue = vue
+        self._types = vue[positions["type"]:positions["type"] + n]
+        self._annules = vue[positions["annule"]:positions["annule"] + n]
+        self._dates = vue[positions["date"]:positions["date"] + n * 4].cast("i")
+        self._versions = vue[positions["version"]:positions["version"] + n * 4].cast("i")
+        self._colonnes = {c: vue[positions[c]:positions[c] + n * 8].cast("I") for c in COLONNES_CHAINES}
+        table_types = vue[positions["types"]:positions["types"] + nb_types * 8].cast("I")
+        self.types = [bytes(vue[position_tas + table_types[2 * i]:position_tas + table_types[2 * i] + table_types[2 * i + 1]]).decode("utf-8")
+                      for i in range(nb_types)]
+
+    def _chaine(self, colonne, ligne):
+        refs = self._colonnes[colonne]
+        debut = self._tas + refs[2 * ligne]
+        return str(self._vue[debut:debut + refs[2 * ligne + 1]], "utf-8")
+
+
+class CatalogueColonnaire:
+    """Lecteur partagé: le fichier est projeté en mémoire (mmap) et les pages sont partagées entre
+    processus par le système. Aucun objet n'est construit à l'ouverture. Une nouvelle génération
+    publiée par `ecrire_catalogue` est reprise à la lecture suivante (vérifiée au plus toutes les
+    `intervalle_verification` secondes)."""
+    def __init__(self, chemin, intervalle_verification=1.0):
+        self.chemin = chemin
+        self.intervalle_verification = intervalle_verification
+        self._derniere_verification = time.monotonic()
+        self._ouvrir()
+
+    def _ouvrir(self, tentatives=3):
+        for tentative in range(tentatives):
+            generation = _lire_generation(self.chemin)
+            if generation is None:
+                raise FileNotFoundError(f"Catalogue non publié: {self.chemin}")
+            try:
+                self._projection = _Projection(os.path.join(os.path.dirname(self.chemin), generation))
+            except FileNotFoundError:
+                # Génération supprimée entre la lecture du pointeur et l'ouverture: relire le pointeur.
+                if tentative == tentatives - 1:
+                    raise
+                continue
+            self._generation = generation
+            return
+
+    @property
+    def nb_evenements(self):
+        return self._projection.nb_evenements
+
+    @property
+    def types(self):
+        return self._projection.types
+
+    def rafraichir_si_modifie(self):
+        """Reprend la génération publiée si elle a changé. Les vues déjà distribuées restent valides:
+        elles référencent l'ancienne projection."""
+        maintenant = time.monotonic()
+        if maintenant - self._derniere_verification < self.intervalle_verification:
+            return False
+        self._derniere_verification = maintenant
+        generation = _lire_generation(self.chemin)
+        if generation is None or generation == self._generation:
+            return False
+        self._ouvrir()
+        return True
+
+    # --- Accès ---
+    def __len__(self):
+        self.rafraichir_si_modifie()
+        return self._projection.nb_evenements
+
+    def __iter__(self):
+        self.rafraichir_si_modifie()
+        projection = self._projection
+        return (VueEvenement(projection, i) for i in range(projection.nb_evenements))
+
+    def get(self, evenement_id, defaut=None):
+        """Recherche dichotomique sur la colonne des IDs (triée): O(log n) décodages."""
+        self.rafraichir_si_modifie()
+        projection = self._projection
+        bas, haut = 0, projection.nb_evenements
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if projection._chaine("id", milieu) < evenement_id:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        if bas < projection.nb_evenements and projection._chaine("id", bas) == evenement_id:
+            return VueEvenement(projection, bas)
+        return defaut
+
+    def filtrer(self, type_evenement=None, debut=None, fin=None, inclure_annules=True):
+        """Filtre sur les colonnes fixes uniquement (type, date, annulation), sans décoder de chaîne."""
+        self.rafraichir_si_modifie()
+        projection = self._projection
+        code_type = projection.types.index(type_evenement) if type_evenement in projection.types else None
+        if type_evenement is not None and code_type is None:
+            return
+        debut = debut.toordinal() if debut else None
+        fin = fin.toordinal() if fin else None
+        types, dates, annules = projection._types, projection._dates, projection._annules
+        for i in range(projection.nb_evenements):
+            if code_type is not None and types[i] != code_type:
+                continue
+            if not inclure_annules and annules[i]:
+                continue
+            jour = dates[i]
+            if (debut is not None and jour < debut) or (fin is not None and jour > fin):
+                continue
+            yield VueEvenement(projection, i)
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    import tempfile
+    from types import SimpleNamespace
+
+    def evenement_exemple(i):
+        e = SimpleNamespace(id=f"EV{i:06d}", nom=f"Séminaire {i}", description="Introduction",
+                            date=date(2025, 1, 1).fromordinal(date(2025, 1, 1).toordinal() + i % 365),
+                            type_evenement="Seminaire" if i % 2 else "Conference", recurrence=None, version=1,
+                            est_annule=False)
+        e.get_details = lambda: f"ID: {e.id}, Nom: {e.nom}"
+        e.champs_specifiques = lambda: {"domaine": "Informatique"}
+        return e
+
+    chemin = os.path.join(tempfile.mkdtemp(prefix="catalogue_"), "catalogue.evcat")
+    evenements = [evenement_exemple(i) for i in range(200000)]
+    evenements[7].recurrence = RegleRecurrence("hebdomadaire", nombre=10)
+    debut = time.perf_counter()
+    ecrire_catalogue(chemin, evenements)
+    print(f"Écriture de {len(evenements)} événements: {time.perf_counter() - debut:.2f}s, "
+          f"{os.path.getsize(os.path.join(os.path.dirname(chemin), _lire_generation(chemin))) / 1e6:.1f} Mo")
+
+    debut = time.perf_counter()
+    catalogue = CatalogueColonnaire(chemin)
+    print(f"Ouverture: {(time.perf_counter() - debut) * 1000:.2f} ms")
+    debut = time.perf_counter()
+    trouve = catalogue.get("EV123456")
+    print(f"get(): {trouve.nom} / {trouve.domaine} en {(time.perf_counter() - debut) * 1e6:.0f} µs")
+    debut = time.perf_counter()
+    octobre = sum(1 for _ in catalogue.filtrer("Seminaire", date(2025, 10, 1), date(2025, 10, 31)))
+    print(f"Filtre type + mois: {octobre} séminaires en {(time.perf_counter() - debut) * 1000:.1f} ms")
+    print(f"Récurrence relue: {catalogue.get('EV000007').recurrence}")
+
+    # Republication pendant que le lecteur garde l'ancienne génération projetée.
+    evenements[123456].est_annule = True
+    ecrire_catalogue(chemin, evenements)
+    catalogue._derniere_verification = 0.0
+    print(f"Nouvelle génération reprise: {catalogue.rafraichir_si_modifie()}, ancienne vue toujours lisible: "
+          f"{trouve.nom}, annulé: {catalogue.get('EV123456').est_annule}")
+
+    # Republication par l'application: les lignes sont gardées d'une publication à l'autre et seules celles
+    # des événements modifiés sont recalculées, avec l'écriture, dans le thread de publication.
+    lignes = {e.id: ligne_catalogue(e) for e in evenements}
+    evenements[42].description = "Salle changée"
+    evenements[42].version += 1
+    debut = time.perf_counter()
+    lignes[evenements[42].id] = ligne_catalogue(evenements[42])
+    ecrire_lignes(chemin, list(lignes.values()))
+    print(f"Republication après une modification (lignes gardées): {time.perf_counter() - debut:.2f}s, "
+          f"hors du thread de l'interface")
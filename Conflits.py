@@ -0,0 +1,226 @@
+# --- Détection de conflits d'horaires (participants, intervenants, salles) ---
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time, timedelta
+
+# Sans heure de début connue, un événement occupe sa journée; un hackathon dure `duree_heures`.
+DUREE_PAR_DEFAUT = timedelta(days=1)
+HORIZON_SERIES = timedelta(days=365)
+
+
+def intervalles_evenement(evenement, date_occurrence=None, horizon=HORIZON_SERIES, debut_fenetre=None):
+    """Intervalles (debut, fin, date) occupés par un événement, une séance précise, ou les séances
+    d'une série sur l'horizon donné à partir de `debut_fenetre` (par défaut aujourd'hui ou le début de la
+    série), générées paresseusement."""
+    duree_heures = getattr(evenement, "duree_heures", None)
+    duree = timedelta(hours=duree_heures) if duree_heures else DUREE_PAR_DEFAUT
+    if date_occurrence is not None:
+        jours = [date_occurrence]
+    elif getattr(evenement, "recurrence", None) is not None:
+        debut_fenetre = debut_fenetre or max(evenement.date, date.today())
+        jours = evenement.recurrence.occurrences(evenement.date, debut_fenetre, debut_fenetre + horizon)
+    else:
+        jours = [evenement.date]
+    for jour in jours:
+        debut = datetime.combine(jour, time.min)
+        yield debut, debut + duree, jour
+
+
+def ressources_evenement(evenement):
+    """Ressources exclusives d'un événement: intervenant principal et salle s'ils sont renseignés."""
+    ressources = []
+    for attribut, genre in (("speaker_principal", "intervenant"), ("animateur", "intervenant"), ("salle", "salle")):
+        valeur = getattr(evenement, attribut, None)
+        if valeur:
+            ressources.append((genre, str(valeur).strip().lower()))
+    return ressources
+
+
+class IndexIntervalles:
+    """Intervalles d'une ressource triés par début, rangés en blocs triés de taille bornée: un ajout ou un
+    retrait ne décale que les entrées d'un bloc. Une requête ne parcourt que les intervalles commençant
+    dans [debut - duree_max, fin[, retrouvés par dichotomie."""
+    # Un bloc qui dépasse 2 * TAILLE_BLOC entrées est coupé en deux.
+    TAILLE_BLOC = 256
+
+    def __init__(self):
+        self._blocs = []     # listes triées de (debut, fin, cle), les blocs se suivant dans l'ordre des débuts
+        self._premiers = []  # début de la première entrée de chaque bloc
+        self._duree_max = timedelta(0)
+
+    def __len__(self):
+        return sum(len(bloc) for bloc in self._blocs)
+
+    def ajouter(self, debut, fin, cle):
+        self._duree_max = max(self._duree_max, fin - debut)
+        if not self._blocs:
+            self._blocs.append([(debut, fin, cle)])
+            self._premiers.append(debut)
+            return
+        numero = max(0, bisect_right(self._premiers, debut) - 1)
+        bloc = self._blocs[numero]
+        insort(bloc, (debut, fin, cle))
+        self._premiers[numero] = bloc[0][0]
+        if len(bloc) > 2 * self.TAILLE_BLOC:
+            self._blocs[numero:numero + 1] = [bloc[:self.TAILLE_BLOC], bloc[self.TAILLE_BLOC:]]
+            self._premiers[numero:numero + 1] = [bloc[0][0], bloc[self.TAILLE_BLOC][0]]
+
+    def retirer(self, debut, cle):
+        # Seuls les intervalles commençant à `debut` sont comparés: ils sont dans les blocs dont le premier
+        # début encadre `debut`, retrouvés par dichotomie.
+        for numero in range(max(0, bisect_left(self._premiers, debut) - 1), bisect_right(self._premiers, debut)):
+            bloc = self._blocs[numero]
+            for position in range(bisect_left(bloc, (debut,)), len(bloc)):
+                if bloc[position][0] != debut:
+                    break
+                if bloc[position][2] == cle:
+                    del bloc[position]
+                    if bloc:
+                        self._premiers[numero] = bloc[0][0]
+                    else:
+                        del self._blocs[numero]
+                        del self._premiers[numero]
+                    return
+
+    def retirer_evenement(self, evenement_id):
+        conserves = [entree for bloc in self._blocs for entree in bloc if entree[2][0] != evenement_id]
+        self._blocs = [conserves[i:i + self.TAILLE_BLOC] for i in range(0, len(conserves), self.TAILLE_BLOC)]
+        self._premiers = [bloc[0][0] for bloc in self._blocs]
+
+    def chevauchements(self, debut, fin):
+        depuis = debut - self._duree_max
+        cles = []
+        numero = max(0, bisect_left(self._premiers, depuis) - 1)
+        for bloc in self._blocs[numero:]:
+            for d, f, cle in bloc[bisect_left(bloc, (depuis,)):]:
+                if d >= fin:
+                    return cles
+                if f > debut:
+                    cles.append(cle)
+        return cles
+
+
+class VerificateurConflits:
+    """Index des occupations par participant et par ressource, consulté à l'inscription et à la création."""
+    def __init__(self):
+        self._par_participant = {}
+        self._par_ressource = {}
+        self._fenetres = {}  # evenement_id -> début de la fenêtre des séances d'une série, fixé au premier usage
+
+    def _intervalles(self, evenement, date_occurrence=None):
+        # Une série est toujours dépliée sur la même fenêtre: un retrait fait un autre jour que l'enregistrement
+        # retrouve exactement les séances enregistrées.
+        if date_occurrence is None and getattr(evenement, "recurrence", None) is not None:
+            debut_fenetre = self._fenetres.setdefault(evenement.id, max(evenement.date, date.today()))
+            return intervalles_evenement(evenement, debut_fenetre=debut_fenetre)
+        return intervalles_evenement(evenement, date_occurrence)
+
+    # --- Participants ---
+    def conflits_inscription(self, participant_id, evenement, date_occurrence=None):
+        index = self._par_participant.get(participant_id)
+        if index is None:
+            return []
+        conflits = []
+        for debut, fin, jour in self._intervalles(evenement, date_occurrence):
+            conflits.extend(c for c in index.chevauchements(debut, fin) if c[0] != evenement.id)
+        return sorted(set(conflits))
+
+    def enregistrer_inscription(self, participant_id, evenement, date_occurrence=None):
+        index = self._par_participant.setdefault(participant_id, IndexIntervalles())
+        for debut, fin, jour in self._intervalles(evenement, date_occurrence):
+            index.ajouter(debut, fin, (evenement.id, jour))
+
+    def retirer_inscription(self, participant_id, evenement, date_occurrence=None):
+        index = self._par_participant.get(participant_id)
+        if index is not None:
+            for debut, _, jour in self._intervalles(evenement, date_occurrence):
+                index.retirer(debut, (evenement.id, jour))
+
+    # --- Intervenants / salles ---
+    def conflits_evenement(self, evenement):
+        conflits = []
+        for ressource in ressources_evenement(evenement):
+            index = self._par_ressource.get(ressource)
+            if index is None:
+                continue
+            for debut, fin, jour in self._intervalles(evenement):
+                conflits.extend((ressource, cle) for cle in index.chevauchements(debut, fin) if cle[0] != evenement.id)
+        return sorted(set(conflits))
+
+    def enregistrer_evenement(self, evenement):
+        for ressource in ressources_evenement(evenement):
+            index = self._par_ressource.setdefault(ressource, IndexIntervalles())
+            for debut, fin, jour in self._intervalles(evenement):
+                index.ajouter(debut, fin, (evenement.id, jour))
+
+    def retirer_evenement(self, evenement, participants=()):
+        """Oublie toutes les occupations de l'événement (avant de le réenregistrer à une autre date)."""
+        for index in [self._par_ressource.get(ressource) for ressource in ressources_evenement(evenement)] + \
+                     [self._par_participant.get(participant_id) for participant_id in participants]:
+            if index is not None:
+                index.retirer_evenement(evenement.id)
+        # Réenregistré (à une autre date), l'événement repart d'une fenêtre nouvelle.
+        self._fenetres.pop(evenement.id, None)
+
+
+def audit_conflits(evenements, inscriptions):
+    """Audit global par balayage: pour chaque ressource ou participant, les intervalles sont triés puis
+    parcourus avec un tas des fins en cours. Coût O(n log n + k) pour k conflits, sans comparer
+    toutes les paires. Retourne une liste de (genre, valeur, (evenement_id, jour), (evenement_id, jour))."""
+    occupations = {}
+    for evenement in evenements:
+        for ressource in ressources_evenement(evenement):
+            liste = occupations.setdefault(ressource, [])
+            liste.extend((debut, fin, (evenement.id, jour)) for debut, fin, jour in intervalles_evenement(evenement))
+    for inscription in inscriptions:
+        liste = occupations.setdefault(("participant", inscription.participant.id), [])
+        evenement = inscription.evenement
+        liste.extend((debut, fin, (evenement.id, jour))
+                     for debut, fin, jour in intervalles_evenement(evenement, getattr(inscription, "date_occurrence", None)))
+
+    conflits = []
+    for (genre, valeur), intervalles in occupations.items():
+        if len(intervalles) < 2:
+            continue
+        intervalles.sort()
+        actifs = []  # tas de (fin, cle)
+        for debut, fin, cle in intervalles:
+            while actifs and actifs[0][0] <= debut:
+                heapq.heappop(actifs)
+            for _, autre in actifs:
+                if autre[0] != cle[0]:
+                    conflits.append((genre, valeur, autre, cle))
+            heapq.heappush(actifs, (fin, cle))
+    return conflits
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    import random
+    import time as chrono
+    from types import SimpleNamespace
+
+    random.seed(1)
+    evenements = [SimpleNamespace(id=f"EV{i:06d}", date=date(2025, 9, 1) + timedelta(days=random.randrange(365)),
+                                  speaker_principal=f"Speaker {random.randrange(5000)}", recurrence=None)
+                  for i in range(100000)]
+    debut = chrono.perf_counter()
+    conflits = audit_conflits(evenements, [])
+    print(f"Audit de {len(evenements)} événements: {len(conflits)} conflits d'intervenant "
+          f"en {chrono.perf_counter() - debut:.2f}s")
+
+    verificateur = VerificateurConflits()
+    for evenement in evenements:
+        verificateur.enregistrer_evenement(evenement)
+    debut = chrono.perf_counter()
+    for evenement in evenements[:10000]:
+        verificateur.conflits_evenement(evenement)
+    print(f"10000 vérifications à la création: {(chrono.perf_counter() - debut) * 100:.1f} µs par vérification")
+
+    # Un index très chargé (un intervenant, 200 000 créneaux dans le désordre): un ajout ne décale qu'un bloc.
+    index = IndexIntervalles()
+    debut = chrono.perf_counter()
+    for i in range(200000):
+        instant = datetime(2025, 9, 1) + timedelta(minutes=random.randrange(525600))
+        index.ajouter(instant, instant + timedelta(hours=1), (f"EV{i:06d}", instant.date()))
+    print(f"200000 ajouts dans un même index: {(chrono.perf_counter() - debut) * 5:.1f} µs par ajout")
@@ -0,0 +1,250 @@
+# --- Contrôle des présences: badges signés, pointage idempotent, serveur local pour les scanners ---
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ErreurBadge(ValueError):
+    """Badge illisible, falsifié ou émis avec une autre clé."""
+
+
+def cle_inscription(evenement_id, participant_id, date_occurrence=None):
+    cle = f"{evenement_id}:{participant_id}"
+    return f"{cle}:{date_occurrence.isoformat()}" if date_occurrence else cle
+
+
+class GenerateurBadges:
+    """Jetons "charge.signature" (base64 url): la charge est la clé de l'inscription, la signature un
+    HMAC-SHA256 tronqué. La vérification ne demande aucun accès au stockage."""
+    TAILLE_SIGNATURE = 16
+
+    def __init__(self, cle_secrete):
+        self._cle = cle_secrete
+
+    @classmethod
+    def depuis_fichier(cls, chemin):
+        """Charge la clé secrète, ou la crée au premier lancement."""
+        if not os.path.exists(chemin):
+            with open(chemin, "wb") as f:
+                f.write(os.urandom(32))
+        with open(chemin, "rb") as f:
+            return cls(f.read())
+
+    def _signer(self, charge):
+        return hmac.new(self._cle, charge, hashlib.sha256).digest()[:self.TAILLE_SIGNATURE]
+
+    def emettre(self, cle):
+        charge = cle.encode("utf-8")
+        return (base64.urlsafe_b64encode(charge).rstrip(b"=") + b"." +
+                base64.urlsafe_b64encode(self._signer(charge)).rstrip(b"=")).decode("ascii")
+
+    def verifier(self, jeton):
+        """Retourne la clé d'inscription portée par le jeton, ou lève ErreurBadge."""
+        try:
+            charge, signature = (base64.urlsafe_b64decode(partie + "=" * (-len(partie) % 4))
+                                 for partie in jeton.strip().split("."))
+        except (ValueError, TypeError):
+            raise ErreurBadge("Badge illisible.")
+        if not hmac.compare_digest(signature, self._signer(charge)):
+            raise ErreurBadge("Signature du badge invalide.")
+        return charge.decode("utf-8")
+
+
+class RegistrePresences:
+    """Présences en mémoire (pointage idempotent, compteurs par événement), écrites par lots sur disque
+    par un thread dédié: un pointage ne paie jamais un fsync."""
+    def __init__(self, fichier, taille_lot=500, delai_ecriture=0.2):
+        self.fichier = fichier
+        self.taille_lot = taille_lot
+        self.delai_ecriture = delai_ecriture
+        self._verrou = threading.Lock()
+        self._presences = {}   # cle -> (horodatage, station)
+        self._compteurs = {}   # evenement_id -> nombre de présents
+        self._a_ecrire = []
+        self._reveil = threading.Event()
+        self._arret = False
+        if os.path.exists(fichier):
+            with open(fichier, encoding="utf-8") as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        break  # dernière ligne tronquée par un arrêt brutal
+                    self._memoriser(entree["cle"], entree["t"], entree["station"])
+        self._ecrivain = threading.Thread(target=self._boucle_ecriture, name="ecriture-presences", daemon=True)
+        self._ecrivain.start()
+
+    def _memoriser(self, cle, horodatage, station):
+        if cle in self._presences:
+            return False
+        self._presences[cle] = (horodatage, station)
+        evenement_id = cle.split(":", 1)[0]
+        self._compteurs[evenement_id] = self._compteurs.get(evenement_id, 0) + 1
+        return True
+
+    def enregistrer(self, cle, station, horodatage=None):
+        """Retourne (nouveau, horodatage du premier pointage, station du premier pointage)."""
+        horodatage = time.time() if horodatage is None else horodatage
+        with self._verrou:
+            if not self._memoriser(cle, horodatage, station):
+                return (False,) + self._presences[cle]
+            self._a_ecrire.append({"cle": cle, "t": horodatage, "station": station})
+            if len(self._a_ecrire) >= self.taille_lot:
+                self._reveil.set()
+        return True, horodatage, station
+
+    def est_present(self, cle):
+        return cle in self._presences
+
+    def compteurs(self):
+        with self._verrou:
+            return dict(self._compteurs)
+
+    def _boucle_ecriture(self):
+        with open(self.fichier, "a", encoding="utf-8") as f:
+            while True:
+                self._reveil.wait(self.delai_ecriture)
+                self._reveil.clear()
+                with self._verrou:
+                    lot, self._a_ecrire = self._a_ecrire, []
+                    arret = self._arret
+                if lot:
+                    f.write("".join(json.dumps(entree, ensure_ascii=False) + "\n" for entree in lot))
+                    f.flush()
+                    os.fsync(f.fileno())
+                if arret:
+                    return
+
+    def fermer(self):
+        with self._verrou:
+            self._arret = True
+        self._reveil.set()
+        self._ecrivain.join()
+
+
+class ServicePointage:
+    """Vérifie le badge puis l'inscription (`inscription_valide(cle)`), et enregistre la présence."""
+    def __init__(self, generateur, registre, inscription_valide):
+        self.generateur = generateur
+        self.registre = registre
+        self._inscription_valide = inscription_valide
+
+    def pointer(self, jeton, station="?"):
+        try:
+            cle = self.generateur.verifier(jeton)
+        except ErreurBadge as e:
+            return {"statut": "refuse", "motif": str(e)}
+        if not self._inscription_valide(cle):
+            return {"statut": "refuse", "motif": "Aucune inscription validée pour ce badge.", "cle": cle}
+        nouveau, horodatage, station_initiale = self.registre.enregistrer(cle, station)
+        return {"statut": "accepte" if nouveau else "deja_pointe", "cle": cle,
+                "horodatage": horodatage, "station": station_initiale}
+
+
+class _GestionnairePointage(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # connexions persistantes: un scanner réutilise sa connexion
+    disable_nagle_algorithm = True  # en-têtes et corps partent sans attendre l'accusé de réception
+
+    def _repondre(self, code, contenu):
+        corps = json.dumps(contenu, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_POST(self):
+        if self.path != "/pointer":
+            return self._repondre(404, {"erreur": "introuvable"})
+        try:
+            demande = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            # Corps JSON arbitraire: un jeton ou une station d'un autre type est une requête invalide, pas une erreur 500.
+            if not isinstance(demande, dict) or not isinstance(demande.get("jeton"), str) or \
+                    not isinstance(demande.get("station", "?"), str):
+                raise ValueError("jeton ou station invalide")
+            resultat = self.server.service.pointer(demande["jeton"], demande.get("station", "?"))
+        except (ValueError, KeyError):
+            return self._repondre(400, {"erreur": "requête invalide"})
+        self._repondre(200, resultat)
+
+    def do_GET(self):
+        if self.path != "/compteurs":
+            return self._repondre(404, {"erreur": "introuvable"})
+        self._repondre(200, self.server.service.registre.compteurs())
+
+    def log_message(self, format, *args):
+        pass  # un message par pointage ralentirait le serveur sans rien apporter
+
+
+class ServeurPointage:
+    """Serveur HTTP local (un thread par connexion) auquel se connectent les postes de scan.
+    POST /pointer {"jeton", "station"} -> statut; GET /compteurs -> présents par événement."""
+    def __init__(self, service, hote="127.0.0.1", port=8765):
+        self._serveur = ThreadingHTTPServer((hote, port), _GestionnairePointage)
+        self._serveur.daemon_threads = True
+        self._serveur.service = service
+        self.adresse = self._serveur.server_address
+        self._thread = None
+
+    def demarrer(self):
+        self._thread = threading.Thread(target=self._serveur.serve_forever, name="serveur-pointage", daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+
+# --- Test de charge: plusieurs postes de scan simultanés ---
+def _poste_de_scan(adresse, station, jetons, latences):
+    import http.client
+    import socket
+    connexion = http.client.HTTPConnection(*adresse)
+    connexion.connect()
+    connexion.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    for jeton in jetons:
+        debut = time.perf_counter()
+        connexion.request("POST", "/pointer", json.dumps({"jeton": jeton, "station": station}),
+                          {"Content-Type": "application/json"})
+        connexion.getresponse().read()
+        latences.append(time.perf_counter() - debut)
+    connexion.close()
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    dossier = tempfile.mkdtemp(prefix="presences_")
+    generateur = GenerateurBadges(os.urandom(32))
+    registre = RegistrePresences(os.path.join(dossier, "presences.jsonl"))
+    inscrits = {cle_inscription("EV001", f"P{i:05d}") for i in range(20000)}
+    serveur = ServeurPointage(ServicePointage(generateur, registre, inscrits.__contains__), port=0).demarrer()
+
+    # 8 portes, 20000 badges dont 5% scannés deux fois et quelques badges falsifiés.
+    jetons = [generateur.emettre(cle) for cle in inscrits]
+    jetons += random.sample(jetons, 1000) + [jeton[:-2] + "AA" for jeton in jetons[:50]]
+    random.shuffle(jetons)
+    nb_postes = 8
+    latences = []
+    debut = time.perf_counter()
+    postes = [threading.Thread(target=_poste_de_scan, args=(serveur.adresse, f"porte-{n}", jetons[n::nb_postes], latences))
+              for n in range(nb_postes)]
+    for poste in postes:
+        poste.start()
+    for poste in postes:
+        poste.join()
+    duree = time.perf_counter() - debut
+    latences.sort()
+    print(f"{len(jetons)} pointages depuis {nb_postes} postes en {duree:.2f}s ({len(jetons) / duree:,.0f}/s)")
+    print(f"Latence p50 {latences[len(latences) // 2] * 1000:.2f} ms, p99 {latences[int(len(latences) * 0.99)] * 1000:.2f} ms, "
+          f"max {latences[-1] * 1000:.2f} ms")
+    print(f"Présents: {registre.compteurs()}")
+    serveur.arreter()
+    registre.fermer()
@@ -0,0 +1,363 @@
+# --- Moteur de digest et de limitation de débit des notifications ---
+import sqlite3
+import time
+from collections import deque
+
+
+class SeauJetons:
+    """Seau à jetons: autorise des rafales de `capacite` envois puis `debit` envois par seconde."""
+    def __init__(self, capacite, debit, horloge=time.monotonic):
+        self.capacite = capacite
+        self.debit = debit
+        self._horloge = horloge
+        self._jetons = float(capacite)
+        self._derniere_recharge = horloge()
+
+    def _recharger(self):
+        maintenant = self._horloge()
+        self._jetons = min(self.capacite, self._jetons + (maintenant - self._derniere_recharge) * self.debit)
+        self._derniere_recharge = maintenant
+
+    def consommer(self, nombre=1):
+        self._recharger()
+        if self._jetons >= nombre:
+            self._jetons -= nombre
+            return True
+        return False
+
+    def est_plein(self):
+        # Seau entièrement rechargé: équivalent à un seau neuf.
+        self._recharger()
+        return self._jetons >= self.capacite
+
+
+class _FenetreDigest:
+    """Notifications en attente pour un (canal, destinataire), regroupées par événement."""
+    def __init__(self, echeance):
+        self.echeance = echeance
+        self.par_evenement = {}  # {evenement_id: {type_message: (message, nombre)}}
+
+    def ajouter(self, evenement_id, type_message, message):
+        messages = self.par_evenement.setdefault(evenement_id, {})
+        _, nombre = messages.get(type_message, (None, 0))
+        # Seul le dernier message d'un même type est conservé (ex: descriptions successives).
+        messages[type_message] = (message, nombre + 1)
+
+
+class MoteurDigest:
+    """Regroupe les notifications par destinataire et par canal sur une fenêtre de temps,
+    fusionne celles d'un même événement en un seul digest et limite le débit de chaque canal.
+
+    `envoyeur(canal, destinataire, sujet, corps)` est appelé pour chaque digest émis.
+    """
+    def __init__(self, envoyeur, fenetre_secondes=60, limites=None, horloge=time.monotonic):
+        self.envoyeur = envoyeur
+        self.fenetre_secondes = fenetre_secondes
+        self.limites = limites if limites is not None else {}  # {canal: SeauJetons}
+        self._horloge = horloge
+        self._fenetres = {}  # {(canal, destinataire): _FenetreDigest}
+        # Destinataires par canal dans l'ordre des échéances (fenêtre constante, horloge monotone):
+        # un passage ne parcourt que les fenêtres échues, en tête de file.
+        self._echeances = {}  # {canal: deque de destinataires}
+        self.nb_soumises = 0
+        self.nb_envoyees = 0
+        self.nb_differees = 0
+
+    def soumettre(self, canal, destinataire, evenement_id, type_message, message):
+        cle = (canal, destinataire)
+        fenetre = self._fenetres.get(cle)
+        if fenetre is None:
+            fenetre = self._fenetres[cle] = _FenetreDigest(self._horloge() + self.fenetre_secondes)
+            self._echeances.setdefault(canal, deque()).append(destinataire)
+        fenetre.ajouter(evenement_id, type_message, message)
+        self.nb_soumises += 1
+
+    def vider(self, forcer=False):
+        """Émet les digests dont la fenêtre est échue, dans la limite des jetons: les digests refusés par
+        le limiteur restent en attente jusqu'au prochain appel. `forcer` (fermeture de l'application)
+        émet tous les digests en attente sans passer par le limiteur, pour n'en perdre aucun."""
+        maintenant = self._horloge()
+        envoyes = 0
+        for canal, file in self._echeances.items():
+            seau = None if forcer else self.limites.get(canal)
+            while file:
+                destinataire = file[0]
+                fenetre = self._fenetres[(canal, destinataire)]
+                if not forcer and fenetre.echeance > maintenant:
+                    break
+                if seau is not None and not seau.consommer():
+                    # Canal saturé: ses fenêtres échues attendent le prochain passage.
+                    self.nb_differees += 1
+                    break
+                file.popleft()
+                del self._fenetres[(canal, destinataire)]
+                sujet, corps = self._composer(fenetre)
+                self.envoyeur(canal, destinataire, sujet, corps)
+                envoyes += 1
+        self.nb_envoyees += envoyes
+        return envoyes
+
+    def prochaine_echeance(self):
+        echeances = [self._fenetres[(canal, file[0])].echeance for canal, file in self._echeances.items() if file]
+        return min(echeances) if echeances else None
+
+    def en_attente(self):
+        return len(self._fenetres)
+
+    def echeance_nouvelle(self):
+        """Échéance d'une fenêtre ouverte maintenant: tout ce qui est soumis avant est émis au plus tard
+        quand `prochaine_echeance()` la dépasse."""
+        return self._horloge() + self.fenetre_secondes
+
+    def taux_reduction(self):
+        """Nombre de notifications soumises par message réellement envoyé."""
+        return self.nb_soumises / self.nb_envoyees if self.nb_envoyees else 0.0
+
+    def _composer(self, fenetre):
+        total = sum(nombre for messages in fenetre.par_evenement.values() for _, nombre in messages.values())
+        if total == 1:
+            (messages,) = fenetre.par_evenement.values()
+            ((message, _),) = messages.values()
+            return "Notification", message
+        lignes = []
+        for evenement_id, messages in fenetre.par_evenement.items():
+            for message, nombre in messages.values():
+                suffixe = f" (x{nombre})" if nombre > 1 else ""
+                lignes.append(f"[{evenement_id}] {message}{suffixe}")
+        return f"Résumé de {total} notifications", " | ".join(lignes)
+
+
+class SuiviDiffusions:
+    """Avancement des diffusions en cours, dans SQLite (une ligne par diffusion, supprimée une fois
+    tous ses messages émis): une diffusion interrompue par un arrêt brutal reprend au redémarrage."""
+    def __init__(self, chemin):
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS diffusions (id INTEGER PRIMARY KEY, canal TEXT, "
+                                "evenement_id TEXT, type_message TEXT, message TEXT, position INTEGER, fin INTEGER)")
+        self._connexion.commit()
+
+    def ouvrir(self, canal, evenement_id, type_message, message, fin):
+        curseur = self._connexion.execute("INSERT INTO diffusions (canal, evenement_id, type_message, message, position, fin) "
+                                          "VALUES (?, ?, ?, ?, 0, ?)", (canal, evenement_id, type_message, message, fin))
+        self._connexion.commit()
+        return curseur.lastrowid
+
+    def avancer(self, diffusion_id, position):
+        self._connexion.execute("UPDATE diffusions SET position = ? WHERE id = ?", (position, diffusion_id))
+
+    def terminer(self, diffusion_id):
+        self._connexion.execute("DELETE FROM diffusions WHERE id = ?", (diffusion_id,))
+
+    def valider(self):
+        self._connexion.commit()
+
+    def en_cours(self):
+        """[(id, canal, evenement_id, type_message, message, position, fin)] dans l'ordre de lancement."""
+        return self._connexion.execute("SELECT id, canal, evenement_id, type_message, message, position, fin "
+                                       "FROM diffusions ORDER BY id").fetchall()
+
+    def fermer(self):
+        self._connexion.close()
+
+
+class DiffusionParLots:
+    """Diffusions d'un message aux inscrits d'un événement, soumises au digest par lots de `taille_lot`.
+
+    Une diffusion garde une référence vers la séquence des destinataires (sans la copier) et sa position:
+    seuls les destinataires présents au lancement sont servis, même si la liste s'allonge ensuite.
+    `adresse(destinataire)` donne l'adresse sur le canal. `filtre(destinataire)`, évalué au moment de l'envoi,
+    écarte des destinataires (inscriptions annulées...) et `cle(destinataire)` dédoublonne (un participant
+    inscrit à plusieurs séances ne reçoit qu'un message). `par_lot(destinataires, evenement_id, type_message,
+    message)` reçoit, après chaque lot, les destinataires qu'il a servis (dépôt dans les boîtes de réception...). Tant que le digest retient `plafond` envois,
+    les lots suivants attendent le prochain passage: durée d'un passage et mémoire restent bornées,
+    quel que soit le nombre d'inscrits.
+
+    Avec un `suivi` (SuiviDiffusions), `confirmer()` enregistre la position de chaque diffusion dès que
+    le digest a émis les lots qui la précèdent, et `reprendre()` relance au démarrage les diffusions
+    interrompues depuis cette position (au pire, les derniers lots sont envoyés deux fois).
+    """
+    def __init__(self, digest, taille_lot=500, plafond=5000, suivi=None):
+        self.digest = digest
+        self.taille_lot = taille_lot
+        self.plafond = plafond
+        self.suivi = suivi
+        # [destinataires, position, fin, canal, adresse, evenement_id, type_message, message, filtre, cle, clés déjà servies,
+        #  par_lot, id dans le suivi, points de reprise [(position, échéance)] pas encore émis]
+        self._diffusions = deque()
+        # Diffusions suivies dont les derniers lots ne sont pas encore tous émis par le digest.
+        self._a_confirmer = []
+
+    def diffuser(self, canal, destinataires, adresse, evenement_id, type_message, message, filtre=None, cle=None,
+                 par_lot=None):
+        if destinataires:
+            diffusion_id = None
+            if self.suivi:
+                diffusion_id = self.suivi.ouvrir(canal, evenement_id, type_message, message, len(destinataires))
+            self._lancer(destinataires, 0, len(destinataires), canal, adresse, evenement_id, type_message, message,
+                         filtre, cle, set(), par_lot, diffusion_id)
+
+    def _lancer(self, *diffusion):
+        diffusion = [*diffusion, deque()]
+        self._diffusions.append(diffusion)
+        if diffusion[12] is not None:
+            self._a_confirmer.append(diffusion)
+
+    def reprendre(self, destinataires_evenement, adresse, filtre=None, cle=None, par_lot=None):
+        """Relance les diffusions interrompues. `destinataires_evenement(evenement_id)` redonne la séquence
+        des destinataires (None si l'événement n'existe plus). Retourne le nombre de diffusions relancées."""
+        if not self.suivi:
+            return 0
+        reprises = 0
+        for diffusion_id, canal, evenement_id, type_message, message, position, fin in self.suivi.en_cours():
+            destinataires = destinataires_evenement(evenement_id)
+            fin = min(fin, len(destinataires or ()))
+            if position >= fin:
+                self.suivi.terminer(diffusion_id)
+                continue
+            # Clés des destinataires servis avant l'interruption: pas de second message pour eux.
+            deja_servis = set()
+            if cle is not None:
+                deja_servis = {cle(d) for d in destinataires[:position] if filtre is None or filtre(d)}
+            self._lancer(destinataires, position, fin, canal, adresse, evenement_id, type_message, message,
+                         filtre, cle, deja_servis, par_lot, diffusion_id)
+            reprises += 1
+        self.suivi.valider()
+        return reprises
+
+    def traiter(self, forcer=False):
+        """Soumet au plus un lot (toutes les diffusions si `forcer`). Retourne le nombre de destinataires parcourus."""
+        budget = float("inf") if forcer else min(self.taille_lot, self.plafond - self.digest.en_attente())
+        servis = 0
+        while self._diffusions and budget > 0:
+            diffusion = self._diffusions[0]
+            destinataires, position, fin, canal, adresse, evenement_id, type_message, message, filtre, cle, deja_servis, \
+                par_lot, diffusion_id, reprises = diffusion
+            limite = fin if forcer else min(fin, position + budget)
+            lot = []
+            for i in range(position, limite):
+                destinataire = destinataires[i]
+                if filtre is not None and not filtre(destinataire):
+                    continue
+                if cle is not None:
+                    valeur = cle(destinataire)
+                    if valeur in deja_servis:
+                        continue
+                    deja_servis.add(valeur)
+                self.digest.soumettre(canal, adresse(destinataire), evenement_id, type_message, message)
+                lot.append(destinataire)
+            if par_lot is not None and lot:
+                par_lot(lot, evenement_id, type_message, message)
+            servis += limite - position
+            budget -= limite - position
+            diffusion[1] = limite
+            if diffusion_id is not None:
+                reprises.append((limite, self.digest.echeance_nouvelle()))
+            if limite == fin:
+                self._diffusions.popleft()
+        return servis
+
+    def confirmer(self):
+        """Enregistre dans le suivi la position des diffusions dont le digest a émis les lots (après `vider`)."""
+        if not self._a_confirmer:
+            return
+        prochaine = self.digest.prochaine_echeance()
+        restantes = []
+        for diffusion in self._a_confirmer:
+            fin, diffusion_id, reprises = diffusion[2], diffusion[12], diffusion[13]
+            position = None
+            while reprises and (prochaine is None or reprises[0][1] < prochaine):
+                position = reprises.popleft()[0]
+            if position == fin:
+                self.suivi.terminer(diffusion_id)
+                continue
+            if position is not None:
+                self.suivi.avancer(diffusion_id, position)
+            restantes.append(diffusion)
+        self._a_confirmer = restantes
+        self.suivi.valider()
+
+    def en_cours(self):
+        return sum(fin - position for _, position, fin, *_ in self._diffusions)
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    instant = [0.0]
+    horloge = lambda: instant[0]
+    messages_envoyes = []
+
+    moteur = MoteurDigest(lambda canal, dest, sujet, corps: messages_envoyes.append((canal, dest, sujet)),
+                          fenetre_secondes=60,
+                          limites={"email": SeauJetons(100, 10, horloge), "sms": SeauJetons(20, 2, horloge)},
+                          horloge=horloge)
+
+    participants = [f"etudiant{i}@univ.com" for i in range(500)]
+    # Période chargée: 50 modifications de description puis une validation en masse.
+    for version in range(50):
+        for email in participants:
+            moteur.soumettre("email", email, "EV001", "mise_a_jour_evenement", f"Description v{version}")
+        instant[0] += 1
+    for email in participants:
+        moteur.soumettre("sms", email, "EV001", "inscription_validee", "Votre inscription est validée.")
+
+    while moteur.en_attente():
+        instant[0] += 1
+        moteur.vider()
+
+    print(f"Notifications soumises: {moteur.nb_soumises}, messages envoyés: {moteur.nb_envoyees} "
+          f"(réduction x{moteur.taux_reduction():.0f}, {moteur.nb_differees} reports dus au limiteur)")
+
+    # Fermeture: un vidage forcé émet tout ce qui reste, même au-delà des jetons disponibles.
+    for email in participants:
+        moteur.soumettre("email", email, "EV001", "annulation_evenement", "L'événement est annulé.")
+    envoyes = moteur.vider(forcer=True)
+    print(f"Vidage forcé: {envoyes} digests émis malgré le limiteur, {moteur.en_attente()} en attente")
+    assert envoyes == len(participants) and not moteur.en_attente()
+
+    # Annulation d'un très grand événement: diffusion par lots, passages de durée et de mémoire bornées.
+    moteur = MoteurDigest(lambda canal, dest, sujet, corps: None, fenetre_secondes=0,
+                          limites={"email": SeauJetons(1000, 1000, horloge)}, horloge=horloge)
+    diffusion = DiffusionParLots(moteur)
+    inscrits = [f"etudiant{i}@univ.com" for i in range(200000)]
+    diffusion.diffuser("email", inscrits, str, "EV002", "annulation_evenement", "L'événement est annulé.")
+    passages, pire_passage, pic_attente = 0, 0.0, 0
+    while diffusion.en_cours() or moteur.en_attente():
+        debut = time.perf_counter()
+        diffusion.traiter()
+        pic_attente = max(pic_attente, moteur.en_attente())
+        moteur.vider()
+        pire_passage = max(pire_passage, time.perf_counter() - debut)
+        instant[0] += 1
+        passages += 1
+    print(f"Annulation: {len(inscrits)} inscrits prévenus en {passages} passages (1/s simulé), passage le plus long "
+          f"{pire_passage * 1000:.1f} ms, au plus {pic_attente} notifications en attente")
+
+    # Arrêt brutal au milieu d'une diffusion suivie: la reprise repart de la dernière position confirmée.
+    import os
+    import tempfile
+    chemin = os.path.join(tempfile.mkdtemp(prefix="diffusions_"), "rappels.sqlite")
+    recus = []
+    moteur = MoteurDigest(lambda canal, dest, sujet, corps: recus.append(dest), fenetre_secondes=30, horloge=horloge)
+    diffusion = DiffusionParLots(moteur, suivi=SuiviDiffusions(chemin))
+    inscrits = [f"etudiant{i}@univ.com" for i in range(20000)]
+    diffusion.diffuser("email", inscrits, str, "EV003", "annulation_evenement", "L'événement est annulé.")
+    for _ in range(35):
+        diffusion.traiter()
+        moteur.vider()
+        diffusion.confirmer()
+        instant[0] += 1
+    emis_avant = len(recus)  # le processus s'arrête ici: les digests encore en attente sont perdus
+    recus.clear()
+    moteur = MoteurDigest(lambda canal, dest, sujet, corps: recus.append(dest), fenetre_secondes=30, horloge=horloge)
+    diffusion = DiffusionParLots(moteur, suivi=SuiviDiffusions(chemin))
+    reprises = diffusion.reprendre(lambda evenement_id: inscrits, str)
+    while diffusion.en_cours() or moteur.en_attente():
+        diffusion.traiter()
+        moteur.vider()
+        diffusion.confirmer()
+        instant[0] += 1
+    manquants = set(inscrits) - set(recus) - set(inscrits[:emis_avant])
+    print(f"Reprise après arrêt: {emis_avant} émis avant l'arrêt, {reprises} diffusion reprise, {len(recus)} émis "
+          f"ensuite, {len(manquants)} inscrit(s) jamais prévenu(s), suivi vide: {not diffusion.suivi.en_cours()}")
+    assert not manquants and not diffusion.suivi.en_cours()
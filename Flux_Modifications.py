@@ -0,0 +1,319 @@
+# --- Flux des modifications: séquence ordonnée des mutations, reprise, diffusion Server-Sent Events ---
+import asyncio
+import http.client
+import json
+import threading
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+# Mutations dont une occurrence plus récente remplace la précédente (mêmes champs, valeurs absolues):
+# seules celles-ci sont regroupées pour un client en retard. Les créations ne le sont jamais.
+OPERATIONS_COALESCABLES = {"mettre_a_jour_description": "id", "modifier_places": "id", "modifier_date": "id",
+                           "mettre_a_jour_participant": "id",
+                           "valider_inscription": "index", "mettre_en_attente": "index", "annuler_inscription": "index"}
+
+
+def cle_coalescence(operation, donnees):
+    champ = OPERATIONS_COALESCABLES.get(operation)
+    return (operation, donnees[champ]) if champ else None
+
+
+def encoder_trame(seq, operation, donnees):
+    """Trame Server-Sent Events, encodée une seule fois quel que soit le nombre d'abonnés."""
+    return f"id: {seq}\nevent: {operation}\ndata: {json.dumps(donnees, ensure_ascii=False, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class FluxModifications:
+    """Dernières mutations publiées (séquence du journal), pour la reprise après une déconnexion.
+
+    `instantane()` retourne l'état complet (JSON, en octets) à une séquence donnée: un client trop en
+    retard pour l'historique conservé repart de là. Le verrou est réentrant pour que l'application
+    puisse journaliser et publier sous le même verrou que celui de l'instantané.
+    """
+    def __init__(self, capacite=50000, instantane=None):
+        self.verrou = threading.RLock()
+        self.seq = 0
+        self._entrees = deque(maxlen=capacite)  # (seq, clé de coalescence, trame)
+        self._abonnes = []
+        self.instantane = instantane
+
+    def abonner(self, rappel):
+        """`rappel(seq, cle, trame)` est appelé à chaque publication, dans le thread qui publie."""
+        self._abonnes.append(rappel)
+
+    def publier(self, seq, operation, donnees):
+        entree = (seq, cle_coalescence(operation, donnees), encoder_trame(seq, operation, donnees))
+        with self.verrou:
+            self._entrees.append(entree)
+            self.seq = seq
+        for rappel in self._abonnes:
+            rappel(*entree)
+
+    def depuis(self, seq):
+        """Entrées de séquence > seq, ou None si une partie a déjà quitté l'historique."""
+        with self.verrou:
+            if seq >= self.seq:
+                return []
+            if not self._entrees or self._entrees[0][0] > seq + 1:
+                return None
+            return [entree for entree in self._entrees if entree[0] > seq]
+
+
+class _Abonne:
+    __slots__ = ("ecrivain", "en_attente", "reveil", "dernier_seq")
+
+    def __init__(self, ecrivain, dernier_seq):
+        self.ecrivain = ecrivain
+        self.en_attente = OrderedDict()  # clé de coalescence (ou seq) -> trame pas encore écrite
+        self.reveil = asyncio.Event()
+        self.dernier_seq = dernier_seq
+
+    def empiler(self, seq, cle, trame):
+        if seq <= self.dernier_seq:
+            return  # déjà envoyée avec l'historique de reprise
+        self.dernier_seq = seq
+        if cle is None:
+            cle = seq
+        elif cle in self.en_attente:
+            del self.en_attente[cle]  # remplacée par la nouvelle valeur, qui prend sa place dans l'ordre
+        self.en_attente[cle] = trame
+        self.reveil.set()
+
+
+class ServeurFlux:
+    """Diffusion du flux aux clients locaux (Server-Sent Events), une boucle asyncio pour tous.
+
+    GET /flux?depuis=N (ou en-tête Last-Event-ID): l'historique après N puis les mutations en direct.
+    GET /etat: instantané complet {"seq", "etat"}. Chaque client a sa file de trames non écrites:
+    quand il lit lentement, le tampon d'écriture plafonne (contre-pression) et les modifications
+    successives d'une même entité y sont regroupées. Au-delà de `limite_client` trames, le client est
+    déconnecté: il reprend de sa dernière séquence reçue.
+    """
+    INTERVALLE_PING = 15
+
+    def __init__(self, flux, hote="127.0.0.1", port=8766, limite_client=5000, tampon_ecriture=256 * 1024):
+        self.flux = flux
+        self.hote = hote
+        self.port = port
+        self.limite_client = limite_client
+        self.tampon_ecriture = tampon_ecriture
+        self.adresse = None
+        self._abonnes = set()
+        self._boucle = None
+        self._serveur = None
+        self._thread = None
+        self._pret = threading.Event()
+        flux.abonner(self._publie)
+
+    def demarrer(self):
+        self._thread = threading.Thread(target=self._executer, name="serveur-flux", daemon=True)
+        self._thread.start()
+        self._pret.wait()
+        return self
+
+    def arreter(self):
+        if self._boucle:
+            asyncio.run_coroutine_threadsafe(self._fermer(), self._boucle).result()
+            self._boucle.call_soon_threadsafe(self._boucle.stop)
+            self._thread.join()
+
+    async def _fermer(self):
+        self._serveur.close()
+        for abonne in list(self._abonnes):
+            abonne.ecrivain.close()
+            abonne.reveil.set()  # la boucle d'envoi du client constate la fermeture et se termine
+        connexions = [tache for tache in asyncio.all_tasks() if tache is not asyncio.current_task()]
+        if connexions:
+            await asyncio.wait(connexions, timeout=1)
+
+    def nb_abonnes(self):
+        return len(self._abonnes)
+
+    def _executer(self):
+        self._boucle = asyncio.new_event_loop()
+        self._serveur = self._boucle.run_until_complete(
+            asyncio.start_server(self._accueillir, self.hote, self.port, backlog=4096))
+        self.adresse = self._serveur.sockets[0].getsockname()[:2]
+        self._pret.set()
+        try:
+            self._boucle.run_forever()
+        finally:
+            self._boucle.close()
+
+    def _publie(self, seq, cle, trame):
+        # Appelé dans le thread qui publie: la diffusion se fait dans la boucle du serveur.
+        if self._boucle and self._abonnes:
+            self._boucle.call_soon_threadsafe(self._diffuser, seq, cle, trame)
+
+    def _diffuser(self, seq, cle, trame):
+        for abonne in list(self._abonnes):
+            abonne.empiler(seq, cle, trame)
+            if len(abonne.en_attente) > self.limite_client:
+                self._abonnes.discard(abonne)
+                abonne.ecrivain.close()
+
+    async def _accueillir(self, lecteur, ecrivain):
+        try:
+            requete = await lecteur.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            ecrivain.close()
+            return
+        lignes = requete.decode("latin-1").split("\r\n")
+        methode, cible = lignes[0].split(" ")[:2]
+        entetes = {nom.strip().lower(): valeur.strip() for nom, _, valeur in (l.partition(":") for l in lignes[1:] if l)}
+        url = urlsplit(cible)
+        if methode == "GET" and url.path == "/flux":
+            depuis = parse_qs(url.query).get("depuis", [entetes.get("last-event-id", "0")])[0]
+            await self._servir_flux(ecrivain, int(depuis) if depuis.isdigit() else 0)
+        elif methode == "GET" and url.path == "/etat" and self.flux.instantane:
+            corps = await asyncio.get_running_loop().run_in_executor(None, self.flux.instantane)
+            await self._repondre(ecrivain, 200, "application/json; charset=utf-8", corps)
+        else:
+            await self._repondre(ecrivain, 404, "text/plain; charset=utf-8", b"introuvable")
+
+    async def _repondre(self, ecrivain, code, type_contenu, corps):
+        ecrivain.write(f"HTTP/1.1 {code} {http.client.responses[code]}\r\nContent-Type: {type_contenu}\r\n"
+                       f"Content-Length: {len(corps)}\r\nConnection: close\r\n\r\n".encode("latin-1") + corps)
+        try:
+            await ecrivain.drain()
+        except ConnectionError:
+            pass
+        ecrivain.close()
+
+    async def _servir_flux(self, ecrivain, depuis):
+        ecrivain.transport.set_write_buffer_limits(high=self.tampon_ecriture)
+        ecrivain.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                       b"Connection: keep-alive\r\n\r\n")
+        # Historique et inscription dans la même étape de la boucle: aucune publication ne passe entre les deux.
+        historique = self.flux.depuis(depuis)
+        abonne = _Abonne(ecrivain, depuis)
+        if historique is None:
+            abonne.dernier_seq = self.flux.seq
+            ecrivain.write(encoder_trame(self.flux.seq, "reinitialiser", {"seq": self.flux.seq}))
+        else:
+            for entree in historique:
+                abonne.empiler(*entree)
+        self._abonnes.add(abonne)
+        try:
+            while not ecrivain.is_closing():
+                try:
+                    await asyncio.wait_for(abonne.reveil.wait(), self.INTERVALLE_PING)
+                except asyncio.TimeoutError:
+                    ecrivain.write(b": ping\n\n")  # détecte les clients disparus
+                abonne.reveil.clear()
+                if abonne.en_attente:
+                    lot = b"".join(abonne.en_attente.values())
+                    abonne.en_attente.clear()
+                    ecrivain.write(lot)
+                # Attend que le tampon redescende: pendant ce temps, les nouvelles trames s'accumulent
+                # (et se regroupent) dans la file du client au lieu du tampon du socket.
+                await ecrivain.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._abonnes.discard(abonne)
+            ecrivain.close()
+
+
+# --- Client (autre instance de l'application, outils) ---
+def lire_instantane(hote, port):
+    """Retourne (seq, etat) servis par GET /etat."""
+    connexion = http.client.HTTPConnection(hote, port, timeout=60)
+    try:
+        connexion.request("GET", "/etat")
+        contenu = json.loads(connexion.getresponse().read())
+    finally:
+        connexion.close()
+    return contenu["seq"], contenu["etat"]
+
+
+def suivre_flux(hote, port, depuis, rappel, arret, delai_reconnexion=1.0):
+    """Lit le flux jusqu'à `arret.set()` et appelle `rappel(seq, operation, donnees)` pour chaque trame.
+    Après une coupure, reprend après la dernière séquence reçue. Pensé pour un thread dédié."""
+    while not arret.is_set():
+        try:
+            connexion = http.client.HTTPConnection(hote, port, timeout=ServeurFlux.INTERVALLE_PING * 2)
+            connexion.request("GET", f"/flux?depuis={depuis}")
+            reponse = connexion.getresponse()
+            seq, operation, donnees = None, None, []
+            while not arret.is_set():
+                ligne = reponse.readline()
+                if not ligne:
+                    break
+                ligne = ligne.decode("utf-8").rstrip("\n")
+                if ligne.startswith("id: "):
+                    seq = int(ligne[4:])
+                elif ligne.startswith("event: "):
+                    operation = ligne[7:]
+                elif ligne.startswith("data: "):
+                    donnees.append(ligne[6:])
+                elif not ligne and operation:
+                    rappel(seq, operation, json.loads("\n".join(donnees)))
+                    depuis = seq
+                    seq, operation, donnees = None, None, []
+            connexion.close()
+        except (OSError, http.client.HTTPException):
+            pass
+        arret.wait(delai_reconnexion)
+
+
+# --- Test de charge: milliers de clients, dont quelques-uns qui ne lisent presque plus ---
+if __name__ == "__main__":
+    import random
+    import time
+
+    async def client(adresse, recus, lent):
+        lecteur, ecrivain = await asyncio.open_connection(*adresse, limit=2 ** 20)
+        ecrivain.write(b"GET /flux?depuis=0 HTTP/1.1\r\nHost: x\r\n\r\n")
+        await lecteur.readuntil(b"\r\n\r\n")
+        while True:
+            if lent:
+                await asyncio.sleep(0.5)
+            bloc = await lecteur.read(65536 if not lent else 4096)
+            if not bloc:
+                return
+            recus.append(bloc)
+
+    def lancer_clients(boucle, adresse, nb, nb_lents, resultats, pret):
+        taches = []
+        for i in range(nb):
+            recus = []
+            resultats.append((i < nb_lents, recus))
+            taches.append(boucle.create_task(client(adresse, recus, i < nb_lents)))
+        boucle.call_later(1.0, pret.set)
+        boucle.run_until_complete(asyncio.gather(*taches, return_exceptions=True))
+        boucle.close()
+
+    flux = FluxModifications()
+    serveur = ServeurFlux(flux, port=0, limite_client=20000).demarrer()
+    nb_clients, nb_lents = 2000, 20
+    resultats, pret, boucle_clients = [], threading.Event(), asyncio.new_event_loop()
+    thread_clients = threading.Thread(target=lancer_clients, args=(boucle_clients, serveur.adresse, nb_clients, nb_lents,
+                                                                   resultats, pret))
+    thread_clients.start()
+    pret.wait()
+    print(f"{serveur.nb_abonnes()} clients connectés")
+
+    random.seed(1)
+    nb_mutations = 2000
+    debut = time.perf_counter()
+    for seq in range(1, nb_mutations + 1):
+        if seq % 10 == 0:
+            flux.publier(seq, "creer_evenement", {"id": f"EV{seq:06d}", "nom": f"Événement {seq}"})
+        else:
+            flux.publier(seq, "mettre_a_jour_description", {"id": f"EV{random.randrange(200):06d}",
+                                                            "description": "x" * 80, "version": seq})
+    duree_publication = time.perf_counter() - debut
+    derniere = f"id: {nb_mutations}\n".encode()
+    while not all(derniere in b"".join(recus[-2:]) for lent, recus in resultats if not lent):
+        time.sleep(0.05)
+    duree = time.perf_counter() - debut
+    print(f"{nb_mutations} mutations publiées en {duree_publication:.2f}s, reçues par les "
+          f"{nb_clients - nb_lents} clients rapides en {duree:.2f}s ({nb_mutations * (nb_clients - nb_lents) / duree:,.0f} trames/s)")
+    time.sleep(3)
+    trames_lents = [b"".join(recus).count(b"\n\n") for lent, recus in resultats if lent]
+    print(f"Clients lents: {min(trames_lents)}-{max(trames_lents)} trames reçues (au lieu de {nb_mutations}), "
+          f"les mises à jour d'une même entité étant regroupées pendant qu'ils ne lisaient pas")
+    boucle_clients.call_soon_threadsafe(lambda: [tache.cancel() for tache in asyncio.all_tasks(boucle_clients)])
+    thread_clients.join()
+    serveur.arreter()
@@ -0,0 +1,273 @@
+# --- Journal d'écriture anticipée (WAL) et snapshots de l'état du domaine ---
+import json
+import os
+import time
+from datetime import date
+
+
+class EtatDomaine:
+    """Vue matérialisée et sérialisable de l'état du domaine, reconstruite à partir du journal."""
+    def __init__(self, evenements=None, participants=None, inscriptions=None):
+        self.evenements = evenements if evenements is not None else {}
+        self.participants = participants if participants is not None else {}
+        self.inscriptions = inscriptions if inscriptions is not None else []
+
+    # Champs lus par chaque opération (vérifiés avant l'écriture au journal).
+    CHAMPS_REQUIS = {
+        "creer_evenement": ("id",),
+        "mettre_a_jour_description": ("id", "description"),
+        "creer_participant": ("id",),
+        "mettre_a_jour_participant": ("id", "nom", "est_etudiant"),
+        "inscrire_participant": ("participant_id", "evenement_id"),
+        "valider_inscription": ("index", "est_validee"),
+        "mettre_en_attente": ("index", "horodatage"),
+        "annuler_inscription": ("index",),
+        "modifier_places": ("id", "nombre_places"),
+        "modifier_date": ("id", "date"),
+        "annuler_evenement": ("id",),
+    }
+    OPERATIONS_SUR_EVENEMENT = {"mettre_a_jour_description", "modifier_places", "modifier_date", "annuler_evenement"}
+
+    def verifier(self, operation, donnees):
+        """Lève ValueError si `appliquer` échouerait, sans rien modifier."""
+        champs = self.CHAMPS_REQUIS.get(operation)
+        if champs is None:
+            raise ValueError(f"Opération de journal inconnue: {operation}")
+        manquants = [champ for champ in champs if champ not in donnees]
+        if manquants:
+            raise ValueError(f"{operation}: champ(s) manquant(s): {', '.join(manquants)}")
+        if operation in self.OPERATIONS_SUR_EVENEMENT and donnees["id"] not in self.evenements:
+            raise ValueError(f"{operation}: événement inconnu {donnees['id']!r}")
+        if operation == "mettre_a_jour_participant" and donnees["id"] not in self.participants:
+            raise ValueError(f"{operation}: participant inconnu {donnees['id']!r}")
+        if "index" in champs:
+            index = donnees["index"]
+            if not isinstance(index, int) or not 0 <= index < len(self.inscriptions):
+                raise ValueError(f"{operation}: inscription inconnue (index {index!r})")
+        if operation == "modifier_date":
+            try:
+                date.fromisoformat(donnees["date"])
+                date.fromisoformat(self.evenements[donnees["id"]]["date"])
+            except (TypeError, KeyError) as e:
+                raise ValueError(f"{operation}: date invalide ({e})")
+
+    def appliquer(self, operation, donnees):
+        if operation == "creer_evenement":
+            self.evenements[donnees["id"]] = dict(donnees)
+        elif operation == "mettre_a_jour_description":
+            evenement = self.evenements[donnees["id"]]
+            evenement["description"] = donnees["description"]
+            evenement["version"] = donnees.get("version", evenement.get("version", 1) + 1)
+        elif operation == "creer_participant":
+            self.participants[donnees["id"]] = dict(donnees)
+        elif operation == "mettre_a_jour_participant":
+            self.participants[donnees["id"]].update(nom=donnees["nom"], est_etudiant=donnees["est_etudiant"])
+        elif operation == "inscrire_participant":
+            self.inscriptions.append({"participant_id": donnees["participant_id"],
+                                      "evenement_id": donnees["evenement_id"],
+                                      "date_occurrence": donnees.get("date_occurrence"),
+                                      "date_inscription": donnees.get("date_inscription"),
+                                      "est_validee": False})
+        elif operation == "valider_inscription":
+            inscription = self.inscriptions[donnees["index"]]
+            inscription["est_validee"] = donnees["est_validee"]
+            # Validée ou refusée par les règles (y compris lors d'une promotion), elle quitte la liste d'attente.
+            inscription.pop("en_attente_depuis", None)
+        elif operation == "mettre_en_attente":
+            self.inscriptions[donnees["index"]]["en_attente_depuis"] = donnees["horodatage"]
+        elif operation == "annuler_inscription":
+            inscription = self.inscriptions[donnees["index"]]
+            inscription.update(est_annulee=True, est_validee=False)
+            inscription.pop("en_attente_depuis", None)
+        elif operation == "modifier_places":
+            evenement = self.evenements[donnees["id"]]
+            evenement["nombre_places"] = donnees["nombre_places"]
+            evenement["version"] = donnees.get("version", evenement.get("version", 1) + 1)
+        elif operation == "modifier_date":
+            # Les séances choisies à l'inscription glissent avec l'événement.
+            evenement = self.evenements[donnees["id"]]
+            decalage = date.fromisoformat(donnees["date"]) - date.fromisoformat(evenement["date"])
+            evenement["date"] = donnees["date"]
+            evenement["version"] = donnees.get("version", evenement.get("version", 1) + 1)
+            for inscription in self.inscriptions:
+                if inscription["evenement_id"] == donnees["id"] and inscription.get("date_occurrence"):
+                    inscription["date_occurrence"] = (date.fromisoformat(inscription["date_occurrence"]) + decalage).isoformat()
+        elif operation == "annuler_evenement":
+            # Une seule entrée pour l'événement et toutes ses inscriptions: l'annulation est atomique.
+            evenement = self.evenements[donnees["id"]]
+            evenement["est_annule"] = True
+            evenement["version"] = donnees.get("version", evenement.get("version", 1) + 1)
+            for inscription in self.inscriptions:
+                if inscription["evenement_id"] == donnees["id"] and not inscription.get("est_annulee"):
+                    inscription.update(est_annulee=True, est_validee=False, annulee_avec_evenement=True)
+                    inscription.pop("en_attente_depuis", None)
+        else:
+            raise ValueError(f"Opération de journal inconnue: {operation}")
+
+    def serialiser(self):
+        return {"evenements": self.evenements, "participants": self.participants, "inscriptions": self.inscriptions}
+
+    @classmethod
+    def deserialiser(cls, donnees):
+        return cls(donnees["evenements"], donnees["participants"], donnees["inscriptions"])
+
+
+class JournalEvenements:
+    """Journal append-only, segmenté, avec fsync groupé et snapshots compacts périodiques.
+
+    Chaque mutation reçoit un numéro de séquence croissant. Un snapshot fige l'état à une
+    séquence donnée et ouvre un nouveau segment : la reprise ne relit que la queue du journal.
+    """
+    FICHIER_SNAPSHOT = "snapshot.json"
+
+    def __init__(self, dossier, taille_lot=256, delai_fsync=0.05, snapshot_tous_les=10000, conserver_historique=False):
+        self.dossier = dossier
+        self.taille_lot = taille_lot
+        self.delai_fsync = delai_fsync
+        self.snapshot_tous_les = snapshot_tous_les
+        self.conserver_historique = conserver_historique
+        os.makedirs(dossier, exist_ok=True)
+
+        self.etat, self.seq_snapshot = self._charger_snapshot()
+        self.seq = self.seq_snapshot
+        # Entrées inapplicables (écrites par une version sans vérification préalable): ignorées à la reprise.
+        self.entrees_ignorees = 0
+        for entree in self._lire_segments(self.seq_snapshot):
+            try:
+                self.etat.verifier(entree["op"], entree["d"])
+            except ValueError:
+                self.entrees_ignorees += 1
+            else:
+                self.etat.appliquer(entree["op"], entree["d"])
+            self.seq = entree["seq"]
+
+        self._en_attente = 0
+        self._dernier_fsync = time.monotonic()
+        self._depuis_snapshot = self.seq - self.seq_snapshot
+        self._fichier = self._ouvrir_segment(self.seq + 1)
+
+    # --- Écriture ---
+    def ajouter(self, operation, donnees):
+        """Vérifie la mutation, l'ajoute au journal puis l'applique à l'état matérialisé. Retourne sa séquence.
+
+        Une mutation inapplicable (ValueError) n'est pas écrite: elle bloquerait chaque reprise. L'état ne
+        reflète jamais une mutation qu'une écriture échouée aurait laissée hors du journal."""
+        self.etat.verifier(operation, donnees)
+        ligne = json.dumps({"seq": self.seq + 1, "op": operation, "d": donnees}, ensure_ascii=False, separators=(",", ":"))
+        self._fichier.write(ligne + "\n")
+        self.seq += 1
+        self.etat.appliquer(operation, donnees)
+        self._en_attente += 1
+        self._depuis_snapshot += 1
+
+        if self._en_attente >= self.taille_lot or time.monotonic() - self._dernier_fsync >= self.delai_fsync:
+            self.vider()
+        if self.snapshot_tous_les and self._depuis_snapshot >= self.snapshot_tous_les:
+            self.ecrire_snapshot()
+        return self.seq
+
+    def vider(self):
+        """Force l'écriture sur disque (fsync) des entrées en attente."""
+        if self._en_attente:
+            self._fichier.flush()
+            os.fsync(self._fichier.fileno())
+            self._en_attente = 0
+        self._dernier_fsync = time.monotonic()
+
+    def ecrire_snapshot(self):
+        """Écrit atomiquement l'état courant puis démarre un nouveau segment de journal."""
+        self.vider()
+        chemin = os.path.join(self.dossier, self.FICHIER_SNAPSHOT)
+        temporaire = chemin + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "etat": self.etat.serialiser()}, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, chemin)
+
+        self._fichier.close()
+        if not self.conserver_historique:
+            for nom, _ in self._segments():
+                os.remove(os.path.join(self.dossier, nom))
+        self.seq_snapshot = self.seq
+        self._depuis_snapshot = 0
+        self._fichier = self._ouvrir_segment(self.seq + 1)
+
+    def fermer(self):
+        self.vider()
+        self._fichier.close()
+
+    # --- Lecture / rejeu ---
+    def relire(self, depuis_seq=0):
+        """Itère sur les entrées de séquence > depuis_seq encore présentes sur disque (réplicas, audits)."""
+        self.vider()
+        return self._lire_segments(depuis_seq)
+
+    def _lire_segments(self, depuis_seq):
+        segments = self._segments()
+        for i, (nom, premier_seq) in enumerate(segments):
+            # Un segment entièrement couvert par le suivant n'a pas besoin d'être ouvert.
+            if i + 1 < len(segments) and segments[i + 1][1] <= depuis_seq + 1:
+                continue
+            with open(os.path.join(self.dossier, nom), encoding="utf-8") as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée par un arrêt brutal: on l'ignore.
+                        break
+                    if entree["seq"] > depuis_seq:
+                        yield entree
+
+    def _segments(self):
+        segments = []
+        for nom in os.listdir(self.dossier):
+            if nom.startswith("journal-") and nom.endswith(".log"):
+                segments.append((nom, int(nom[len("journal-"):-len(".log")])))
+        return sorted(segments, key=lambda s: s[1])
+
+    def _ouvrir_segment(self, premier_seq):
+        chemin = os.path.join(self.dossier, f"journal-{premier_seq:012d}.log")
+        return open(chemin, "a", encoding="utf-8")
+
+    def _charger_snapshot(self):
+        chemin = os.path.join(self.dossier, self.FICHIER_SNAPSHOT)
+        if not os.path.exists(chemin):
+            return EtatDomaine(), 0
+        with open(chemin, encoding="utf-8") as f:
+            contenu = json.load(f)
+        return EtatDomaine.deserialiser(contenu["etat"]), contenu["seq"]
+
+
+# --- Exemple d'utilisation / benchmark ---
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    dossier = tempfile.mkdtemp(prefix="journal_bench_")
+    try:
+        # Pas un multiple de snapshot_tous_les: la reprise relit aussi une queue de journal après le snapshot.
+        nb_mutations = 230000
+        journal = JournalEvenements(dossier, snapshot_tous_les=50000)
+        debut = time.perf_counter()
+        for i in range(nb_mutations // 4):
+            ev_id = f"EV{i:06d}"
+            p_id = f"P{i:06d}"
+            journal.ajouter("creer_evenement", {"id": ev_id, "type": "Seminaire", "nom": f"Séminaire {i}",
+                                                "description": "Introduction", "date": "2025-10-05", "domaine": "Général"})
+            journal.ajouter("creer_participant", {"id": p_id, "nom": f"Étudiant {i}", "email": f"e{i}@univ.com", "est_etudiant": True})
+            journal.ajouter("inscrire_participant", {"participant_id": p_id, "evenement_id": ev_id})
+            journal.ajouter("mettre_a_jour_description", {"id": ev_id, "description": f"Version {i}"})
+        journal.fermer()
+        duree = time.perf_counter() - debut
+        print(f"Ajout: {nb_mutations} mutations en {duree:.2f}s ({nb_mutations / duree:,.0f} mutations/s)")
+
+        debut = time.perf_counter()
+        reprise = JournalEvenements(dossier)
+        duree = time.perf_counter() - debut
+        print(f"Reprise à froid: seq={reprise.seq} (snapshot à {reprise.seq_snapshot}, "
+              f"{reprise.seq - reprise.seq_snapshot} mutations rejouées), "
+              f"{len(reprise.etat.evenements)} événements en {duree * 1000:.1f} ms")
+        reprise.fermer()
+    finally:
+        shutil.rmtree(dossier)
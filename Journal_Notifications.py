@@ -0,0 +1,181 @@
+# --- Journal des notifications borné (tampon circulaire + archive compressée) ---
+import gzip
+import os
+import queue
+import threading
+from collections import deque
+
+
+class RechercheHistorique:
+    """Recherche exécutée par le fil d'archivage, après les lots confiés avant elle: l'interface interroge
+    `termine` puis lit `resultats`."""
+    def __init__(self, motif, lignes_memoire, limite):
+        self.motif = motif.lower()
+        self.resultats = []
+        self.termine = False
+        self._lignes_memoire = lignes_memoire
+        self._limite = limite
+        self._fin = threading.Event()
+
+    def executer(self, archives, verrou):
+        try:
+            # Archives énumérées et lues sous le verrou du journal: aucune rotation ne les déplace entre-temps.
+            with verrou:
+                for chemin in archives():
+                    if not os.path.exists(chemin):
+                        continue
+                    with gzip.open(chemin, "rt", encoding="utf-8") as f:
+                        for ligne in f:
+                            if self._retenir(ligne.rstrip("\n")):
+                                return
+            for ligne in self._lignes_memoire:
+                if self._retenir(ligne):
+                    return
+        except (OSError, EOFError):
+            # Archive tronquée (arrêt brutal): on garde les résultats obtenus.
+            pass
+        finally:
+            self.termine = True
+            self._fin.set()
+
+    def _retenir(self, ligne):
+        if self.motif in ligne.lower():
+            self.resultats.append(ligne)
+        return len(self.resultats) >= self._limite
+
+    def attendre(self, timeout=None):
+        self._fin.wait(timeout)
+        return self.resultats
+
+
+class JournalNotificationsBorne:
+    """Garde au plus `capacite` lignes en mémoire; les plus anciennes sont archivées par lots
+    dans un fichier gzip, lui-même tourné au-delà de `taille_max_archive` octets. Les archives tournées sont
+    numérotées (`.1` la plus récente, jusqu'à `.<nb_archives>`); au-delà, l'historique le plus ancien est supprimé.
+    Compression, rotation et recherches sont faites dans l'ordre par un fil d'archivage, hors de la boucle Tk."""
+    def __init__(self, capacite=500, fichier_archive="notifications.log.gz", taille_lot=200, taille_max_archive=5_000_000,
+                 nb_archives=5):
+        self.capacite = capacite
+        self.fichier_archive = fichier_archive
+        self.taille_lot = taille_lot
+        self.taille_max_archive = taille_max_archive
+        self.nb_archives = nb_archives
+        self._lignes = deque(maxlen=capacite)
+        self._a_afficher = []
+        self._a_archiver = []
+        self._non_ecrites = []  # lot dont l'écriture a échoué: repris avec le suivant
+        self._verrou = threading.Lock()  # fichiers d'archive: écriture, rotation, lecture
+        self._taches = queue.Queue()  # lots (listes de lignes) et recherches, dans l'ordre; None arrête le fil
+        self._archiviste = threading.Thread(target=self._boucle_archivage, name="archivage-notifications", daemon=True)
+        self._archiviste.start()
+
+    def ajouter(self, ligne):
+        if len(self._lignes) == self.capacite:
+            self._a_archiver.append(self._lignes[0])
+            if len(self._a_archiver) >= self.taille_lot:
+                self.archiver()
+        self._lignes.append(ligne)
+        self._a_afficher.append(ligne)
+
+    def extraire_nouvelles(self):
+        """Retourne les lignes ajoutées depuis le dernier appel (pour un rafraîchissement groupé du widget)."""
+        nouvelles, self._a_afficher = self._a_afficher, []
+        # Au-delà de la capacité, les premières lignes ne seraient de toute façon plus visibles.
+        return nouvelles[-self.capacite:]
+
+    def lignes(self):
+        return list(self._lignes)
+
+    def archiver(self):
+        """Confie les lignes sorties de la mémoire au fil d'archivage."""
+        if not self._a_archiver:
+            return
+        lot, self._a_archiver = self._a_archiver, []
+        self._taches.put(lot)
+
+    def _boucle_archivage(self):
+        while True:
+            tache = self._taches.get()
+            if tache is None:
+                return
+            if isinstance(tache, RechercheHistorique):
+                tache.executer(self.archives, self._verrou)
+            else:
+                self._ecrire_lot(tache)
+
+    def _ecrire_lot(self, lot):
+        lot, self._non_ecrites = self._non_ecrites + lot, []
+        try:
+            with self._verrou:
+                with gzip.open(self.fichier_archive, "at", encoding="utf-8") as f:
+                    f.write("\n".join(lot) + "\n")
+                if os.path.getsize(self.fichier_archive) > self.taille_max_archive:
+                    self._tourner()
+        except OSError:
+            # Disque plein, droits...: le lot est réessayé avec le suivant plutôt que perdu.
+            self._non_ecrites = lot
+
+    def _tourner(self):
+        # .1 -> .2 -> ... -> .<nb_archives>: la plus ancienne est écrasée, les autres sont conservées.
+        for numero in range(self.nb_archives - 1, 0, -1):
+            if os.path.exists(f"{self.fichier_archive}.{numero}"):
+                os.replace(f"{self.fichier_archive}.{numero}", f"{self.fichier_archive}.{numero + 1}")
+        os.replace(self.fichier_archive, self.fichier_archive + ".1")
+
+    def archives(self):
+        """Fichiers d'archive, du plus ancien au plus récent."""
+        return [f"{self.fichier_archive}.{numero}" for numero in range(self.nb_archives, 0, -1)] + [self.fichier_archive]
+
+    def rechercher(self, motif, limite=1000):
+        """Lance une recherche (insensible à la casse) sur l'archive puis la mémoire, sans bloquer l'appelant."""
+        # Les lignes à archiver partent avant la recherche: chaque ligne est lue une fois, archive ou mémoire.
+        self.archiver()
+        recherche = RechercheHistorique(motif, self.lignes(), limite)
+        if self._archiviste.is_alive():
+            self._taches.put(recherche)
+        else:
+            recherche.executer(self.archives, self._verrou)  # journal fermé: plus d'écriture concurrente
+        return recherche
+
+    def fermer(self):
+        # Les lignes encore en mémoire sont archivées aussi: l'historique d'une session survit au redémarrage.
+        self._a_archiver.extend(self._lignes)
+        self._lignes.clear()
+        self.archiver()
+        self._taches.put(None)
+        self._archiviste.join()
+
+
+# --- Exemple d'utilisation ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    dossier = tempfile.mkdtemp(prefix="notif_")
+    journal = JournalNotificationsBorne(capacite=1000, fichier_archive=os.path.join(dossier, "notifications.log.gz"))
+
+    debut = time.perf_counter()
+    pire = 0.0
+    for i in range(200000):
+        instant = time.perf_counter()
+        journal.ajouter(f"[NOTIFICATION] L'inscription de 'Étudiant {i}' à 'EV{i % 50:03d}' est maintenant validée.")
+        pire = max(pire, time.perf_counter() - instant)
+    en_memoire = len(journal.lignes())
+    journal.fermer()
+    print(f"200000 notifications en {time.perf_counter() - debut:.2f}s (pire ajout {pire * 1000:.2f} ms), "
+          f"{en_memoire} en mémoire avant fermeture, archive: {os.path.getsize(journal.fichier_archive) / 1024:.0f} Ko")
+
+    recherche = journal.rechercher("Étudiant 4242'")
+    print(f"Résultats: {recherche.attendre()}")
+
+    # Recherches pendant l'archivage et les rotations: chaque ligne est trouvée une fois, archive ou mémoire.
+    tournant = JournalNotificationsBorne(capacite=1000, fichier_archive=os.path.join(dossier, "tournant.log.gz"),
+                                         taille_max_archive=50_000, nb_archives=1000)
+    recherches = []
+    for i in range(100000):
+        tournant.ajouter(f"[RAPPEL J-1] 'Séminaire {i % 7}' pour Étudiant {i}")
+        if i % 10000 == 9999:
+            recherches.append((i + 1, tournant.rechercher("Séminaire 3'", limite=10 ** 6)))
+    print("Recherches pendant les rotations:", all(len(r.attendre()) == len(range(3, n, 7)) for n, r in recherches),
+          f"({len(recherches)} recherches, {sum(os.path.exists(a) for a in tournant.archives())} archives)")
+    tournant.fermer()
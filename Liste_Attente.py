@@ -0,0 +1,149 @@
+# --- Listes d'attente et promotion automatique des inscriptions ---
+import heapq
+import itertools
+import time
+
+PRIORITE_ETUDIANT = 0
+PRIORITE_AUTRE = 1
+
+
+class ListeAttente:
+    """File de priorité d'un événement: les étudiants d'abord, puis par ordre d'arrivée.
+    Les retraits sont paresseux (entrée marquée inactive), donc ajout et promotion restent en O(log n)."""
+    def __init__(self):
+        self._tas = []
+        self._entrees = {}  # cle -> [priorite, horodatage, numero, cle, active]
+        self._compteur = itertools.count()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, cle):
+        return cle in self._entrees
+
+    def ajouter(self, cle, est_etudiant, horodatage):
+        if cle in self._entrees:
+            return  # déjà en attente: la position d'origine est conservée
+        entree = [PRIORITE_ETUDIANT if est_etudiant else PRIORITE_AUTRE, horodatage, next(self._compteur), cle, True]
+        self._entrees[cle] = entree
+        heapq.heappush(self._tas, entree)
+
+    def retirer(self, cle):
+        entree = self._entrees.pop(cle, None)
+        if entree is not None:
+            entree[4] = False
+
+    def extraire(self):
+        """Retire et retourne la clé la plus prioritaire, ou None si la liste est vide."""
+        while self._tas:
+            entree = heapq.heappop(self._tas)
+            if entree[4]:
+                del self._entrees[entree[3]]
+                return entree[3]
+        return None
+
+
+class PlanificateurPromotions:
+    """Suit les places occupées et les listes d'attente de chaque événement.
+
+    `capacite_de(evenement_id)` retourne la capacité (None: illimitée). `promouvoir(evenement_id, cle)`
+    valide l'inscription et retourne False si elle doit être écartée (règles non satisfaites).
+    Les libérations de places et les hausses de capacité sont traitées par `executer()`, appelé
+    périodiquement hors du chemin de l'utilisateur.
+    """
+    def __init__(self, capacite_de, promouvoir, horloge=time.time):
+        self._capacite_de = capacite_de
+        self._promouvoir = promouvoir
+        self._horloge = horloge
+        self._occupants = {}     # evenement_id -> set(cle)
+        self._listes = {}        # evenement_id -> ListeAttente
+        self._a_traiter = set()  # événements dont des places ont pu se libérer
+
+    def est_complet(self, evenement_id):
+        capacite = self._capacite_de(evenement_id)
+        return capacite is not None and len(self._occupants.get(evenement_id, ())) >= capacite
+
+    def occuper(self, evenement_id, cle):
+        self._occupants.setdefault(evenement_id, set()).add(cle)
+        self.retirer_attente(evenement_id, cle)
+
+    def mettre_en_attente(self, evenement_id, cle, est_etudiant, horodatage=None):
+        horodatage = self._horloge() if horodatage is None else horodatage
+        self._listes.setdefault(evenement_id, ListeAttente()).ajouter(cle, est_etudiant, horodatage)
+        return horodatage
+
+    def retirer_attente(self, evenement_id, cle):
+        liste = self._listes.get(evenement_id)
+        if liste is not None:
+            liste.retirer(cle)
+
+    def en_attente(self, evenement_id, cle=None):
+        liste = self._listes.get(evenement_id)
+        if cle is None:
+            return len(liste) if liste else 0
+        return liste is not None and cle in liste
+
+    def liberer(self, evenement_id, cle):
+        """Annulation: libère la place (ou la position en attente) et planifie une promotion."""
+        occupants = self._occupants.get(evenement_id)
+        if occupants is not None and cle in occupants:
+            occupants.discard(cle)
+            self._a_traiter.add(evenement_id)
+        self.retirer_attente(evenement_id, cle)
+
+    def retirer_evenement(self, evenement_id):
+        """Événement annulé: ses places et sa liste d'attente sont oubliées, sans promotion."""
+        self._occupants.pop(evenement_id, None)
+        self._listes.pop(evenement_id, None)
+        self._a_traiter.discard(evenement_id)
+
+    def capacite_modifiee(self, evenement_id):
+        self._a_traiter.add(evenement_id)
+
+    def executer(self):
+        """Promeut les premiers de chaque liste tant qu'il reste des places. Retourne les promus."""
+        promus = []
+        while self._a_traiter:
+            promus.extend(self.promouvoir_attente(self._a_traiter.pop()))
+        return promus
+
+    def promouvoir_attente(self, evenement_id):
+        """Promeut sans attendre `executer()` les premiers de la liste d'un événement, tant qu'il reste des
+        places (avant une validation directe, pour qu'elle ne passe pas devant la liste). Retourne les promus."""
+        self._a_traiter.discard(evenement_id)
+        promus = []
+        liste = self._listes.get(evenement_id)
+        while liste and not self.est_complet(evenement_id):
+            cle = liste.extraire()
+            if self._promouvoir(evenement_id, cle):
+                self._occupants.setdefault(evenement_id, set()).add(cle)
+                promus.append((evenement_id, cle))
+        return promus
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    import random
+
+    random.seed(1)
+    capacites = {"EV001": 100}
+    planificateur = PlanificateurPromotions(capacites.get, lambda evenement_id, cle: True)
+    for cle in range(100):
+        planificateur.occuper("EV001", cle)
+    nb_attente = 50000
+    debut = time.perf_counter()
+    for cle in range(100, 100 + nb_attente):
+        planificateur.mettre_en_attente("EV001", cle, random.random() < 0.5, horodatage=cle)
+    print(f"{nb_attente} mises en attente: {(time.perf_counter() - debut) / nb_attente * 1e6:.2f} µs chacune")
+
+    debut = time.perf_counter()
+    nb_promus = 0
+    for cle in range(100):
+        planificateur.liberer("EV001", cle)
+        nb_promus += len(planificateur.executer())
+    capacites["EV001"] = 10100
+    planificateur.capacite_modifiee("EV001")
+    nb_promus += len(planificateur.executer())
+    duree = time.perf_counter() - debut
+    print(f"{nb_promus} promotions (annulations + hausse de capacité): {duree / nb_promus * 1e6:.2f} µs chacune, "
+          f"{planificateur.en_attente('EV001')} encore en attente")
@@ -0,0 +1,213 @@
+# --- Liste des événements vue par un utilisateur: classes de visibilité précalculées, pagination par curseur ---
+import base64
+import json
+from bisect import bisect_left, bisect_right
+
+# Classes de visibilité (combinables): calculées une fois par événement, pas à chaque consultation.
+PUBLIC = 0
+CONNEXION_REQUISE = 1    # événement secret
+INSCRIPTION_REQUISE = 2  # détails réservés aux inscrits (hackathons)
+MOTIFS_REFUS = {CONNEXION_REQUISE: "Cet événement est secret et nécessite une connexion.",
+                INSCRIPTION_REQUISE: "Détails du Hackathon réservés aux participants inscrits."}
+TRIS = ("date", "nom", "id")
+
+
+def motif_refus(classe, connecte, inscrit):
+    """None si l'accès est autorisé, sinon la condition manquante (CONNEXION_REQUISE ou INSCRIPTION_REQUISE)."""
+    if classe & CONNEXION_REQUISE and not connecte:
+        return CONNEXION_REQUISE
+    if classe & INSCRIPTION_REQUISE and not inscrit:
+        return INSCRIPTION_REQUISE
+    return None
+
+
+class ErreurCurseur(ValueError):
+    """Curseur illisible, ou obtenu avec un autre tri."""
+
+
+def _cle_tri(tri, evenement):
+    if tri == "date":
+        return evenement.date.toordinal()
+    if tri == "nom":
+        return evenement.nom.casefold()
+    return evenement.id
+
+
+class IndexVisibilite:
+    """Événements rangés une fois pour toutes par classe de visibilité et dans chaque ordre de tri.
+
+    `classer(evenement)` donne la classe de visibilité. Une page est produite en un seul parcours de
+    l'ordre demandé: pour chaque événement, la décision se lit dans une table (classe -> motif)
+    préparée pour l'utilisateur, seule l'appartenance aux inscriptions est testée par événement.
+    """
+    def __init__(self, classer):
+        self._classer = classer
+        self._evenements = {}
+        self._classes = {}
+        self._cles = {}  # id -> clés enregistrées par tri (l'événement a pu être modifié depuis)
+        self._ordres = {tri: [] for tri in TRIS}  # tri -> [(clé, id)] trié
+        self._nb_tries = 0  # longueur du préfixe trié de chaque ordre; la suite attend le prochain tri
+
+    def __len__(self):
+        return len(self._evenements)
+
+    def enregistrer_evenement(self, evenement):
+        if evenement.id in self._evenements:
+            self.retirer_evenement(evenement.id)
+        self._evenements[evenement.id] = evenement
+        self._classes[evenement.id] = self._classer(evenement)
+        self._cles[evenement.id] = cles = {tri: _cle_tri(tri, evenement) for tri in TRIS}
+        for tri, ordre in self._ordres.items():
+            ordre.append((cles[tri], evenement.id))
+        # Tri repoussé à la prochaine lecture: une restauration de masse ne trie qu'une fois.
+
+    def retirer_evenement(self, evenement_id):
+        if self._evenements.pop(evenement_id, None) is None:
+            return
+        del self._classes[evenement_id]
+        cles = self._cles.pop(evenement_id)
+        # Dichotomie dans la partie triée; un événement ajouté depuis le dernier tri est dans la suite,
+        # et ce dans tous les ordres à la fois (ajouts et tris sont communs).
+        dans_tries = False
+        for tri, ordre in self._ordres.items():
+            entree = (cles[tri], evenement_id)
+            position = bisect_left(ordre, entree, 0, self._nb_tries)
+            if position < self._nb_tries and ordre[position] == entree:
+                dans_tries = True
+            else:
+                position = ordre.index(entree, self._nb_tries)
+            del ordre[position]
+        if dans_tries:
+            self._nb_tries -= 1
+
+    def _ordre(self, tri):
+        if tri not in self._ordres:
+            raise ValueError(f"Tri inconnu: {tri} (attendu: {', '.join(TRIS)})")
+        if self._nb_tries < len(self._evenements):
+            for ordre in self._ordres.values():
+                ordre.sort()
+            self._nb_tries = len(self._evenements)
+        return self._ordres[tri]
+
+    # --- Curseurs: position opaque (dernière clé servie), stable si des événements sont ajoutés entre deux pages ---
+    @staticmethod
+    def _encoder_curseur(tri, decroissant, cle, evenement_id):
+        brut = json.dumps([tri, decroissant, cle, evenement_id], ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(brut).rstrip(b"=").decode("ascii")
+
+    @staticmethod
+    def _decoder_curseur(curseur, tri, decroissant):
+        try:
+            tri_curseur, decroissant_curseur, cle, evenement_id = json.loads(
+                base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)))
+        except (ValueError, TypeError):
+            raise ErreurCurseur("Curseur illisible.")
+        if (tri_curseur, decroissant_curseur) != (tri, decroissant):
+            raise ErreurCurseur("Ce curseur a été obtenu avec un autre tri.")
+        return cle, evenement_id
+
+    # --- Lecture ---
+    def lister(self, connecte=False, inscrits=frozenset(), tri="date", decroissant=False, curseur=None,
+               limite=50, masques=True):
+        """Retourne (page, curseur suivant ou None). Les événements non accessibles apparaissent sous
+        forme de résumé masqué (avec le motif), ou sont omis si `masques` est faux."""
+        ordre = self._ordre(tri)
+        pas = -1 if decroissant else 1
+        if curseur is None:
+            position = len(ordre) - 1 if decroissant else 0
+        else:
+            repere = self._decoder_curseur(curseur, tri, decroissant)
+            position = bisect_left(ordre, repere) - 1 if decroissant else bisect_right(ordre, repere)
+
+        refus = [motif_refus(classe, connecte, False) for classe in range(4)]
+        refus_inscrit = [motif_refus(classe, connecte, True) for classe in range(4)]
+        classes, evenements = self._classes, self._evenements
+        page = []
+        while 0 <= position < len(ordre) and len(page) < limite:
+            evenement_id = ordre[position][1]
+            classe = classes[evenement_id]
+            motif = (refus_inscrit if evenement_id in inscrits else refus)[classe] if classe else None
+            if motif is None:
+                page.append(self._resume(evenements[evenement_id]))
+            elif masques:
+                page.append(self._resume_masque(evenements[evenement_id], motif))
+            position += pas
+        if not 0 <= position < len(ordre):
+            return page, None
+        return page, self._encoder_curseur(tri, decroissant, *ordre[position - pas])
+
+    @staticmethod
+    def _resume(evenement):
+        return {"id": evenement.id, "nom": evenement.nom, "type": evenement.type_evenement,
+                "date": evenement.date.isoformat(), "description": evenement.description,
+                "version": getattr(evenement, "version", None), "masque": False}
+
+    @staticmethod
+    def _resume_masque(evenement, motif):
+        resume = {"id": evenement.id, "type": evenement.type_evenement, "date": evenement.date.isoformat(),
+                  "masque": True, "motif": MOTIFS_REFUS[motif]}
+        if motif != CONNEXION_REQUISE:
+            resume["nom"] = evenement.nom  # seul le nom d'un événement secret est lui-même confidentiel
+        return resume
+
+
+def classe_visibilite(evenement):
+    """Règles du proxy: "Secrète" dans le nom -> connexion requise; hackathon -> inscription requise."""
+    classe = PUBLIC
+    if "Secrète" in evenement.nom:
+        classe |= CONNEXION_REQUISE
+    if evenement.type_evenement == "Hackathon":
+        classe |= INSCRIPTION_REQUISE
+    return classe
+
+
+# --- Mesure: catalogue complet (100k événements) parcouru page par page pour plusieurs profils ---
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import date
+    from types import SimpleNamespace
+
+    random.seed(1)
+    nb_evenements = 100000
+    types = ["Conference", "Seminaire", "Hackathon"]
+    evenements = []
+    for i in range(nb_evenements):
+        secret = random.random() < 0.1
+        evenements.append(SimpleNamespace(id=f"EV{i:06d}", nom=f"{'Réunion Secrète' if secret else 'Événement'} {i}",
+                                          type_evenement=random.choice(types), description="Description",
+                                          date=date.fromordinal(date(2025, 1, 1).toordinal() + random.randrange(365)),
+                                          version=1))
+
+    debut = time.perf_counter()
+    index = IndexVisibilite(classe_visibilite)
+    for evenement in evenements:
+        index.enregistrer_evenement(evenement)
+    index.lister(limite=1)
+    print(f"Indexation de {nb_evenements} événements: {time.perf_counter() - debut:.2f}s")
+
+    hackathons = [e.id for e in evenements if e.type_evenement == "Hackathon"]
+    profils = {"anonyme": (False, frozenset()), "connecté": (True, frozenset()),
+               "connecté, 500 inscriptions": (True, frozenset(random.sample(hackathons, 500)))}
+    for nom_profil, (connecte, inscrits) in profils.items():
+        debut = time.perf_counter()
+        curseur, visibles, masques, pages = None, 0, 0, 0
+        while True:
+            page, curseur = index.lister(connecte, inscrits, tri="date", curseur=curseur, limite=100)
+            pages += 1
+            for element in page:
+                if element["masque"]:
+                    masques += 1
+                else:
+                    visibles += 1
+            if curseur is None:
+                break
+        duree = time.perf_counter() - debut
+        print(f"{nom_profil:>28}: {visibles} visibles, {masques} masqués, {pages} pages en {duree * 1000:.0f} ms")
+
+    # Référence: une décision par événement en réévaluant les règles, comme N appels au proxy.
+    inscriptions = list(profils["connecté, 500 inscriptions"][1])
+    debut = time.perf_counter()
+    for evenement in sorted(evenements, key=lambda e: (e.date, e.id)):
+        motif_refus(classe_visibilite(evenement), True, evenement.id in inscriptions)
+    print(f"Référence (règles évaluées par événement, inscriptions en liste): {time.perf_counter() - debut:.2f}s")
@@ -0,0 +1,183 @@
+# --- Facultés / campus isolés: identifiants préfixés, stockage partitionné, ensembles de travail chargés à la demande ---
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Code d'une faculté: 2 à 8 majuscules ou chiffres ("SCI", "MED", "CAMPUS2").
+MOTIF_CODE = re.compile(r"[A-Z][A-Z0-9]{1,7}")
+RACINE_PAR_DEFAUT = "locataires"
+
+
+class LocataireInconnu(ValueError):
+    """Faculté sans données publiées (ou code invalide)."""
+
+
+def valider_code(locataire):
+    if not MOTIF_CODE.fullmatch(locataire or ""):
+        raise LocataireInconnu(f"Code de faculté invalide: {locataire!r} (2 à 8 majuscules ou chiffres).")
+    return locataire
+
+
+def locataire_de(identifiant):
+    """Faculté propriétaire d'un identifiant ("SCI-EV001" -> "SCI"); None pour les identifiants sans préfixe."""
+    prefixe, separateur, _ = identifiant.partition("-")
+    return prefixe if separateur and MOTIF_CODE.fullmatch(prefixe) else None
+
+
+class EspaceIdentifiants:
+    """Compteurs d'identifiants par (faculté, genre): "SCI-EV001" et "MED-EV001" coexistent.
+    Sans faculté, les identifiants restent ceux d'une installation unique ("EV001", "P001")."""
+    def __init__(self):
+        self._compteurs = {}
+        self._verrou = threading.Lock()
+
+    def generer(self, locataire, genre):
+        with self._verrou:
+            numero = self._compteurs.get((locataire, genre), 0) + 1
+            self._compteurs[(locataire, genre)] = numero
+        return f"{locataire}-{genre}{numero:03d}" if locataire else f"{genre}{numero:03d}"
+
+    def generer_lot(self, locataire, genre, nombre):
+        """`nombre` identifiants consécutifs, réservés en une seule prise du verrou."""
+        with self._verrou:
+            premier = self._compteurs.get((locataire, genre), 0) + 1
+            self._compteurs[(locataire, genre)] = premier + nombre - 1
+        prefixe = f"{locataire}-{genre}" if locataire else genre
+        return [f"{prefixe}{numero:03d}" for numero in range(premier, premier + nombre)]
+
+    def reserver(self, identifiant, genre):
+        # Un identifiant restauré (ex: depuis le journal) ne doit jamais être réattribué.
+        locataire = locataire_de(identifiant)
+        local = identifiant[len(locataire) + 1:] if locataire else identifiant
+        if local.startswith(genre) and local[len(genre):].isdigit():
+            with self._verrou:
+                cle = (locataire, genre)
+                self._compteurs[cle] = max(self._compteurs.get(cle, 0), int(local[len(genre):]))
+
+
+def chemins_locataire(locataire, racine=RACINE_PAR_DEFAUT, **fichiers):
+    """Place les fichiers (journal, caches, catalogue...) d'une faculté dans son propre dossier.
+    Sans faculté, les chemins sont retournés inchangés. Un chemin None (fonction désactivée) le reste."""
+    if not locataire:
+        return fichiers
+    dossier = os.path.join(racine, valider_code(locataire))
+    os.makedirs(dossier, exist_ok=True)
+    return {nom: os.path.join(dossier, os.path.basename(os.path.normpath(chemin))) if chemin else chemin
+            for nom, chemin in fichiers.items()}
+
+
+class RegistreLocataires:
+    """Ensembles de travail par faculté, chargés à la demande par `charger(locataire)` et évincés
+    (le moins récemment utilisé) au-delà de `capacite`; un ensemble plus vieux que `duree_vie`
+    secondes est rechargé. Le chargement d'une faculté ne bloque que les requêtes de cette faculté:
+    un grand campus en cours de chargement ne ralentit pas les autres."""
+    def __init__(self, charger, capacite=4, duree_vie=None, horloge=time.monotonic):
+        self._charger = charger
+        self.capacite = capacite
+        self.duree_vie = duree_vie
+        self._horloge = horloge
+        self._ensembles = OrderedDict()  # locataire -> (ensemble, date de chargement)
+        self._verrous = {}
+        self._verrou = threading.Lock()
+
+    def __contains__(self, locataire):
+        return locataire in self._ensembles
+
+    def charges(self):
+        return list(self._ensembles)
+
+    def obtenir(self, locataire):
+        with self._verrou:
+            entree = self._ensembles.get(locataire)
+            if entree is not None and not self._perime(entree):
+                self._ensembles.move_to_end(locataire)
+                return entree[0]
+            verrou = self._verrous.setdefault(locataire, threading.Lock())
+        with verrou:
+            # Un autre thread a pu charger cette faculté pendant l'attente.
+            entree = self._ensembles.get(locataire)
+            if entree is None or self._perime(entree):
+                ensemble = self._charger(locataire)
+                with self._verrou:
+                    ancien = self._ensembles.pop(locataire, None)
+                    self._ensembles[locataire] = (ensemble, self._horloge())
+                    evinces = [self._ensembles.popitem(last=False)[1] for _ in range(len(self._ensembles) - self.capacite)]
+                for evince in ([ancien] if ancien else []) + evinces:
+                    self._liberer(evince[0])
+                return ensemble
+            return entree[0]
+
+    def evincer(self, locataire):
+        with self._verrou:
+            entree = self._ensembles.pop(locataire, None)
+        if entree is not None:
+            self._liberer(entree[0])
+
+    def fermer(self):
+        for locataire in self.charges():
+            self.evincer(locataire)
+
+    def _perime(self, entree):
+        return self.duree_vie is not None and self._horloge() - entree[1] > self.duree_vie
+
+    @staticmethod
+    def _liberer(ensemble):
+        fermer = getattr(ensemble, "fermer", None)
+        if fermer:
+            fermer()
+
+
+class RouteurLocataires:
+    """Route une requête vers le service de la faculté qui possède l'identifiant. Un utilisateur n'a
+    de session que dans sa propre faculté: ailleurs, il est traité comme un visiteur anonyme."""
+    def __init__(self, registre):
+        self.registre = registre
+
+    def get_details_evenement(self, evenement_id, utilisateur=None):
+        locataire = locataire_de(evenement_id)
+        try:
+            service = self.registre.obtenir(locataire)
+        except (LocataireInconnu, OSError):
+            return "Événement non trouvé."
+        if utilisateur is not None and locataire_de(utilisateur.id) != locataire:
+            utilisateur = None
+        return service.get_details_evenement(evenement_id, utilisateur)
+
+
+# --- Mesure: un grand campus et plusieurs petites facultés chargés en parallèle ---
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    tailles = {"CAMPUS": 500_000, "SCI": 5_000, "MED": 5_000, "DROIT": 5_000}
+    identifiants = EspaceIdentifiants()
+
+    def charger(locataire):
+        if locataire not in tailles:
+            raise LocataireInconnu(locataire)
+        evenements = {}
+        for _ in range(tailles[locataire]):
+            evenement_id = identifiants.generer(locataire, "EV")
+            evenements[evenement_id] = evenement_id
+        return SimpleNamespace(get_details_evenement=lambda evenement_id, utilisateur=None:
+                               evenements.get(evenement_id, "Événement non trouvé."))
+
+    registre = RegistreLocataires(charger, capacite=3)
+    routeur = RouteurLocataires(registre)
+    durees = {}
+
+    def consulter(locataire):
+        debut = time.perf_counter()
+        details = routeur.get_details_evenement(f"{locataire}-EV001")
+        durees[locataire] = (time.perf_counter() - debut, details)
+
+    threads = [threading.Thread(target=consulter, args=(locataire,)) for locataire in tailles]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for locataire, (duree, details) in sorted(durees.items(), key=lambda e: e[1][0]):
+        print(f"{locataire:>7} ({tailles[locataire]} événements): première requête en {duree * 1000:.0f} ms -> {details}")
+    print(f"Ensembles chargés (capacité {registre.capacite}): {registre.charges()}")
+    print(f"Faculté inconnue: {routeur.get_details_evenement('XYZ-EV001')}")
@@ -0,0 +1,142 @@
+# --- Rappels avant les événements (J-7, J-1, H-1): minuteries persistantes indexées par échéance ---
+import sqlite3
+import time
+from datetime import date, datetime, time as heure, timedelta
+
+DECALAGES = (("J-7", timedelta(days=7)), ("J-1", timedelta(days=1)), ("H-1", timedelta(hours=1)))
+# Les événements n'ont qu'une date: on les suppose commencer à 9h (heure locale).
+HEURE_DEBUT_PAR_DEFAUT = heure(9, 0)
+
+
+def debut_occurrence(occurrence):
+    return datetime.combine(occurrence, HEURE_DEBUT_PAR_DEFAUT)
+
+
+class PlanificateurRappels:
+    """Une minuterie par (événement, séance, décalage), stockée dans SQLite avec un index sur l'échéance.
+
+    Un passage (`executer`) ne lit que les minuteries échues, par l'index: son coût ne dépend pas du nombre
+    d'inscriptions. Une minuterie échue parcourt les candidats de sa séance (`destinataires(evenement_id,
+    occurrence)`, liste où les nouvelles inscriptions s'ajoutent en fin) et retient sa position: un
+    grand événement est traité en plusieurs passages, et la reprise après un redémarrage repart de la
+    dernière position enregistrée (au plus un lot renvoyé). `envoyer(candidat, evenement_id, occurrence,
+    decalage)` décide lui-même si le candidat est concerné (inscription validée, bonne séance...).
+    Après le dernier rappel d'une séance, `occurrence_suivante(evenement_id, occurrence)` permet de
+    programmer la séance suivante d'une série.
+    """
+    def __init__(self, chemin, destinataires, envoyer, occurrence_suivante=None, horloge=time.time):
+        self._destinataires = destinataires
+        self._envoyer = envoyer
+        self._occurrence_suivante = occurrence_suivante
+        self._horloge = horloge
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS minuteries (evenement_id TEXT, occurrence TEXT, decalage TEXT, "
+                                "echeance REAL, position INTEGER DEFAULT 0, fait INTEGER DEFAULT 0, "
+                                "PRIMARY KEY (evenement_id, occurrence, decalage))")
+        self._connexion.execute("CREATE INDEX IF NOT EXISTS minuteries_echues ON minuteries (fait, echeance)")
+        self._connexion.commit()
+
+    def _lignes(self, evenement_id, occurrence):
+        debut = debut_occurrence(occurrence)
+        maintenant = self._horloge()
+        for libelle, decalage in DECALAGES:
+            echeance = (debut - decalage).timestamp()
+            # Un rappel dont l'heure est déjà passée n'est pas envoyé en retard.
+            yield evenement_id, occurrence.isoformat(), libelle, echeance, int(echeance <= maintenant)
+
+    def programmer(self, evenement_id, occurrence):
+        """Programme les rappels d'une séance (sans effet si c'est déjà fait)."""
+        self.programmer_lot([(evenement_id, occurrence)])
+
+    def programmer_lot(self, seances):
+        self._connexion.executemany("INSERT OR IGNORE INTO minuteries (evenement_id, occurrence, decalage, echeance, fait) "
+                                    "VALUES (?, ?, ?, ?, ?)",
+                                    [ligne for evenement_id, occurrence in seances for ligne in self._lignes(evenement_id, occurrence)])
+        self._connexion.commit()
+
+    def replanifier(self, evenement_id, decalage_jours):
+        """L'événement a été déplacé: ses séances (et leurs rappels) glissent d'autant, et les rappels
+        redevenus futurs sont envoyés à nouveau, depuis le début de la liste des inscrits."""
+        anciennes = {row[0] for row in self._connexion.execute(
+            "SELECT occurrence FROM minuteries WHERE evenement_id = ?", (evenement_id,))}
+        self._connexion.execute("DELETE FROM minuteries WHERE evenement_id = ?", (evenement_id,))
+        self.programmer_lot([(evenement_id, date.fromisoformat(o) + timedelta(days=decalage_jours)) for o in anciennes])
+
+    def annuler(self, evenement_id):
+        """L'événement est annulé: plus aucun rappel, ni pour ses séances programmées ni pour les suivantes."""
+        self._connexion.execute("DELETE FROM minuteries WHERE evenement_id = ?", (evenement_id,))
+        self._connexion.commit()
+
+    def prochaine_echeance(self):
+        ligne = self._connexion.execute("SELECT MIN(echeance) FROM minuteries WHERE fait = 0").fetchone()
+        return ligne[0]
+
+    def executer(self, limite=10000):
+        """Envoie les rappels échus, au plus `limite` candidats parcourus. Retourne le nombre parcouru."""
+        maintenant = self._horloge()
+        budget = limite
+        echues = self._connexion.execute("SELECT evenement_id, occurrence, decalage, position FROM minuteries "
+                                         "WHERE fait = 0 AND echeance <= ? ORDER BY echeance LIMIT 100", (maintenant,)).fetchall()
+        for evenement_id, occurrence, libelle, position in echues:
+            jour = date.fromisoformat(occurrence)
+            candidats = self._destinataires(evenement_id, jour) or ()
+            fin = min(len(candidats), position + budget)
+            for candidat in candidats[position:fin]:
+                self._envoyer(candidat, evenement_id, jour, libelle)
+            budget -= fin - position
+            termine = fin == len(candidats)
+            self._connexion.execute("UPDATE minuteries SET position = ?, fait = ? WHERE evenement_id = ? AND occurrence = ? "
+                                    "AND decalage = ?", (fin, int(termine), evenement_id, occurrence, libelle))
+            if termine and libelle == DECALAGES[-1][0] and self._occurrence_suivante:
+                suivante = self._occurrence_suivante(evenement_id, jour)
+                if suivante is not None:
+                    self._connexion.executemany("INSERT OR IGNORE INTO minuteries (evenement_id, occurrence, decalage, "
+                                                "echeance, fait) VALUES (?, ?, ?, ?, ?)", self._lignes(evenement_id, suivante))
+            if budget <= 0:
+                break
+        if echues:
+            self._connexion.commit()
+        return limite - budget
+
+    def fermer(self):
+        self._connexion.close()
+
+
+# --- Mesure: un million d'inscriptions validées, horloge simulée ---
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    nb_evenements, inscrits_par_evenement = 1000, 1000
+    premier_jour = date(2025, 10, 1)
+    evenements = {f"EV{i:04d}": premier_jour + timedelta(days=i % 60) for i in range(nb_evenements)}
+    inscrits = {evenement_id: list(range(inscrits_par_evenement)) for evenement_id in evenements}
+    horloge = [datetime(2025, 9, 1).timestamp()]
+    envoyes = []
+
+    chemin = os.path.join(tempfile.mkdtemp(prefix="rappels_"), "rappels.sqlite")
+    planificateur = PlanificateurRappels(chemin, lambda evenement_id, jour: inscrits.get(evenement_id),
+                                         lambda candidat, evenement_id, jour, libelle: envoyes.append(libelle),
+                                         horloge=lambda: horloge[0])
+    debut = time.perf_counter()
+    planificateur.programmer_lot([(evenement_id, jour) for evenement_id, jour in evenements.items()])
+    print(f"{nb_evenements * inscrits_par_evenement} inscriptions, {nb_evenements * len(DECALAGES)} minuteries "
+          f"programmées en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+    debut = time.perf_counter()
+    for _ in range(1000):
+        planificateur.executer()
+    print(f"Passage sans rappel échu: {(time.perf_counter() - debut) / 1000 * 1e6:.0f} µs")
+
+    planificateur.replanifier("EV0000", 30)
+    debut = time.perf_counter()
+    passages = 0
+    while horloge[0] < datetime(2025, 12, 31).timestamp():
+        horloge[0] += 3600
+        while planificateur.executer(limite=50000):
+            passages += 1
+    duree = time.perf_counter() - debut
+    print(f"{len(envoyes)} rappels envoyés en {duree:.2f}s ({len(envoyes) / duree:,.0f}/s, {passages} passages "
+          f"d'au plus 50000 rappels)")
+    planificateur.fermer()
@@ -0,0 +1,315 @@
+# --- Recommandation d'événements: matrice participants × événements creuse, tenue à jour par le flux de mutations ---
+import heapq
+import math
+import time
+from collections import Counter, OrderedDict
+from datetime import date
+
+NB_PRECALCULES = 20  # suggestions gardées par participant (les séances passées sont retirées à la lecture)
+NB_VOISINS = 50      # événements les plus co-suivis retenus pour chaque événement
+POIDS_COINSCRIPTIONS = 1.0
+POIDS_ETIQUETTES = 0.5
+POIDS_STATUT = 0.2
+# Date (ordinal) donnée aux événements annulés: toujours passée, ils ne sont plus proposés.
+ANNULE = 0
+
+
+def etiquettes_evenement(donnees):
+    """Caractéristiques comparables d'un événement journalisé: domaine, sponsor, intervenant."""
+    etiquettes = set()
+    for champ, genre in (("domaine", "domaine"), ("sponsor", "sponsor"), ("speaker_principal", "intervenant"),
+                         ("animateur", "intervenant")):
+        valeur = donnees.get(champ)
+        if valeur:
+            etiquettes.add((genre, str(valeur).strip().casefold()))
+    return frozenset(etiquettes)
+
+
+class MoteurRecommandations:
+    """Suggestions d'événements à venir par participant.
+
+    La matrice d'inscriptions X (participants × événements) est creuse: elle est gardée par lignes
+    (événements de chaque participant) et par colonnes (inscrits de chaque événement). Le produit XᵀX
+    (co-inscriptions entre événements) est mis à jour à chaque inscription en O(historique du
+    participant); les NB_VOISINS plus proches de chaque événement (cosinus) en sont extraits à la
+    demande et gardés jusqu'à la prochaine modification de sa ligne. Le score d'un événement combine
+    la similarité avec l'historique, les étiquettes partagées (domaine, sponsor, intervenant) et la
+    part d'inscrits de même statut (étudiant ou non). Les suggestions sont précalculées: `recommander`
+    ne fait qu'une lecture, et les participants touchés par une mutation sont recalculés par
+    `rafraichir`, sous budget de temps.
+    """
+    def __init__(self, aujourd_hui=date.today):
+        self._aujourd_hui = aujourd_hui
+        self.seq = 0
+        self._dates = {}            # evenement_id -> ordinal de la date
+        self._etiquettes = {}       # evenement_id -> frozenset d'étiquettes
+        self._par_etiquette = {}    # étiquette -> {evenement_id}
+        self._a_venir_par_etiquette = {}  # étiquette -> (jour du calcul, [evenement_id à venir])
+        self._etudiants = {}        # participant_id -> bool
+        self._inscriptions = []     # index du journal -> (participant_id, evenement_id)
+        self._annulees = set()
+        self._lignes = {}           # participant_id -> Counter(evenement_id -> inscriptions actives)
+        self._colonnes = {}         # evenement_id -> {participant_id}
+        self._etudiants_inscrits = Counter()
+        self._coinscriptions = {}   # evenement_id -> Counter(evenement_id -> nb de participants communs)
+        self._voisins = {}          # evenement_id -> (jour du calcul, [(evenement_id, similarité)])
+        self._suggestions = {}      # participant_id -> [evenement_id], meilleurs d'abord
+        self._a_recalculer = OrderedDict()
+        self._populaires = {}       # est_etudiant -> [evenement_id], pour le jour et la séquence de "cle"
+
+    @classmethod
+    def depuis_etat(cls, etat, precalculer=False, **options):
+        """Reconstruction complète (traitement par lot) à partir d'un EtatDomaine. Sans `precalculer`,
+        les suggestions sont calculées ensuite par `rafraichir` ou à la première demande."""
+        moteur = cls(**options)
+        for donnees in etat.evenements.values():
+            moteur._ajouter_evenement(donnees)
+        for participant_id, donnees in etat.participants.items():
+            moteur._etudiants[participant_id] = donnees["est_etudiant"]
+        # XᵀX est accumulé participant par participant, sur les seules paires de son historique.
+        for index, donnees in enumerate(etat.inscriptions):
+            participant_id, evenement_id = donnees["participant_id"], donnees["evenement_id"]
+            moteur._inscriptions.append((participant_id, evenement_id))
+            if donnees.get("est_annulee"):
+                moteur._annulees.add(index)
+            else:
+                moteur._lignes.setdefault(participant_id, Counter())[evenement_id] += 1
+        for participant_id, ligne in moteur._lignes.items():
+            etudiant = moteur._etudiants.get(participant_id, True)
+            evenements = list(ligne)
+            for i, evenement_id in enumerate(evenements):
+                moteur._colonnes.setdefault(evenement_id, set()).add(participant_id)
+                if etudiant:
+                    moteur._etudiants_inscrits[evenement_id] += 1
+                coinscriptions = moteur._coinscriptions.setdefault(evenement_id, Counter())
+                for autre in evenements[:i] + evenements[i + 1:]:
+                    coinscriptions[autre] += 1
+        moteur.seq = 1
+        if precalculer:
+            for participant_id in moteur._etudiants:
+                moteur._suggestions[participant_id] = moteur._calculer(participant_id)
+        else:
+            moteur._a_recalculer = OrderedDict.fromkeys(moteur._lignes)
+        return moteur
+
+    # --- Mise à jour incrémentale ---
+    def appliquer(self, operation, donnees):
+        self.seq += 1
+        if operation == "creer_evenement":
+            etiquettes = self._ajouter_evenement(donnees)
+            # Les participants intéressés par l'une de ces étiquettes sont à recalculer.
+            for etiquette in etiquettes:
+                for evenement_id in self._par_etiquette[etiquette]:
+                    self._marquer(self._colonnes.get(evenement_id, ()))
+        elif operation in ("modifier_date", "annuler_evenement"):
+            if operation == "annuler_evenement":
+                self._dates[donnees["id"]] = ANNULE
+            else:
+                self._dates[donnees["id"]] = date.fromisoformat(donnees["date"]).toordinal()
+            for etiquette in self._etiquettes.get(donnees["id"], ()):
+                self._a_venir_par_etiquette.pop(etiquette, None)
+            for autre in self._coinscriptions.get(donnees["id"], ()):
+                self._voisins.pop(autre, None)
+            self._marquer(self._colonnes.get(donnees["id"], ()))
+        elif operation == "creer_participant":
+            self._etudiants[donnees["id"]] = donnees["est_etudiant"]
+        elif operation == "mettre_a_jour_participant":
+            participant_id = donnees["id"]
+            if self._etudiants.get(participant_id, True) != donnees["est_etudiant"]:
+                for evenement_id in self._lignes.get(participant_id, ()):
+                    self._etudiants_inscrits[evenement_id] += 1 if donnees["est_etudiant"] else -1
+            self._etudiants[participant_id] = donnees["est_etudiant"]
+            self._marquer([participant_id])
+        elif operation == "inscrire_participant":
+            self._inscriptions.append((donnees["participant_id"], donnees["evenement_id"]))
+            self._modifier(donnees["participant_id"], donnees["evenement_id"], +1)
+        elif operation == "annuler_inscription" and donnees["index"] not in self._annulees:
+            self._annulees.add(donnees["index"])
+            self._modifier(*self._inscriptions[donnees["index"]], -1)
+
+    def _ajouter_evenement(self, donnees):
+        evenement_id = donnees["id"]
+        etiquettes = etiquettes_evenement(donnees)
+        self._dates[evenement_id] = ANNULE if donnees.get("est_annule") else date.fromisoformat(donnees["date"]).toordinal()
+        self._etiquettes[evenement_id] = etiquettes
+        for etiquette in etiquettes:
+            self._par_etiquette.setdefault(etiquette, set()).add(evenement_id)
+            self._a_venir_par_etiquette.pop(etiquette, None)
+        return etiquettes
+
+    def _modifier(self, participant_id, evenement_id, signe):
+        ligne = self._lignes.setdefault(participant_id, Counter())
+        ligne[evenement_id] += signe
+        if ligne[evenement_id] not in (0, 1) or (signe < 0) != (ligne[evenement_id] == 0):
+            return  # autre séance du même événement: la matrice (0/1) ne change pas
+        if signe < 0:
+            del ligne[evenement_id]
+        colonne = self._colonnes.setdefault(evenement_id, set())
+        (colonne.add if signe > 0 else colonne.discard)(participant_id)
+        if self._etudiants.get(participant_id, True):
+            self._etudiants_inscrits[evenement_id] += signe
+        coinscriptions = self._coinscriptions.setdefault(evenement_id, Counter())
+        self._voisins.pop(evenement_id, None)
+        for autre in ligne:
+            if autre != evenement_id:
+                coinscriptions[autre] += signe
+                self._coinscriptions.setdefault(autre, Counter())[evenement_id] += signe
+                self._voisins.pop(autre, None)
+        # Les co-inscrits ne sont pas remis en file: leur score ne bouge que d'une inscription parmi
+        # toutes les leurs, et leurs suggestions sont recalculées à leur prochaine mutation.
+        self._marquer([participant_id])
+
+    def _marquer(self, participants):
+        for participant_id in participants:
+            self._a_recalculer[participant_id] = None
+
+    # --- Calcul des scores ---
+    def _calculer(self, participant_id):
+        aujourd_hui = self._aujourd_hui().toordinal()
+        historique = self._lignes.get(participant_id) or {}
+        etudiant = self._etudiants.get(participant_id, True)
+        if not historique:
+            return self._plus_populaires(etudiant, aujourd_hui)
+
+        scores = Counter()
+        for evenement_id in historique:
+            for autre, similarite in self._voisins_a_venir(evenement_id, aujourd_hui):
+                if autre not in historique:
+                    scores[autre] += POIDS_COINSCRIPTIONS * similarite
+        profil = Counter(etiquette for evenement_id in historique for etiquette in self._etiquettes.get(evenement_id, ()))
+        for etiquette, poids in profil.items():
+            poids = POIDS_ETIQUETTES * poids / len(historique)
+            for autre in self._etiquette_a_venir(etiquette, aujourd_hui):
+                scores[autre] += poids
+        for evenement_id in historique:
+            scores.pop(evenement_id, None)
+        # Le statut ajoute au plus POIDS_STATUT: seuls les candidats assez proches du dernier retenu
+        # peuvent encore entrer dans le classement.
+        if len(scores) > NB_PRECALCULES:
+            seuil = heapq.nlargest(NB_PRECALCULES, scores.values())[-1] - POIDS_STATUT
+            scores = {autre: score for autre, score in scores.items() if score >= seuil}
+        colonnes, etudiants_inscrits = self._colonnes, self._etudiants_inscrits
+        for autre in scores:
+            inscrits = len(colonnes.get(autre, ()))
+            if inscrits:
+                part = etudiants_inscrits[autre] / inscrits
+                scores[autre] += POIDS_STATUT * (part if etudiant else 1.0 - part)
+        return [evenement_id for evenement_id, _ in heapq.nlargest(NB_PRECALCULES, scores.items(), key=lambda e: (e[1], e[0]))]
+
+    def _etiquette_a_venir(self, etiquette, aujourd_hui):
+        calcul = self._a_venir_par_etiquette.get(etiquette)
+        if calcul is None or calcul[0] != aujourd_hui:
+            dates = self._dates
+            calcul = self._a_venir_par_etiquette[etiquette] = (
+                aujourd_hui, [e for e in self._par_etiquette.get(etiquette, ()) if dates[e] >= aujourd_hui])
+        return calcul[1]
+
+    def _voisins_a_venir(self, evenement_id, aujourd_hui):
+        calcul = self._voisins.get(evenement_id)
+        if calcul is None or calcul[0] != aujourd_hui:
+            colonnes, dates = self._colonnes, self._dates
+            norme = len(colonnes.get(evenement_id, ())) or 1
+            similarites = ((autre, communs / math.sqrt(norme * (len(colonnes.get(autre, ())) or 1)))
+                           for autre, communs in self._coinscriptions.get(evenement_id, {}).items()
+                           if communs > 0 and dates.get(autre, 0) >= aujourd_hui)
+            calcul = self._voisins[evenement_id] = (aujourd_hui, heapq.nlargest(NB_VOISINS, similarites, key=lambda e: e[1]))
+        return calcul[1]
+
+    def _part_meme_statut(self, evenement_id, etudiant):
+        inscrits = len(self._colonnes.get(evenement_id, ()))
+        if not inscrits:
+            return 0.0
+        part = self._etudiants_inscrits[evenement_id] / inscrits
+        return part if etudiant else 1.0 - part
+
+    def _plus_populaires(self, etudiant, aujourd_hui):
+        # Sans historique: événements à venir les plus suivis par les participants de même statut.
+        if self._populaires.get("cle") != (aujourd_hui, self.seq):
+            self._populaires = {"cle": (aujourd_hui, self.seq)}
+        if etudiant not in self._populaires:
+            self._populaires[etudiant] = heapq.nlargest(
+                NB_PRECALCULES, (e for e, jour in self._dates.items() if jour >= aujourd_hui),
+                key=lambda e: (len(self._colonnes.get(e, ())) * (1 + self._part_meme_statut(e, etudiant)), e))
+        return self._populaires[etudiant]
+
+    # --- Lecture ---
+    def recommander(self, participant_id, nombre=5):
+        """Suggestions précalculées (les plus pertinentes d'abord), sans les événements déjà passés."""
+        suggestions = self._suggestions.get(participant_id)
+        if suggestions is None:
+            suggestions = self._suggestions[participant_id] = self._calculer(participant_id)
+        aujourd_hui = self._aujourd_hui().toordinal()
+        return [e for e in suggestions if self._dates.get(e, 0) >= aujourd_hui][:nombre]
+
+    def rafraichir(self, budget=0.01):
+        """Recalcule les participants touchés par les dernières mutations, pendant au plus `budget`
+        secondes. Retourne le nombre de participants recalculés."""
+        echeance = time.perf_counter() + budget
+        recalcules = 0
+        while self._a_recalculer and time.perf_counter() < echeance:
+            participant_id, _ = self._a_recalculer.popitem(last=False)
+            self._suggestions[participant_id] = self._calculer(participant_id)
+            recalcules += 1
+        return recalcules
+
+    @property
+    def en_attente(self):
+        return len(self._a_recalculer)
+
+
+# --- Reconstruction hors ligne et mesure: `python Recommandations.py [dossier_journal]` ---
+if __name__ == "__main__":
+    import random
+    import sys
+    from Journal import EtatDomaine, JournalEvenements
+
+    if len(sys.argv) > 1:
+        journal = JournalEvenements(sys.argv[1])
+        etat = journal.etat
+        journal.fermer()
+    else:
+        random.seed(2)
+        domaines = [f"Domaine {i}" for i in range(40)]
+        sponsors = [f"Sponsor {i}" for i in range(30)]
+        intervenants = [f"Intervenant {i}" for i in range(200)]
+        etat = EtatDomaine()
+        debut_annee = date(2025, 1, 1).toordinal()
+        for i in range(20000):
+            donnees = {"id": f"EV{i:05d}", "nom": f"Événement {i}", "date": date.fromordinal(debut_annee + i % 730).isoformat()}
+            genre = i % 3
+            if genre == 0:
+                donnees.update(type="Seminaire", domaine=random.choice(domaines))
+            elif genre == 1:
+                donnees.update(type="Hackathon", sponsor=random.choice(sponsors))
+            else:
+                donnees.update(type="Conference", speaker_principal=random.choice(intervenants))
+            etat.evenements[donnees["id"]] = donnees
+        for i in range(50000):
+            etat.participants[f"P{i:05d}"] = {"id": f"P{i:05d}", "est_etudiant": i % 5 != 0}
+        evenements = list(etat.evenements)
+        for _ in range(200000):
+            etat.inscriptions.append({"participant_id": f"P{random.randrange(50000):05d}",
+                                      "evenement_id": evenements[int(random.paretovariate(1.2)) % len(evenements)]})
+
+    aujourd_hui = lambda: date(2025, 9, 1)
+    debut = time.perf_counter()
+    moteur = MoteurRecommandations.depuis_etat(etat, precalculer=True, aujourd_hui=aujourd_hui)
+    print(f"Reconstruction complète ({len(etat.evenements)} événements, {len(etat.participants)} participants, "
+          f"{len(etat.inscriptions)} inscriptions): {time.perf_counter() - debut:.2f}s")
+
+    participants = list(etat.participants)
+    debut = time.perf_counter()
+    for participant_id in participants:
+        moteur.recommander(participant_id)
+    print(f"Lecture des suggestions: {(time.perf_counter() - debut) / len(participants) * 1e6:.1f} µs par participant")
+
+    debut = time.perf_counter()
+    for i in range(1000):
+        moteur.appliquer("inscrire_participant", {"participant_id": participants[i], "evenement_id": evenements[i % 50]})
+    print(f"1000 inscriptions incrémentales: {(time.perf_counter() - debut) * 1000:.0f} ms, "
+          f"{moteur.en_attente} participants à recalculer")
+    debut = time.perf_counter()
+    while moteur.en_attente:
+        moteur.rafraichir(budget=0.05)
+    print(f"Recalcul des participants touchés: {time.perf_counter() - debut:.2f}s")
+    print(f"Suggestions de {participants[0]}: {moteur.recommander(participants[0])}")
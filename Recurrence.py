@@ -0,0 +1,138 @@
+# --- Événements récurrents: règles de récurrence et expansion paresseuse des occurrences ---
+import calendar
+import heapq
+from datetime import date, timedelta
+
+FREQUENCES = ("quotidienne", "hebdomadaire", "mensuelle")
+
+
+class RegleRecurrence:
+    """Décrit la répétition d'un événement à partir de sa date de début.
+
+    Les occurrences ne sont jamais stockées: elles sont calculées à la demande pour une fenêtre,
+    avec un saut direct à la première occurrence de la fenêtre (coût proportionnel à la fenêtre).
+    """
+    def __init__(self, frequence, intervalle=1, nombre=None, jusqu_a=None, exclusions=()):
+        if frequence not in FREQUENCES:
+            raise ValueError(f"Fréquence de récurrence inconnue: {frequence}")
+        if intervalle < 1:
+            raise ValueError("L'intervalle de récurrence doit être positif.")
+        self.frequence = frequence
+        self.intervalle = intervalle
+        self.nombre = nombre
+        self.jusqu_a = jusqu_a
+        self.exclusions = frozenset(exclusions)
+
+    def _date_numero(self, debut_serie, k):
+        if self.frequence == "mensuelle":
+            mois = debut_serie.month - 1 + k * self.intervalle
+            annee, mois = debut_serie.year + mois // 12, mois % 12 + 1
+            # Un 31 devient le dernier jour des mois plus courts.
+            return date(annee, mois, min(debut_serie.day, calendar.monthrange(annee, mois)[1]))
+        jours = self.intervalle * (7 if self.frequence == "hebdomadaire" else 1)
+        return debut_serie + timedelta(days=k * jours)
+
+    def _premier_numero(self, debut_serie, debut_fenetre):
+        if debut_fenetre <= debut_serie:
+            return 0
+        if self.frequence == "mensuelle":
+            mois = (debut_fenetre.year - debut_serie.year) * 12 + debut_fenetre.month - debut_serie.month
+            return max(0, mois // self.intervalle - 1)
+        jours = self.intervalle * (7 if self.frequence == "hebdomadaire" else 1)
+        return -(-(debut_fenetre - debut_serie).days // jours)
+
+    def occurrences(self, debut_serie, debut_fenetre=None, fin_fenetre=None):
+        """Génère les dates d'occurrence comprises dans [debut_fenetre, fin_fenetre]."""
+        k = self._premier_numero(debut_serie, debut_fenetre) if debut_fenetre else 0
+        while self.nombre is None or k < self.nombre:
+            jour = self._date_numero(debut_serie, k)
+            if (self.jusqu_a and jour > self.jusqu_a) or (fin_fenetre and jour > fin_fenetre):
+                return
+            if (debut_fenetre is None or jour >= debut_fenetre) and jour not in self.exclusions:
+                yield jour
+            k += 1
+
+    def serialiser(self):
+        return {"frequence": self.frequence, "intervalle": self.intervalle, "nombre": self.nombre,
+                "jusqu_a": self.jusqu_a.isoformat() if self.jusqu_a else None,
+                "exclusions": sorted(d.isoformat() for d in self.exclusions)}
+
+    @classmethod
+    def deserialiser(cls, donnees):
+        if not donnees:
+            return None
+        return cls(donnees["frequence"], donnees["intervalle"], donnees["nombre"],
+                   date.fromisoformat(donnees["jusqu_a"]) if donnees["jusqu_a"] else None,
+                   [date.fromisoformat(d) for d in donnees["exclusions"]])
+
+    def __str__(self):
+        texte = self.frequence if self.intervalle == 1 else f"{self.frequence} (tous les {self.intervalle})"
+        if self.nombre:
+            texte += f", {self.nombre} séances"
+        if self.jusqu_a:
+            texte += f", jusqu'au {self.jusqu_a.isoformat()}"
+        return texte
+
+
+class Occurrence:
+    """Vue légère sur une séance d'une série: délègue tout à l'événement, sauf la date."""
+    __slots__ = ("serie", "date")
+
+    def __init__(self, serie, date_occurrence):
+        self.serie = serie
+        self.date = date_occurrence
+
+    @property
+    def id(self):
+        return identifiant_occurrence(self.serie.id, self.date)
+
+    def __getattr__(self, nom):
+        return getattr(self.serie, nom)
+
+    def get_details(self):
+        return f"{self.serie.get_details()}\n  Séance du: {self.date.strftime('%Y-%m-%d')}"
+
+    def __lt__(self, autre):
+        return (self.date, self.serie.id) < (autre.date, autre.serie.id)
+
+
+def identifiant_occurrence(evenement_id, date_occurrence):
+    return f"{evenement_id}@{date_occurrence.isoformat()}"
+
+
+def occurrences_evenement(evenement, debut=None, fin=None):
+    """Occurrences d'un événement dans la fenêtre; un événement non récurrent a une seule occurrence."""
+    recurrence = getattr(evenement, "recurrence", None)
+    if recurrence is None:
+        if (debut is None or evenement.date >= debut) and (fin is None or evenement.date <= fin):
+            yield Occurrence(evenement, evenement.date)
+        return
+    for jour in recurrence.occurrences(evenement.date, debut, fin):
+        yield Occurrence(evenement, jour)
+
+
+def calendrier(evenements, debut, fin):
+    """Fusion paresseuse et triée par date des occurrences de tous les événements sur la fenêtre."""
+    return heapq.merge(*(occurrences_evenement(e, debut, fin) for e in evenements))
+
+
+def est_occurrence(evenement, jour):
+    recurrence = getattr(evenement, "recurrence", None)
+    if recurrence is None:
+        return evenement.date == jour
+    return next(recurrence.occurrences(evenement.date, jour, jour), None) == jour
+
+
+# --- Exemple d'utilisation ---
+if __name__ == "__main__":
+    import time
+    from types import SimpleNamespace
+
+    series = [SimpleNamespace(id=f"EV{i:05d}", nom=f"Séminaire {i}", date=date(2020, 1, 1) + timedelta(days=i % 7),
+                              recurrence=RegleRecurrence("hebdomadaire"), get_details=lambda: "")
+              for i in range(10000)]
+    debut = time.perf_counter()
+    semaine = list(calendrier(series, date(2025, 10, 6), date(2025, 10, 12)))
+    print(f"{len(series)} séries hebdomadaires sans fin, semaine du 2025-10-06: {len(semaine)} séances "
+          f"en {(time.perf_counter() - debut) * 1000:.1f} ms")
+    print(f"Première: {semaine[0].nom} le {semaine[0].date}, id={semaine[0].id}")
@@ -0,0 +1,200 @@
+# --- Langage déclaratif de règles d'inscription, compilé en fonctions Python ---
+import ast
+import configparser
+import os
+import time
+
+# Nœuds autorisés dans une expression de règle: comparaisons, logique booléenne, arithmétique
+# et accès aux attributs de `participant` / `evenement`. Tout le reste est refusé à la compilation.
+_NOEUDS_AUTORISES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod,
+    ast.Attribute, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Set,
+)
+_VARIABLES = ("participant", "evenement")
+
+
+class ErreurRegle(ValueError):
+    pass
+
+
+class RegleCompilee:
+    """Une règle nommée: expression source, fonction compilée et attributs lus (pour les explications)."""
+    def __init__(self, nom, source):
+        self.nom = nom
+        self.source = source
+        self.attributs = []
+        arbre = self._analyser()
+        # L'expression devient le corps d'une lambda (participant, evenement): compilée une seule fois.
+        fonction = ast.Expression(body=ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(v) for v in _VARIABLES], kwonlyargs=[],
+                               kw_defaults=[], defaults=[]),
+            body=arbre.body))
+        code = compile(ast.fix_missing_locations(fonction), f"<regle {nom}>", "eval")
+        self.fonction = eval(code, {"__builtins__": {}})
+
+    def _analyser(self):
+        try:
+            arbre = ast.parse(self.source, mode="eval")
+        except SyntaxError as e:
+            raise ErreurRegle(f"Règle '{self.nom}': syntaxe invalide ({e.msg})")
+        for noeud in ast.walk(arbre):
+            if not isinstance(noeud, _NOEUDS_AUTORISES):
+                raise ErreurRegle(f"Règle '{self.nom}': élément non autorisé '{type(noeud).__name__}'")
+            if isinstance(noeud, ast.Name) and noeud.id not in _VARIABLES:
+                raise ErreurRegle(f"Règle '{self.nom}': variable inconnue '{noeud.id}'")
+            if isinstance(noeud, ast.Attribute):
+                if noeud.attr.startswith("_"):
+                    raise ErreurRegle(f"Règle '{self.nom}': attribut privé '{noeud.attr}' interdit")
+                base = noeud.value
+                while isinstance(base, ast.Attribute):
+                    base = base.value
+                if not isinstance(base, ast.Name):
+                    raise ErreurRegle(f"Règle '{self.nom}': attribut '{noeud.attr}' hors de participant/evenement")
+                if isinstance(noeud.value, ast.Name):
+                    self.attributs.append((noeud.value.id, noeud.attr))
+        return arbre
+
+
+class JeuRegles:
+    """Conjonction de règles compilée en une seule fonction pour le chemin rapide."""
+    def __init__(self, nom, regles):
+        self.nom = nom
+        self.regles = regles
+        fonctions = [r.fonction for r in regles]
+        if not fonctions:
+            self.fonction = lambda participant, evenement: True
+        elif len(fonctions) == 1:
+            self.fonction = fonctions[0]
+        else:
+            self.fonction = lambda participant, evenement: all(f(participant, evenement) for f in fonctions)
+
+    def evaluer(self, participant, evenement):
+        try:
+            return bool(self.fonction(participant, evenement))
+        except Exception:
+            return False
+
+    def evaluer_lot(self, couples):
+        """Évalue une liste de (participant, evenement) et retourne la liste des résultats."""
+        evaluer = self.evaluer
+        return [evaluer(p, e) for p, e in couples]
+
+    def expliquer(self, participant, evenement):
+        """Trace lisible des règles échouées, avec les valeurs lues."""
+        variables = {"participant": participant, "evenement": evenement}
+        lignes = []
+        for regle in self.regles:
+            try:
+                resultat = regle.fonction(participant, evenement)
+                erreur = None
+            except Exception as e:
+                resultat, erreur = False, e
+            if resultat:
+                continue
+            valeurs = ", ".join(f"{v}.{a}={getattr(variables[v], a, '<absent>')!r}" for v, a in regle.attributs)
+            detail = f"erreur: {erreur}" if erreur else valeurs
+            lignes.append(f"Règle '{regle.nom}' non satisfaite: {regle.source} ({detail})")
+        return lignes
+
+
+class MoteurRegles:
+    """Charge les règles depuis un fichier INI (une section par type ou par ID d'événement) et les
+    recompile à chaud lorsque le fichier change. Section par ID > section par type > section `*`."""
+    def __init__(self, chemin, source_par_defaut="", intervalle_verification=1.0):
+        self.chemin = chemin
+        self.source_par_defaut = source_par_defaut
+        self.intervalle_verification = intervalle_verification
+        self._cache_regles = {}  # {(nom, source): RegleCompilee} -- réutilisé entre rechargements
+        self._jeux = {}
+        self._mtime = None
+        self._derniere_verification = 0.0
+        self.derniere_erreur = None
+        try:
+            self.charger()
+        except (ErreurRegle, configparser.Error, UnicodeDecodeError) as e:
+            # Fichier invalide au démarrage: règles par défaut, le fichier corrigé sera repris à chaud.
+            self.derniere_erreur = str(e)
+            self.charger(self.source_par_defaut)
+            self._mtime = os.path.getmtime(self.chemin)
+
+    def charger(self, source=None):
+        parseur = configparser.ConfigParser(interpolation=None, default_section="__aucune__")
+        parseur.optionxform = str
+        if source is not None:
+            parseur.read_string(source)
+            self._mtime = None
+        elif os.path.exists(self.chemin):
+            with open(self.chemin, encoding="utf-8") as f:
+                parseur.read_file(f)
+            self._mtime = os.path.getmtime(self.chemin)
+        else:
+            parseur.read_string(self.source_par_defaut)
+            self._mtime = None
+
+        jeux = {}
+        for section in parseur.sections():
+            regles = []
+            for nom, source in parseur.items(section):
+                cle = (nom, source)
+                if cle not in self._cache_regles:
+                    self._cache_regles[cle] = RegleCompilee(nom, source)
+                regles.append(self._cache_regles[cle])
+            jeux[section] = JeuRegles(section, regles)
+        # Remplacement atomique: une erreur de compilation laisse les anciennes règles actives.
+        self._jeux = jeux
+
+    def recharger_si_modifie(self):
+        maintenant = time.monotonic()
+        if maintenant - self._derniere_verification < self.intervalle_verification:
+            return False
+        self._derniere_verification = maintenant
+        if not os.path.exists(self.chemin):
+            return False
+        if os.path.getmtime(self.chemin) != self._mtime:
+            try:
+                self.charger()
+            except (ErreurRegle, configparser.Error, UnicodeDecodeError) as e:
+                # Fichier en cours d'édition ou invalide: on garde les règles précédentes.
+                self.derniere_erreur = str(e)
+                return False
+            self.derniere_erreur = None
+            return True
+        return False
+
+    def jeu_pour(self, evenement):
+        self.recharger_si_modifie()
+        jeux = self._jeux
+        return (jeux.get(getattr(evenement, "id", None)) or jeux.get(type(evenement).__name__)
+                or jeux.get("*") or JeuRegles("*", []))
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    REGLES = """
+[Hackathon]
+etudiant = participant.est_etudiant
+
+[Conference]
+places_disponibles = evenement.nombre_places > 0
+"""
+    moteur = MoteurRegles("regles_inexistantes.ini", source_par_defaut=REGLES)
+
+    Conference = type("Conference", (SimpleNamespace,), {})
+    conf = Conference(id="EV001", nom="Conférence IA", nombre_places=0)
+    bob = SimpleNamespace(nom="Bob", est_etudiant=False)
+
+    jeu = moteur.jeu_pour(conf)
+    print(f"Bob -> {conf.nom}: {jeu.evaluer(bob, conf)}")
+    for ligne in jeu.expliquer(bob, conf):
+        print("  " + ligne)
+
+    conf.nombre_places = 100
+    couples = [(bob, conf)] * 1_000_000
+    debut = time.perf_counter()
+    resultats = jeu.evaluer_lot(couples)
+    duree = time.perf_counter() - debut
+    print(f"{len(couples)} évaluations en lot: {duree:.2f}s ({duree / len(couples) * 1e9:.0f} ns/inscription)")
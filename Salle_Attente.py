@@ -0,0 +1,253 @@
+# --- Salle d'attente des inscriptions: file équitable, admission au débit mesuré du service, délestage ---
+import time
+from collections import deque
+
+from Digest_Notifications import SeauJetons
+
+EN_ATTENTE, ADMIS, ABANDONNE = "en_attente", "admis", "abandonne"
+
+
+class FileSaturee(ValueError):
+    """Attente estimée trop longue (ou file pleine): la demande est refusée tout de suite."""
+
+
+class LimiteUtilisateur(ValueError):
+    """Trop de demandes d'un même utilisateur sur une courte période."""
+
+
+class Ticket:
+    """Place d'une demande dans la file. `numero` vaut 0 pour une demande admise sans attendre."""
+    __slots__ = ("numero", "utilisateur_id", "cible", "statut", "emis", "admis", "resultat", "erreur", "_operation", "_terminer")
+
+    def __init__(self, numero, utilisateur_id, cible, operation, terminer, emis):
+        self.numero = numero
+        self.utilisateur_id = utilisateur_id
+        self.cible = cible
+        self.statut = EN_ATTENTE
+        self.emis = emis
+        self.admis = None
+        self.resultat = None
+        self.erreur = None
+        self._operation = operation
+        self._terminer = terminer
+
+
+class SalleAttente:
+    """File d'admission devant les opérations coûteuses (inscription, validation) lors des pics d'affluence.
+
+    Une demande est exécutée aussitôt tant que le débit d'admission le permet; sinon elle reçoit un ticket
+    (position et attente estimée) et sera exécutée par `traiter`, dans l'ordre d'arrivée. Le débit d'admission
+    suit la capacité mesurée du service: `utilisation_cible` / durée moyenne d'une opération. Une même
+    demande (utilisateur, cible) n'a qu'une place dans la file: la répéter rend le même ticket, alors qu'une
+    demande du même utilisateur sur une autre cible prend sa propre place. Les nouvelles demandes de chaque
+    utilisateur sont limitées par un seau à jetons (`rafale_utilisateur=None` le désactive, lorsqu'un seul
+    opérateur saisit les demandes de tous les utilisateurs). Une demande dont l'attente dépasserait `attente_max` est refusée immédiatement
+    (FileSaturee) plutôt que d'allonger la file sans fin.
+
+    `operation()` est la partie mesurée; `terminer(resultat, erreur)` (affichage...) est appelée ensuite,
+    hors mesure.
+    """
+    # Poids de la dernière mesure dans la moyenne glissante de la durée d'une opération.
+    LISSAGE = 0.2
+
+    def __init__(self, debit_initial=20.0, debit_min=1.0, debit_max=1000.0, utilisation_cible=0.7, rafale=20,
+                 attente_max=60.0, capacite_file=10000, rafale_utilisateur=3, debit_utilisateur=0.5,
+                 horloge=time.monotonic, chronometre=time.perf_counter):
+        self.debit_min = debit_min
+        self.debit_max = debit_max
+        self.utilisation_cible = utilisation_cible
+        self.attente_max = attente_max
+        self.capacite_file = capacite_file
+        self.rafale_utilisateur = rafale_utilisateur
+        self.debit_utilisateur = debit_utilisateur
+        self._horloge = horloge
+        self._chronometre = chronometre
+        self._admission = SeauJetons(rafale, debit_initial, horloge)
+        self._file = deque()
+        self._en_attente = {}  # (utilisateur_id, cible) -> ticket dans la file
+        self._seaux = {}       # utilisateur_id -> SeauJetons des demandes
+        self._derniere_purge = horloge()
+        self._prochain_numero = 1
+        self._dernier_servi = 0  # numéro du dernier ticket sorti de la file
+        self.duree_moyenne = None
+        self.nb_admis = self.nb_refus_file = self.nb_refus_utilisateur = 0
+
+    @property
+    def debit(self):
+        return self._admission.debit
+
+    def en_attente(self):
+        return len(self._en_attente)
+
+    def position(self, ticket):
+        """(position dans la file, attente estimée en secondes); (0, 0.0) hors de la file."""
+        if ticket.statut != EN_ATTENTE:
+            return 0, 0.0
+        position = ticket.numero - self._dernier_servi
+        return position, position / self.debit
+
+    # --- Demandes ---
+    def demander(self, utilisateur_id, operation, terminer=None, cible=None):
+        """Exécute l'opération si possible, sinon la met en file. Retourne le ticket."""
+        ticket = self._en_attente.get((utilisateur_id, cible))
+        if ticket is not None:
+            return ticket  # une seule place par demande: la répéter ne double pas sa chance
+        if self.rafale_utilisateur is not None and not self._seau(utilisateur_id).consommer():
+            self.nb_refus_utilisateur += 1
+            raise LimiteUtilisateur("Trop de demandes rapprochées: réessayez dans quelques secondes.")
+        ticket = Ticket(0, utilisateur_id, cible, operation, terminer, self._horloge())
+        if not self._file and self._admission.consommer():
+            self._executer(ticket)
+            return ticket
+        attente = (self._prochain_numero - self._dernier_servi) / self.debit
+        if len(self._file) >= self.capacite_file or attente > self.attente_max:
+            self.nb_refus_file += 1
+            raise FileSaturee(f"Affluence exceptionnelle ({len(self._en_attente)} demandes en attente, environ "
+                              f"{attente:.0f}s d'attente): réessayez plus tard.")
+        ticket.numero = self._prochain_numero
+        self._prochain_numero += 1
+        self._file.append(ticket)
+        self._en_attente[utilisateur_id, cible] = ticket
+        return ticket
+
+    def abandonner(self, ticket):
+        if ticket.statut == EN_ATTENTE and self._en_attente.get((ticket.utilisateur_id, ticket.cible)) is ticket:
+            ticket.statut = ABANDONNE
+            del self._en_attente[ticket.utilisateur_id, ticket.cible]
+
+    def traiter(self):
+        """Admet les tickets en tête de file au débit courant. Retourne le nombre de tickets admis."""
+        admis = 0
+        while self._file:
+            ticket = self._file[0]
+            if ticket.statut == EN_ATTENTE and not self._admission.consommer():
+                break
+            self._file.popleft()
+            self._dernier_servi = ticket.numero
+            if ticket.statut == EN_ATTENTE:
+                del self._en_attente[ticket.utilisateur_id, ticket.cible]
+                self._executer(ticket)
+                admis += 1
+        self._purger_seaux()
+        return admis
+
+    def _executer(self, ticket):
+        ticket.statut, ticket.admis = ADMIS, self._horloge()
+        debut = self._chronometre()
+        try:
+            ticket.resultat = ticket._operation()
+        except Exception as e:
+            ticket.erreur = e
+        self._mesurer(self._chronometre() - debut)
+        self.nb_admis += 1
+        if ticket._terminer:
+            ticket._terminer(ticket.resultat, ticket.erreur)
+
+    def _mesurer(self, duree):
+        if self.duree_moyenne is None:
+            self.duree_moyenne = duree
+        else:
+            self.duree_moyenne += self.LISSAGE * (duree - self.duree_moyenne)
+        capacite = 1 / max(self.duree_moyenne, 1e-6)
+        self._admission.debit = min(self.debit_max, max(self.debit_min, capacite * self.utilisation_cible))
+
+    # --- Limitation par utilisateur ---
+    def _seau(self, utilisateur_id):
+        seau = self._seaux.get(utilisateur_id)
+        if seau is None:
+            seau = self._seaux[utilisateur_id] = SeauJetons(self.rafale_utilisateur, self.debit_utilisateur, self._horloge)
+        return seau
+
+    def _purger_seaux(self):
+        # Les seaux rechargés sont oubliés: la mémoire suit les utilisateurs actifs, pas tous ceux vus.
+        if self.rafale_utilisateur is None:
+            return
+        maintenant = self._horloge()
+        if maintenant - self._derniere_purge >= self.rafale_utilisateur / self.debit_utilisateur:
+            self._derniere_purge = maintenant
+            self._seaux = {u: seau for u, seau in self._seaux.items() if not seau.est_plein()}
+
+
+# --- Générateur de charge: pic x50 à l'ouverture des inscriptions, horloge simulée ---
+if __name__ == "__main__":
+    import random
+
+    random.seed(50)
+    instant = [0.0]
+    horloge = lambda: instant[0]
+    DUREE_SERVICE = 0.002  # service d'inscription: ~500 opérations/s
+    DEBIT_NORMAL, DEBUT_PIC, FIN_PIC, DUREE = 40, 5.0, 8.0, 30.0
+
+    def servir():
+        instant[0] += DUREE_SERVICE * random.uniform(0.8, 1.2)
+
+    # Arrivées par pas de 10 ms. Pendant le pic, un quart des demandes vient de 100 impatients qui recliquent.
+    arrivees, pas, t, nouveaux = [], 0.01, 0.0, 0
+    while t < DUREE:
+        pic = DEBUT_PIC <= t < FIN_PIC
+        attendu = DEBIT_NORMAL * (50 if pic else 1) * pas
+        nombre = int(attendu) + (random.random() < attendu - int(attendu))
+        for instant_arrivee in sorted(t + random.random() * pas for _ in range(nombre)):
+            if pic and random.random() < 0.25:
+                utilisateur = f"impatient{random.randrange(100)}"
+            else:
+                nouveaux += 1
+                utilisateur = f"P{nouveaux:06d}"
+            arrivees.append((instant_arrivee, utilisateur))
+        t += pas
+
+    def centile(valeurs, c):
+        valeurs = sorted(valeurs)
+        return valeurs[min(len(valeurs) - 1, int(len(valeurs) * c / 100))] if valeurs else 0.0
+
+    def periode(t):
+        return "avant" if t < DEBUT_PIC else "pic" if t < FIN_PIC else "après"
+
+    # Sans salle d'attente: chaque demande est servie dès que possible, les suivantes s'accumulent derrière.
+    instant[0] = 0.0
+    latences = {"avant": [], "pic": [], "après": []}
+    for instant_arrivee, _ in arrivees:
+        instant[0] = max(instant[0], instant_arrivee)
+        servir()
+        latences[periode(instant_arrivee)].append(instant[0] - instant_arrivee)
+    print(f"{len(arrivees)} demandes, pic x50 ({DEBIT_NORMAL * 50}/s) de {DEBUT_PIC:.0f}s à {FIN_PIC:.0f}s, "
+          f"service ~{1 / DUREE_SERVICE:.0f}/s")
+    print("Sans salle d'attente, latence des demandes (p50 / p99):")
+    for nom, valeurs in latences.items():
+        print(f"  {nom:>5}: {centile(valeurs, 50) * 1000:8.1f} ms / {centile(valeurs, 99) * 1000:8.1f} ms")
+
+    # Avec salle d'attente: le débit d'admission suit la durée mesurée des opérations.
+    instant[0] = 0.0
+    salle = SalleAttente(attente_max=8.0, horloge=horloge, chronometre=horloge)
+    latences = {"avant": [], "pic": [], "après": []}
+    estimations = {}  # numéro de ticket -> (ticket, attente estimée à l'émission)
+
+    def operation():
+        debut = instant[0]
+        servir()
+        latences[periode(debut)].append(instant[0] - debut)
+
+    i, t = 0, 0.0
+    while i < len(arrivees) or salle.en_attente():
+        t += pas
+        while i < len(arrivees) and arrivees[i][0] < t:
+            instant_arrivee, utilisateur = arrivees[i]
+            i += 1
+            instant[0] = max(instant[0], instant_arrivee)
+            try:
+                ticket = salle.demander(utilisateur, operation)
+            except ValueError:
+                continue  # FileSaturee ou LimiteUtilisateur, comptées par la salle
+            if ticket.statut == EN_ATTENTE and ticket.numero not in estimations:
+                estimations[ticket.numero] = (ticket, salle.position(ticket)[1])
+        instant[0] = max(instant[0], t)
+        salle.traiter()
+    attentes = [ticket.admis - ticket.emis for ticket, _ in estimations.values()]
+    print(f"Avec salle d'attente (débit d'admission mesuré: {salle.debit:.0f}/s), latence des admis (p50 / p99):")
+    for nom, valeurs in latences.items():
+        print(f"  {nom:>5}: {centile(valeurs, 50) * 1000:8.1f} ms / {centile(valeurs, 99) * 1000:8.1f} ms")
+    erreur = sum(abs(t.admis - t.emis - e) for t, e in estimations.values()) / max(1, len(estimations))
+    print(f"  {salle.nb_admis} admis, {len(attentes)} après attente (p50 {centile(attentes, 50):.1f}s, max "
+          f"{max(attentes, default=0):.1f}s, écart moyen à l'estimation {erreur:.2f}s)")
+    print(f"  Refusées: {salle.nb_refus_file} (attente > {salle.attente_max:.0f}s), {salle.nb_refus_utilisateur} "
+          f"(limite par utilisateur)")
@@ -0,0 +1,378 @@
+# --- Enregistrement et rejeu du trafic: dimensionnement avant la vague d'inscriptions de la rentrée ---
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+
+# Opérations lancées entre deux tours de la boucle Tk.
+LOT_BOUCLE = 100
+CENTILES = (50, 95, 99)
+RESOLUTION_SOMMEIL = 0.002
+
+
+class EnregistreurTrafic:
+    """Trace compacte des opérations du domaine: une ligne JSON `[t_ms, operation, donnees]` par opération,
+    après un en-tête. Les mutations sont notées avec les données du journal, les lectures par l'application
+    (`lire_details`, `lister_evenements`, `connecter_utilisateur`...). `inscriptions` est le nombre
+    d'inscriptions existant au début de l'enregistrement: les index des inscriptions suivantes en découlent."""
+    def __init__(self, chemin, inscriptions=0, locataire=None, horloge=time.monotonic):
+        self._horloge = horloge
+        self._debut = horloge()
+        self._verrou = threading.Lock()
+        self._fichier = open(chemin, "w", encoding="utf-8")
+        self._fichier.write(json.dumps({"debut": datetime.now().isoformat(timespec="seconds"), "inscriptions": inscriptions,
+                                        "locataire": locataire}, ensure_ascii=False) + "\n")
+
+    def noter(self, operation, donnees):
+        ligne = json.dumps([round((self._horloge() - self._debut) * 1000, 1), operation, donnees],
+                           ensure_ascii=False, separators=(",", ":"))
+        with self._verrou:
+            self._fichier.write(ligne + "\n")
+
+    def vider(self):
+        with self._verrou:
+            self._fichier.flush()
+
+    def fermer(self):
+        with self._verrou:
+            self._fichier.close()
+
+
+def lire_trace(chemin):
+    """Retourne (en-tête, liste des (t_ms, operation, donnees)); une dernière ligne tronquée est ignorée."""
+    with open(chemin, encoding="utf-8") as f:
+        entete = json.loads(f.readline())
+        operations = []
+        for ligne in f:
+            try:
+                operations.append(tuple(json.loads(ligne)))
+            except json.JSONDecodeError:
+                break
+    return entete, operations
+
+
+class PlateformeRejeu:
+    """Instance neuve de l'application (EventApp, fenêtre masquée) dont les fichiers sont rangés dans `dossier`.
+    Les opérations rejouées passent par les mêmes méthodes que l'interface, boîtes de dialogue en moins:
+    journal, flux, statistiques, cache, catalogue, notifications, et salle d'attente pour les inscriptions
+    et validations. Comme dans l'application, tout s'exécute dans la boucle Tk, sur le fil principal; il faut
+    donc un affichage (ou Xvfb), comme pour Banc_Demarrage."""
+    def __init__(self, dossier, locataire=None, inscriptions=0):
+        from appEven import EventApp
+
+        self.app = EventApp(dossier_journal=os.path.join(dossier, "journal"),
+                            fichier_notifications=os.path.join(dossier, "notifications.log.gz"),
+                            fichier_regles=os.path.join(dossier, "regles.ini"),
+                            fichier_cache=os.path.join(dossier, "cache.sqlite"),
+                            fichier_catalogue=os.path.join(dossier, "catalogue.evcat"),
+                            fichier_presences=os.path.join(dossier, "presences.jsonl"),
+                            fichier_cle_badges=os.path.join(dossier, "cle_badges.bin"),
+                            fichier_rappels=os.path.join(dossier, "rappels.sqlite"), dossier_site=os.path.join(dossier, "site"),
+                            fichier_boites=os.path.join(dossier, "boites.sqlite"), port_pointage=None, port_flux=None,
+                            locataire=locataire, racine_locataires=os.path.join(dossier, "locataires"))
+        self.app.withdraw()
+        while not self.app.chargement_termine:
+            self.app.update()
+            time.sleep(RESOLUTION_SOMMEIL)
+        self._premier_index = self._prochain_index = inscriptions
+        self._index_app = {}  # index dans la trace -> index dans app.inscriptions
+        self._echecs = set()  # inscriptions de la trace dont la création a échoué
+        self._resolues = []   # inscriptions de la trace créées (ou refusées) depuis le dernier appel à resolues()
+        self._en_salle = {}   # (utilisateur, cible) -> fins des demandes identiques en salle d'attente
+
+    def fermer(self):
+        self.app._fermer()
+
+    def preparer(self, operation, donnees):
+        """Appelé dans l'ordre de la trace: attribue l'index des nouvelles inscriptions."""
+        if operation == "inscrire_participant":
+            donnees = dict(donnees, index=self._prochain_index)
+            self._prochain_index += 1
+        return donnees
+
+    def resolues(self):
+        """Index (dans la trace) des inscriptions sorties de la salle d'attente depuis le dernier appel."""
+        resolues, self._resolues = self._resolues, []
+        return resolues
+
+    # --- Résolution des références de la trace ---
+    def _evenement(self, evenement_id):
+        evenement = self.app.evenements.get(evenement_id)
+        if evenement is None:
+            # Entité antérieure à l'enregistrement (ou création en échec): la trace ne permet pas de la recréer.
+            raise LookupError(f"événement {evenement_id} absent de l'instance rejouée")
+        return evenement
+
+    def _participant(self, participant_id):
+        if participant_id is None:
+            return None
+        participant = self.app.participants.get(participant_id)
+        if participant is None:
+            raise LookupError(f"participant {participant_id} absent de l'instance rejouée")
+        return participant
+
+    def _inscription(self, index):
+        """Index de l'inscription dans l'application; None tant qu'elle est en salle d'attente."""
+        if index in self._index_app:
+            return self._index_app[index]
+        if self._premier_index <= index < self._prochain_index and index not in self._echecs:
+            return None
+        raise LookupError(f"inscription {index} absente de l'instance rejouée")
+
+    def _admettre(self, utilisateur_id, cible, operation, terminer):
+        # Une demande identique déjà en salle d'attente reçoit le même ticket: elle se termine avec lui.
+        cle = (utilisateur_id, cible)
+        if cle in self._en_salle:
+            self._en_salle[cle].append(terminer)
+            return
+
+        def terminer_demandes(resultat, erreur):
+            for fin in self._en_salle.pop(cle):
+                fin(resultat, erreur)
+
+        self._en_salle[cle] = [terminer]
+        self.app._admettre(utilisateur_id, cible, "Rejeu", operation, terminer=terminer_demandes)
+
+    # --- Exécution ---
+    def executer(self, operation, donnees, terminer):
+        """Lance l'opération; `terminer(erreur)` est appelée à sa fin (erreur None si réussie), tout de suite ou
+        à l'admission par la salle d'attente. Retourne None si l'inscription visée est encore en salle d'attente
+        (l'opération est à relancer quand `resolues()` la signale), False si l'opération est inconnue."""
+        app = self.app
+        try:
+            if operation == "inscrire_participant":
+                participant = self._participant(donnees["participant_id"])
+                evenement = self._evenement(donnees["evenement_id"])
+                date_occurrence = date.fromisoformat(donnees["date_occurrence"]) if donnees.get("date_occurrence") else None
+
+                def inscrite(resultat, erreur):
+                    if erreur is None:
+                        self._index_app[donnees["index"]] = len(app.inscriptions) - 1
+                    else:
+                        self._echecs.add(donnees["index"])
+                    self._resolues.append(donnees["index"])
+                    terminer(_decrire(erreur))
+
+                self._admettre(participant.id, ("inscrire", evenement.id, date_occurrence),
+                               lambda: app._enregistrer_inscription(participant, evenement, date_occurrence), inscrite)
+                return True
+            if operation in ("valider_inscription", "annuler_inscription"):
+                index = self._inscription(donnees["index"])
+                if index is None:
+                    return None
+                if operation == "valider_inscription":
+                    self._admettre(app.inscriptions[index].participant.id, ("valider", index),
+                                   lambda: app._valider_inscription(index), lambda resultat, erreur: terminer(_decrire(erreur)))
+                    return True
+                app._annuler_inscription(index)
+            elif operation == "creer_evenement":
+                app._ajouter_evenement(app._evenement_depuis_donnees(donnees))
+            elif operation == "creer_participant":
+                app._ajouter_participant(app._participant_depuis_donnees(donnees["id"], donnees))
+            elif operation in ("mettre_a_jour_description", "modifier_places", "modifier_date", "annuler_evenement"):
+                evenement = self._evenement(donnees["id"])
+                # La trace porte la version produite: la mise à jour attend la version précédente.
+                version = donnees["version"] - 1 if "version" in donnees else None
+                if operation == "mettre_a_jour_description":
+                    app.evenement_service.mettre_a_jour_description(evenement.id, donnees["description"], version)
+                elif operation == "modifier_places":
+                    app._modifier_places(evenement, donnees["nombre_places"], version)
+                elif operation == "modifier_date":
+                    app._modifier_date(evenement, date.fromisoformat(donnees["date"]), version)
+                else:
+                    app._annuler_evenement(evenement, version)
+            elif operation == "connecter_utilisateur":
+                app.auth_service.connecter_utilisateur(self._participant(donnees["id"]).id)
+            elif operation == "deconnecter_utilisateur":
+                app.auth_service.utilisateurs_connectes.discard(donnees["id"])
+            elif operation == "lire_details":
+                app.evenement_service_proxy.get_details_evenement(donnees["id"], self._participant(donnees.get("utilisateur")))
+            elif operation == "lister_evenements":
+                app.evenement_service_proxy.lister_evenements(self._participant(donnees.get("utilisateur")),
+                                                              limite=donnees.get("limite", 50))
+            else:
+                return False
+        except Exception as e:
+            if operation == "inscrire_participant":
+                self._echecs.add(donnees["index"])
+            terminer(_decrire(e))
+            return True
+        terminer(None)
+        return True
+
+
+def _decrire(erreur):
+    return None if erreur is None else f"{type(erreur).__name__}: {erreur}"
+
+
+def centile(valeurs_triees, p):
+    if not valeurs_triees:
+        return 0.0
+    return valeurs_triees[min(len(valeurs_triees) - 1, int(len(valeurs_triees) * p / 100))]
+
+
+def rejouer(chemin, vitesse=1.0, dossier=None):
+    """Rejoue la trace contre une instance neuve, `vitesse` fois plus vite qu'enregistrée (0: sans attente).
+    Un fil cadence la trace; le fil principal fait tourner la boucle Tk et exécute les opérations dans l'ordre,
+    comme l'interface. La latence d'une opération court de son instant prévu à sa fin, attente dans la boucle
+    et en salle d'attente comprises. Retourne un rapport: débit, latences par opération, erreurs et retard de
+    lancement (un retard qui croît indique que l'instance ne suit plus le rythme demandé)."""
+    entete, operations = lire_trace(chemin)
+    temporaire = dossier is None
+    dossier = dossier or tempfile.mkdtemp(prefix="rejeu_")
+    plateforme = PlateformeRejeu(dossier, entete.get("locataire"), entete.get("inscriptions", 0))
+    latences = defaultdict(list)
+    erreurs = defaultdict(list)
+    ignorees = defaultdict(int)
+    retards = []
+    differees = defaultdict(list)  # index d'inscription (trace) -> opérations qui attendent sa création
+    en_cours = [0]
+    file = queue.Queue()
+
+    def cadencer(debut):
+        for t_ms, operation, donnees in operations:
+            prevu = debut + t_ms / 1000 / vitesse if vitesse else None
+            if prevu is not None:
+                attente = prevu - time.perf_counter()
+                # Pas de sommeil plus court que la résolution de l'ordonnanceur: les opérations proches partent ensemble.
+                if attente > RESOLUTION_SOMMEIL:
+                    time.sleep(attente)
+            file.put((operation, donnees, prevu))
+        file.put(None)
+
+    def lancer(operation, donnees, prevu):
+        def terminer(erreur):
+            en_cours[0] -= 1
+            if erreur:
+                erreurs[operation].append(erreur)
+            else:
+                latences[operation].append(time.perf_counter() - prevu)
+
+        en_cours[0] += 1
+        lancee = plateforme.executer(operation, donnees, terminer)
+        if lancee is None:
+            en_cours[0] -= 1
+            differees[donnees["index"]].append((operation, donnees, prevu))
+        elif lancee is False:
+            en_cours[0] -= 1
+            ignorees[operation] += 1
+
+    debut = time.perf_counter()
+    threading.Thread(target=cadencer, args=(debut,), name="cadence-rejeu", daemon=True).start()
+    try:
+        trace_lue = False
+        while not trace_lue or differees or en_cours[0]:
+            for _ in range(LOT_BOUCLE):
+                try:
+                    element = file.get_nowait()
+                except queue.Empty:
+                    break
+                if element is None:
+                    trace_lue = True
+                    break
+                operation, donnees, prevu = element
+                # Sans cadence, l'opération est prévue au moment où la boucle la prend.
+                maintenant = time.perf_counter()
+                prevu = maintenant if prevu is None else prevu
+                retards.append(max(0.0, maintenant - prevu))
+                lancer(operation, plateforme.preparer(operation, donnees), prevu)
+            plateforme.app.update()
+            for index in plateforme.resolues():
+                for operation, donnees, prevu in differees.pop(index, ()):
+                    lancer(operation, donnees, prevu)
+            if file.empty():
+                time.sleep(RESOLUTION_SOMMEIL)
+        duree = time.perf_counter() - debut
+    finally:
+        plateforme.fermer()
+        if temporaire:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+    retards.sort()
+    par_operation = {}
+    for operation in sorted(set(latences) | set(erreurs)):
+        valeurs = sorted(latences[operation])
+        total = len(valeurs) + len(erreurs[operation])
+        par_operation[operation] = {"nombre": total, "erreurs": len(erreurs[operation]),
+                                    "taux_erreurs": len(erreurs[operation]) / total,
+                                    **{f"p{p}_ms": centile(valeurs, p) * 1000 for p in CENTILES},
+                                    "exemple_erreur": erreurs[operation][0] if erreurs[operation] else None}
+    executees = sum(o["nombre"] for o in par_operation.values())
+    return {"vitesse": vitesse, "duree_s": duree, "operations": executees,
+            "debit": executees / duree if duree else 0.0,
+            "taux_erreurs": sum(o["erreurs"] for o in par_operation.values()) / executees if executees else 0.0,
+            "retard_p99_ms": centile(retards, 99) * 1000, "par_operation": par_operation, "ignorees": dict(ignorees)}
+
+
+def formater_rapport(rapport):
+    lignes = [f"Rejeu x{rapport['vitesse'] or 'max'}: {rapport['operations']} opérations "
+              f"en {rapport['duree_s']:.2f}s, {rapport['debit']:,.0f} op/s, erreurs {rapport['taux_erreurs']:.2%}, "
+              f"retard p99 {rapport['retard_p99_ms']:.1f} ms",
+              f"  {'opération':<26}{'nombre':>8}{'erreurs':>9}" + "".join(f"{f'p{p} ms':>10}" for p in CENTILES) +
+              "  (depuis l'instant prévu)"]
+    for operation, mesures in rapport["par_operation"].items():
+        lignes.append(f"  {operation:<26}{mesures['nombre']:>8}{mesures['erreurs']:>9}" +
+                      "".join(f"{mesures[f'p{p}_ms']:>10.3f}" for p in CENTILES))
+        if mesures["exemple_erreur"]:
+            lignes.append(f"    ex.: {mesures['exemple_erreur']}")
+    if rapport["ignorees"]:
+        lignes.append(f"  Non rejouées: {rapport['ignorees']}")
+    return "\n".join(lignes)
+
+
+def trace_synthetique(chemin, nb_evenements=200, nb_participants=3000, inscriptions_par_participant=3, duree_s=10.0):
+    """Trace d'une vague d'inscriptions de rentrée, étalée sur `duree_s` secondes (horloge simulée)."""
+    horloge = [0.0]
+    enregistreur = EnregistreurTrafic(chemin, horloge=lambda: horloge[0])
+    nb_operations = nb_evenements + nb_participants * (3 + 3 * inscriptions_par_participant) + nb_participants // 100
+    pas = duree_s / nb_operations
+    index = 0
+
+    def noter(operation, donnees):
+        horloge[0] += pas
+        enregistreur.noter(operation, donnees)
+
+    for i in range(1, nb_evenements + 1):
+        noter("creer_evenement", {"id": f"EV{i:03d}", "type": "Seminaire", "nom": f"Séminaire {i}", "description": "Introduction",
+                                  "date": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}", "recurrence": None, "version": 1,
+                                  "domaine": "Informatique"})
+    for i in range(1, nb_participants + 1):
+        participant_id = f"P{i:03d}"
+        noter("creer_participant", {"id": participant_id, "nom": f"Étudiant {i}", "email": f"e{i}@univ.fr",
+                                    "est_etudiant": i % 5 != 0})
+        noter("connecter_utilisateur", {"id": participant_id})
+        noter("lister_evenements", {"utilisateur": participant_id, "limite": 20})
+        for k in range(inscriptions_par_participant):
+            evenement_id = f"EV{1 + (i * 7 + k * 13) % nb_evenements:03d}"
+            noter("lire_details", {"id": evenement_id, "utilisateur": participant_id})
+            noter("inscrire_participant", {"participant_id": participant_id, "evenement_id": evenement_id,
+                                           "date_occurrence": None, "date_inscription": "2026-09-01"})
+            noter("valider_inscription", {"index": index, "est_validee": True})
+            index += 1
+        if i % 100 == 0:
+            noter("mettre_a_jour_description", {"id": f"EV{1 + i % nb_evenements:03d}", "description": f"Salle {i}"})
+    enregistreur.fermer()
+
+
+# --- Rejeu d'une trace (python Simulateur_Trafic.py trace.jsonl [vitesse]) ou d'une trace synthétique ---
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        vitesse = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+        print(formater_rapport(rejouer(sys.argv[1], vitesse)))
+    else:
+        dossier = tempfile.mkdtemp(prefix="trafic_")
+        try:
+            chemin = os.path.join(dossier, "trace.jsonl")
+            trace_synthetique(chemin)
+            print(f"Trace synthétique: {len(lire_trace(chemin)[1])} opérations sur 10 s, "
+                  f"{os.path.getsize(chemin) / 1024:.0f} Kio")
+            for vitesse in (1, 10, 0):
+                print(formater_rapport(rejouer(chemin, vitesse)))
+        finally:
+            shutil.rmtree(dossier)
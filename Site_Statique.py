@@ -0,0 +1,229 @@
+# --- Catalogue public statique: pages rendues par les implémenteurs du Bridge, reconstruites de façon incrémentale ---
+import html
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Liste_Evenements import CONNEXION_REQUISE, INSCRIPTION_REQUISE, PUBLIC
+
+INDEX = "index"
+
+
+def _date_iso(evenement):
+    return evenement.date.isoformat()
+
+
+class GenerateurSite:
+    """Génère le catalogue public dans `dossier`: un index, une page par jour (`dates/AAAA-MM-JJ`), une page
+    par type et par mois (`types/<Type>/AAAA-MM`, listées par `types/<Type>`) et une page par événement
+    (`evenements/<ID>`). Les fragments viennent de l'implémenteur du Bridge (`afficher_evenement_simple` et
+    `afficher_evenement_detaille`): AffichageWeb produit un site HTML, AffichageMobile un site texte. Les
+    fragments sont insérés tels quels: l'implémenteur HTML échappe les champs saisis par les organisateurs.
+
+    Chaque page retient les événements dont elle dépend. `mettre_a_jour(evenements)` ne rend à nouveau que
+    les fragments de ces événements, puis ne reconstruit que les pages dont un fragment ou la liste des
+    événements a changé; les fichiers sont écrits en parallèle et remplacés atomiquement. `classe_visibilite`
+    (voir Liste_Evenements.py) écarte les événements secrets; les détails réservés aux inscrits ne sont pas
+    publiés (leur page reprend la carte)."""
+    def __init__(self, dossier, implementateur, classe_visibilite=None, extension=".html", fils=8):
+        self.dossier = dossier
+        self.implementateur = implementateur
+        self.classe_visibilite = classe_visibilite or (lambda evenement: PUBLIC)
+        self.extension = extension
+        self._cartes = {}       # evenement_id -> (cle de tri, fragment simple)
+        self._membres = {}      # page de liste -> set(evenement_id)
+        self._pages_de = {}     # evenement_id -> pages (listes et page propre) qui en dépendent
+        self._types = {}        # type -> {mois: nombre d'événements}
+        self._verrou = threading.Lock()
+        self._executeur = ThreadPoolExecutor(max_workers=fils, thread_name_prefix="site")
+        self.nb_pages_ecrites = 0
+
+    # --- Dépendances ---
+    def _pages_evenement(self, evenement):
+        jour = _date_iso(evenement)
+        return (f"dates/{jour}", f"types/{evenement.type_evenement}/{jour[:7]}", f"evenements/{evenement.id}")
+
+    def _retirer(self, evenement_id, pages):
+        ancien_type = None
+        for page in self._pages_de.pop(evenement_id, ()):
+            membres = self._membres.get(page)
+            if membres is not None:
+                membres.discard(evenement_id)
+                pages.add(page)
+                if page.startswith("types/"):
+                    _, ancien_type, mois = page.split("/")
+                    self._types[ancien_type][mois] -= 1
+                    if not self._types[ancien_type][mois]:
+                        del self._types[ancien_type][mois]
+                    pages.add(f"types/{ancien_type}")
+            else:
+                pages.add(page)
+        self._cartes.pop(evenement_id, None)
+
+    def _ajouter(self, evenement, pages):
+        *listes, propre = self._pages_evenement(evenement)
+        for page in listes:
+            self._membres.setdefault(page, set()).add(evenement.id)
+        _, type_evenement, mois = listes[1].split("/")
+        mois_du_type = self._types.setdefault(type_evenement, {})
+        mois_du_type[mois] = mois_du_type.get(mois, 0) + 1
+        self._pages_de[evenement.id] = (*listes, propre)
+        pages.update(listes)
+        pages.update((propre, f"types/{type_evenement}"))
+
+    # --- Construction ---
+    def construire(self, evenements):
+        """Génération complète (premier lancement). Retourne le nombre de pages écrites."""
+        with self._verrou:
+            self._cartes.clear()
+            self._membres.clear()
+            self._pages_de.clear()
+            self._types.clear()
+        return self.mettre_a_jour(evenements, complet=True)
+
+    def mettre_a_jour(self, evenements, complet=False):
+        """Reporte les événements créés ou modifiés (objets à jour). Retourne le nombre de pages écrites."""
+        with self._verrou:
+            pages = {INDEX} if complet else set()
+            contenus = {}
+            for evenement in evenements:
+                classe = self.classe_visibilite(evenement)
+                ancienne_carte = self._cartes.get(evenement.id)
+                anciennes_pages = self._pages_de.get(evenement.id)
+                if classe & CONNEXION_REQUISE:
+                    # Événement secret: absent du catalogue public (retiré s'il y figurait).
+                    if anciennes_pages is not None:
+                        self._retirer(evenement.id, pages)
+                        contenus[f"evenements/{evenement.id}"] = None
+                        pages.add(INDEX)
+                    continue
+                carte = self.implementateur.afficher_evenement_simple(evenement)
+                cle = (_date_iso(evenement), evenement.nom, evenement.id)
+                nouvelles_pages = self._pages_evenement(evenement)
+                if anciennes_pages != nouvelles_pages:
+                    if anciennes_pages is not None:
+                        self._retirer(evenement.id, pages)
+                    self._ajouter(evenement, pages)
+                    pages.add(INDEX)
+                elif ancienne_carte != (cle, carte):
+                    # Même pages, mais la carte affichée dans les listes a changé.
+                    pages.update(nouvelles_pages)
+                else:
+                    pages.add(nouvelles_pages[-1])
+                self._cartes[evenement.id] = (cle, carte)
+                detail = self.implementateur.afficher_evenement_detaille(evenement) if not classe & INSCRIPTION_REQUISE \
+                    else carte + self._paragraphe("Détails réservés aux inscrits.")
+                contenus[nouvelles_pages[-1]] = self._page(evenement.nom, detail, profondeur=1)
+            for page in pages:
+                if page not in contenus:
+                    contenus[page] = self._rendre(page)
+        return self._ecrire(contenus)
+
+    # --- Rendu des pages ---
+    def _lien(self, cible, texte, profondeur):
+        chemin = "../" * profondeur + cible + self.extension
+        if self.extension == ".html":
+            return f"<li><a href='{html.escape(chemin)}'>{texte}</a></li>"
+        return f"{texte}\n  -> {chemin}"
+
+    def _paragraphe(self, texte):
+        return f"<p>{html.escape(texte)}</p>" if self.extension == ".html" else f"{texte}\n"
+
+    def _page(self, titre, corps, profondeur=0):
+        if self.extension != ".html":
+            return f"=== {titre} ===\n{corps}\n"
+        accueil = "../" * profondeur + INDEX + self.extension
+        return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(titre)}</title></head><body>"
+                f"<nav><a href='{html.escape(accueil)}'>Catalogue</a></nav>{corps}</body></html>")
+
+    def _liste(self, liens):
+        return f"<ul>{''.join(liens)}</ul>" if self.extension == ".html" else "\n".join(liens)
+
+    def _rendre(self, page):
+        if page == INDEX:
+            jours = sorted({p.split("/")[1] for p, membres in self._membres.items() if p.startswith("dates/") and membres})
+            types = sorted(t for t, mois in self._types.items() if mois)
+            return self._page("Catalogue des événements",
+                              self._paragraphe("Par type") +
+                              self._liste([self._lien(f"types/{t}", html.escape(t), 0) for t in types]) +
+                              self._paragraphe("Par date") +
+                              self._liste([self._lien(f"dates/{j}", j, 0) for j in jours]))
+        parties = page.split("/")
+        if parties[0] == "types" and len(parties) == 2:
+            mois = self._types.get(parties[1], {})
+            if not mois:
+                return None
+            return self._page(parties[1], self._liste([self._lien(f"types/{parties[1]}/{m}", f"{m} ({n})", 1)
+                                                       for m, n in sorted(mois.items())]), profondeur=1)
+        membres = self._membres.get(page)
+        if not membres:
+            return None  # page vidée (événement déplacé ou retiré): le fichier est supprimé
+        profondeur = len(parties) - 1
+        cartes = sorted((self._cartes[e][0], e, self._cartes[e][1]) for e in membres)
+        titre = parties[1] if parties[0] == "dates" else f"{parties[1]} — {parties[2]}"
+        return self._page(titre, self._liste([self._lien(f"evenements/{e}", carte, profondeur) for _, e, carte in cartes]),
+                          profondeur)
+
+    # --- Écriture ---
+    def _ecrire(self, contenus):
+        def ecrire(page, contenu):
+            chemin = os.path.join(self.dossier, *page.split("/")) + self.extension
+            if contenu is None:
+                if os.path.exists(chemin):
+                    os.remove(chemin)
+                return
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            temporaire = f"{chemin}.{threading.get_ident()}.tmp"
+            with open(temporaire, "w", encoding="utf-8") as f:
+                f.write(contenu)
+            os.replace(temporaire, chemin)
+
+        if len(contenus) == 1:
+            ecrire(*next(iter(contenus.items())))
+        else:
+            for _ in self._executeur.map(lambda entree: ecrire(*entree), contenus.items()):
+                pass
+        self.nb_pages_ecrites += len(contenus)
+        return len(contenus)
+
+    def fermer(self):
+        self._executeur.shutdown()
+
+
+# --- Mesure: 50 000 événements, génération complète puis modifications isolées ---
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    import time
+    from datetime import date, timedelta
+    from types import SimpleNamespace
+
+    class AffichageWebMesure:
+        def afficher_evenement_simple(self, evenement):
+            return f"<div class='card'><h3>{html.escape(evenement.nom)}</h3><p>{evenement.date.strftime('%Y-%m-%d')}</p></div>"
+
+        def afficher_evenement_detaille(self, evenement):
+            return f"<div class='page'><h1>{html.escape(evenement.nom)}</h1><p>{html.escape(evenement.description)}</p></div>"
+
+    types = ("Conference", "Hackathon", "Seminaire")
+    evenements = [SimpleNamespace(id=f"EV{i:05d}", nom=f"Événement {i}", description="Introduction",
+                                  date=date(2025, 1, 1) + timedelta(days=i % 730), type_evenement=types[i % 3])
+                  for i in range(50000)]
+    dossier = tempfile.mkdtemp(prefix="site_")
+    try:
+        generateur = GenerateurSite(dossier, AffichageWebMesure())
+        debut = time.perf_counter()
+        nb_pages = generateur.construire(evenements)
+        print(f"Génération complète: {nb_pages} pages en {time.perf_counter() - debut:.2f}s")
+
+        evenement = evenements[12345]
+        for libelle, modification in (("description", lambda: setattr(evenement, "description", "Nouvelle salle")),
+                                      ("nom", lambda: setattr(evenement, "nom", "Événement renommé")),
+                                      ("date", lambda: setattr(evenement, "date", evenement.date + timedelta(days=40)))):
+            modification()
+            debut = time.perf_counter()
+            nb_pages = generateur.mettre_a_jour([evenement])
+            print(f"Modification ({libelle}): {nb_pages} page(s) reconstruite(s) en {(time.perf_counter() - debut) * 1000:.1f} ms")
+        generateur.fermer()
+    finally:
+        shutil.rmtree(dossier)
@@ -0,0 +1,235 @@
+# --- Statistiques des inscriptions: agrégats incrémentaux et recalcul par colonnes ---
+import csv
+import threading
+from array import array
+from datetime import date
+
+EN_ATTENTE, VALIDEE, LISTE_ATTENTE, ANNULEE = range(4)
+STATUTS = ("en_attente", "validee", "liste_attente", "annulee")
+JOUR_INCONNU = 0
+
+COLONNES_EVENEMENTS = ("evenement_id", "nom", "capacite", "inscriptions", "validees", "en_attente", "liste_attente",
+                       "annulees", "taux_remplissage", "part_etudiants")
+
+
+class _Compteurs:
+    __slots__ = ("par_statut", "etudiants", "non_etudiants")
+
+    def __init__(self):
+        self.par_statut = [0, 0, 0, 0]
+        self.etudiants = 0      # inscriptions non annulées d'étudiants
+        self.non_etudiants = 0
+
+
+class StatistiquesInscriptions:
+    """Agrégats tenus à jour par le flux de mutations du journal (`appliquer(op, donnees)`).
+
+    Les inscriptions sont aussi conservées en colonnes (event, participant, statut, jour), ce qui permet
+    de tout recalculer en un seul passage (`recalculer()`). Les lectures prennent un instantané
+    cohérent sous verrou, étiqueté par le nombre de mutations appliquées.
+    """
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.seq = 0
+        self._evenements = {}      # evenement_id -> {"nom", "capacite"}
+        self._etudiants = {}       # participant_id -> bool
+        self._codes_evenements = []
+        self._code_evenement = {}
+        self._codes_participants = []
+        self._code_participant = {}
+        # Colonnes, une ligne par inscription (même index que le journal).
+        self._col_evenement = array("I")
+        self._col_participant = array("I")
+        self._col_statut = bytearray()
+        self._col_jour = array("i")
+        self._inscriptions_du_participant = {}  # code participant -> [index]
+        self._inscriptions_de_evenement = {}    # code événement -> [index]
+        self._compteurs = {}
+        self._par_jour = {}
+
+    @classmethod
+    def depuis_etat(cls, etat):
+        """Construit les agrégats à partir d'un EtatDomaine (ex: snapshot du journal)."""
+        statistiques = cls()
+        for donnees in etat.evenements.values():
+            statistiques.appliquer("creer_evenement", donnees)
+        for donnees in etat.participants.values():
+            statistiques.appliquer("creer_participant", donnees)
+        for index, donnees in enumerate(etat.inscriptions):
+            statistiques.appliquer("inscrire_participant", donnees)
+            if donnees.get("est_annulee"):
+                statistiques.appliquer("annuler_inscription", {"index": index})
+            elif donnees.get("est_validee"):
+                statistiques.appliquer("valider_inscription", {"index": index, "est_validee": True})
+            elif donnees.get("en_attente_depuis") is not None:
+                statistiques.appliquer("mettre_en_attente", {"index": index})
+        return statistiques
+
+    # --- Mise à jour incrémentale ---
+    def _code(self, codes, index, cle):
+        code = index.get(cle)
+        if code is None:
+            code = index[cle] = len(codes)
+            codes.append(cle)
+        return code
+
+    def _compter(self, index, signe):
+        evenement_id = self._codes_evenements[self._col_evenement[index]]
+        compteurs = self._compteurs.setdefault(evenement_id, _Compteurs())
+        statut = self._col_statut[index]
+        compteurs.par_statut[statut] += signe
+        if statut != ANNULEE:
+            if self._etudiants.get(self._codes_participants[self._col_participant[index]], True):
+                compteurs.etudiants += signe
+            else:
+                compteurs.non_etudiants += signe
+
+    def _changer_statut(self, index, statut):
+        self._compter(index, -1)
+        self._col_statut[index] = statut
+        self._compter(index, +1)
+
+    def appliquer(self, operation, donnees):
+        with self._verrou:
+            self.seq += 1
+            if operation == "creer_evenement":
+                self._evenements[donnees["id"]] = {"nom": donnees["nom"], "capacite": donnees.get("nombre_places")}
+            elif operation == "modifier_places":
+                self._evenements[donnees["id"]]["capacite"] = donnees["nombre_places"]
+            elif operation == "creer_participant":
+                self._etudiants[donnees["id"]] = donnees["est_etudiant"]
+            elif operation == "mettre_a_jour_participant":
+                code = self._code_participant.get(donnees["id"])
+                indices = self._inscriptions_du_participant.get(code, ()) if code is not None else ()
+                for index in indices:
+                    self._compter(index, -1)
+                self._etudiants[donnees["id"]] = donnees["est_etudiant"]
+                for index in indices:
+                    self._compter(index, +1)
+            elif operation == "inscrire_participant":
+                code_participant = self._code(self._codes_participants, self._code_participant, donnees["participant_id"])
+                code_evenement = self._code(self._codes_evenements, self._code_evenement, donnees["evenement_id"])
+                index = len(self._col_statut)
+                self._col_evenement.append(code_evenement)
+                self._col_participant.append(code_participant)
+                self._col_statut.append(EN_ATTENTE)
+                jour = date.fromisoformat(donnees["date_inscription"]).toordinal() if donnees.get("date_inscription") else JOUR_INCONNU
+                self._col_jour.append(jour)
+                self._inscriptions_du_participant.setdefault(code_participant, []).append(index)
+                self._inscriptions_de_evenement.setdefault(code_evenement, []).append(index)
+                self._par_jour[jour] = self._par_jour.get(jour, 0) + 1
+                self._compter(index, +1)
+            elif operation == "valider_inscription":
+                self._changer_statut(donnees["index"], VALIDEE if donnees["est_validee"] else EN_ATTENTE)
+            elif operation == "mettre_en_attente":
+                self._changer_statut(donnees["index"], LISTE_ATTENTE)
+            elif operation == "annuler_inscription":
+                self._changer_statut(donnees["index"], ANNULEE)
+            elif operation == "annuler_evenement":
+                code = self._code_evenement.get(donnees["id"])
+                for index in self._inscriptions_de_evenement.get(code, ()) if code is not None else ():
+                    if self._col_statut[index] != ANNULEE:
+                        self._changer_statut(index, ANNULEE)
+
+    def recalculer(self):
+        """Recalcul complet en un passage sur les colonnes (rapports complets, contrôle des agrégats)."""
+        with self._verrou:
+            nb_evenements = len(self._codes_evenements)
+            par_statut = [[0, 0, 0, 0] for _ in range(nb_evenements)]
+            etudiants = [0] * nb_evenements
+            non_etudiants = [0] * nb_evenements
+            est_etudiant = [self._etudiants.get(p, True) for p in self._codes_participants]
+            par_jour = {}
+            for code_evenement, code_participant, statut, jour in zip(self._col_evenement, self._col_participant,
+                                                                      self._col_statut, self._col_jour):
+                par_statut[code_evenement][statut] += 1
+                if statut != ANNULEE:
+                    if est_etudiant[code_participant]:
+                        etudiants[code_evenement] += 1
+                    else:
+                        non_etudiants[code_evenement] += 1
+                par_jour[jour] = par_jour.get(jour, 0) + 1
+            self._compteurs = {}
+            for code, evenement_id in enumerate(self._codes_evenements):
+                compteurs = self._compteurs[evenement_id] = _Compteurs()
+                compteurs.par_statut = par_statut[code]
+                compteurs.etudiants = etudiants[code]
+                compteurs.non_etudiants = non_etudiants[code]
+            self._par_jour = par_jour
+
+    # --- Rapports ---
+    def rapport_evenements(self):
+        """Une ligne par événement (colonnes COLONNES_EVENEMENTS). Retourne (seq, lignes)."""
+        with self._verrou:
+            lignes = []
+            for evenement_id, evenement in self._evenements.items():
+                compteurs = self._compteurs.get(evenement_id) or _Compteurs()
+                en_attente, validees, liste_attente, annulees = compteurs.par_statut
+                capacite = evenement["capacite"]
+                actives = compteurs.etudiants + compteurs.non_etudiants
+                lignes.append({
+                    "evenement_id": evenement_id, "nom": evenement["nom"], "capacite": capacite,
+                    "inscriptions": sum(compteurs.par_statut), "validees": validees, "en_attente": en_attente,
+                    "liste_attente": liste_attente, "annulees": annulees,
+                    "taux_remplissage": round(validees / capacite, 4) if capacite else None,
+                    "part_etudiants": round(compteurs.etudiants / actives, 4) if actives else None,
+                })
+            return self.seq, lignes
+
+    def entonnoir(self, presents=None):
+        """Inscriptions -> validées -> présents (si les compteurs de présence sont fournis)."""
+        with self._verrou:
+            totaux = [sum(c.par_statut[s] for c in self._compteurs.values()) for s in range(4)]
+            etapes = [("inscriptions", sum(totaux)), ("validees", totaux[VALIDEE])]
+        if presents is not None:
+            etapes.append(("presents", sum(presents.values())))
+        return etapes
+
+    def inscriptions_par_jour(self):
+        with self._verrou:
+            return [(date.fromordinal(jour).isoformat() if jour != JOUR_INCONNU else "inconnue", nombre)
+                    for jour, nombre in sorted(self._par_jour.items())]
+
+
+def exporter_csv(chemin, lignes, colonnes):
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        ecrivain = csv.DictWriter(f, fieldnames=colonnes, delimiter=";")
+        ecrivain.writeheader()
+        ecrivain.writerows(lignes)
+
+
+# --- Exemple d'utilisation / mesure ---
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(1)
+    statistiques = StatistiquesInscriptions()
+    for i in range(500):
+        statistiques.appliquer("creer_evenement", {"id": f"EV{i:03d}", "nom": f"Événement {i}", "nombre_places": 400})
+    for i in range(50000):
+        statistiques.appliquer("creer_participant", {"id": f"P{i:05d}", "est_etudiant": random.random() < 0.8})
+    nb_inscriptions = 200000
+    debut = time.perf_counter()
+    for index in range(nb_inscriptions):
+        statistiques.appliquer("inscrire_participant", {"participant_id": f"P{random.randrange(50000):05d}",
+                                                        "evenement_id": f"EV{random.randrange(500):03d}",
+                                                        "date_inscription": f"2025-09-{1 + index % 30:02d}"})
+        tirage = random.random()
+        if tirage < 0.6:
+            statistiques.appliquer("valider_inscription", {"index": index, "est_validee": True})
+        elif tirage < 0.7:
+            statistiques.appliquer("annuler_inscription", {"index": index})
+    duree = time.perf_counter() - debut
+    print(f"{statistiques.seq} mutations appliquées: {duree / nb_inscriptions * 1e6:.1f} µs par inscription")
+
+    debut = time.perf_counter()
+    seq, lignes = statistiques.rapport_evenements()
+    jours = statistiques.inscriptions_par_jour()
+    print(f"Rapport ({len(lignes)} événements, {len(jours)} jours): {(time.perf_counter() - debut) * 1000:.2f} ms")
+    avant = {ligne["evenement_id"]: ligne for ligne in lignes}
+    debut = time.perf_counter()
+    statistiques.recalculer()
+    print(f"Recalcul complet par colonnes: {(time.perf_counter() - debut) * 1000:.0f} ms, "
+          f"agrégats identiques: {avant == {l['evenement_id']: l for l in statistiques.rapport_evenements()[1]}}")
+    print(statistiques.entonnoir())
@@ -1,15 +1,62 @@
+import csv
+import html
+import json
+from collections import OrderedDict, deque
+import importlib.util
+import os
+import sys
+import threading
+import time
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk # Ensure ttk is imported
+from tkinter import filedialog, messagebox, scrolledtext, ttk # Ensure ttk is imported
 from abc import ABC, abstractmethod
-from datetime import date
+from datetime import date, timedelta
+from Journal import EtatDomaine, JournalEvenements
+from Digest_Notifications import DiffusionParLots, MoteurDigest, SeauJetons, SuiviDiffusions
+from Journal_Notifications import JournalNotificationsBorne
+from Regles_DSL import MoteurRegles
+from Recurrence import RegleRecurrence, occurrences_evenement, est_occurrence
+from Conflits import VerificateurConflits, audit_conflits
+from Cache_Partage import CacheDeuxNiveaux, OPERATIONS_INVALIDANTES
+from Catalogue_Colonnaire import CatalogueColonnaire, ecrire_lignes, ligne_catalogue
+from Liste_Attente import PlanificateurPromotions
+from Annuaire_Participants import AnnuaireParticipants, ErreurEmailDuplique
+from Statistiques import StatistiquesInscriptions, COLONNES_EVENEMENTS, exporter_csv
+from Recommandations import MoteurRecommandations
+from Liste_Evenements import IndexVisibilite, classe_visibilite, motif_refus, MOTIFS_REFUS, INSCRIPTION_REQUISE
+from Flux_Modifications import FluxModifications, ServeurFlux, lire_instantane, suivre_flux
+from Rappels import PlanificateurRappels
+from Simulateur_Trafic import EnregistreurTrafic
+from Site_Statique import GenerateurSite
+from Boite_Reception import BoitesReception
+from Salle_Attente import SalleAttente, FileSaturee, LimiteUtilisateur, ADMIS
+from Locataires import (EspaceIdentifiants, RegistreLocataires, RouteurLocataires, LocataireInconnu, chemins_locataire,
+                        locataire_de, valider_code, RACINE_PAR_DEFAUT)
+from Controle_Presence import GenerateurBadges, RegistrePresences, ServicePointage, ServeurPointage, cle_inscription
+
+# Compteurs d'identifiants par faculté (voir Locataires.py): "SCI-EV001", "MED-P004"...
+IDENTIFIANTS = EspaceIdentifiants()
 
 # --- 1. Factory Method (Création des événements) ---
+class ConflitVersion(ValueError):
+    """Mise à jour conditionnelle refusée: l'événement a été modifié depuis la version lue."""
+    def __init__(self, evenement, version_attendue):
+        super().__init__(f"L'événement '{evenement.nom}' a été modifié entre-temps "
+                         f"(version {version_attendue} attendue, version actuelle {evenement.version}).")
+        self.evenement = evenement
+        self.version_attendue = version_attendue
+        self.version_actuelle = evenement.version
+
 class Evenement(ABC):
     def __init__(self, id, nom, description, date):
         self.id = id
         self.nom = nom
         self.description = description
         self.date = date
+        self.recurrence = None # RegleRecurrence: la date est alors celle de la première séance
+        # Incrémentée à chaque modification: sert aux mises à jour conditionnelles et de clé d'invalidation.
+        self.version = 1
+        self.est_annule = False
         self._observateurs = []
 
     @abstractmethod
@@ -17,7 +64,22 @@ class Evenement(ABC):
         pass
 
     def afficher_info_base(self):
-        return f"ID: {self.id}, Nom: {self.nom}, Date: {self.date.strftime('%Y-%m-%d')}"
+        info = f"ID: {self.id}, Nom: {self.nom}, Date: {self.date.strftime('%Y-%m-%d')}"
+        if self.recurrence:
+            info += f", Récurrence: {self.recurrence}"
+        if self.est_annule:
+            info += ", ANNULÉ"
+        return info
+
+    def occurrences(self, debut=None, fin=None):
+        return occurrences_evenement(self, debut, fin)
+
+    @property
+    def type_evenement(self):
+        return EvenementFactory.schema_de(self).nom
+
+    def champs_specifiques(self):
+        return {champ.nom: getattr(self, champ.nom) for champ in EvenementFactory.schema_de(self).champs}
 
     def ajouter_observateur(self, observateur):
         if observateur not in self._observateurs:
@@ -31,9 +93,37 @@ class Evenement(ABC):
         for obs in self._observateurs:
             obs.mettre_a_jour(self, message_type)
 
-    def mettre_a_jour_description(self, nouvelle_description):
-        self.description = nouvelle_description
+    def modifier(self, version_attendue=None, journaliser=None, **champs):
+        """Compare-and-set: applique les champs seulement si la version n'a pas changé (None: sans condition).
+        Retourne la nouvelle version, ou lève ConflitVersion. `journaliser(nouvelle_version)` est appelé une
+        fois les vérifications passées, avant toute modification: le journal précède l'état."""
+        if version_attendue is not None and version_attendue != self.version:
+            raise ConflitVersion(self, version_attendue)
+        if journaliser:
+            journaliser(self.version + 1)
+        for nom, valeur in champs.items():
+            setattr(self, nom, valeur)
+        self.version += 1
+        return self.version
+
+    def mettre_a_jour_description(self, nouvelle_description, version_attendue=None, journaliser=None):
+        version = self.modifier(version_attendue, journaliser, description=nouvelle_description)
         self.notifier_observateurs("mise_a_jour_evenement")
+        return version
+
+    def changer_date(self, nouvelle_date, version_attendue=None, journaliser=None):
+        if self.est_annule:
+            raise ValueError(f"L'événement '{self.nom}' est annulé.")
+        version = self.modifier(version_attendue, journaliser, date=nouvelle_date)
+        self.notifier_observateurs("changement_date")
+        return version
+
+    def annuler(self, version_attendue=None, journaliser=None):
+        if self.est_annule:
+            raise ValueError(f"L'événement '{self.nom}' est déjà annulé.")
+        version = self.modifier(version_attendue, journaliser, est_annule=True)
+        self.notifier_observateurs("annulation_evenement")
+        return version
 
 class Conference(Evenement):
     def __init__(self, id, nom, description, date, nombre_places, speaker_principal):
@@ -61,29 +151,166 @@ class Seminaire(Evenement):
     def get_details(self):
         return f"{self.afficher_info_base()}\n  Type: Séminaire\n  Domaine: {self.domaine}\n  Description: {self.description}"
 
+class ChampEvenement:
+    """Champ spécifique d'un type d'événement: nom de l'argument du constructeur, libellé et conversion."""
+    def __init__(self, nom, libelle, convertir=str, requis=True):
+        self.nom = nom
+        self.libelle = libelle
+        self.convertir = convertir
+        self.requis = requis
+
+class TypeEvenement:
+    """Schéma d'un type d'événement enregistré dans la fabrique."""
+    def __init__(self, nom, classe, champs):
+        self.nom = nom
+        self.classe = classe
+        self.champs = tuple(champs)
+        self.noms_champs = frozenset(c.nom for c in self.champs)
+
+    def preparer(self, valeurs):
+        """Valide et convertit les champs spécifiques; lève ValueError si un champ manque ou est inconnu."""
+        inconnus = valeurs.keys() - self.noms_champs
+        if inconnus:
+            raise ValueError(f"Champ(s) inconnu(s) pour {self.nom}: {', '.join(sorted(inconnus))}")
+        arguments = {}
+        for champ in self.champs:
+            valeur = valeurs.get(champ.nom)
+            if valeur is None or valeur == "":
+                if champ.requis:
+                    raise ValueError(f"Champ requis manquant pour {self.nom}: {champ.libelle}")
+                arguments[champ.nom] = None
+                continue
+            try:
+                arguments[champ.nom] = champ.convertir(valeur)
+            except (TypeError, ValueError):
+                raise ValueError(f"Valeur invalide pour '{champ.libelle}' ({self.nom}): {valeur!r}")
+        return arguments
+
+class ErreurCreationLot(ValueError):
+    """Lignes invalides d'un lot: `erreurs` contient des couples (index de la ligne, message)."""
+    def __init__(self, erreurs):
+        super().__init__(f"{len(erreurs)} ligne(s) invalide(s), aucune création effectuée.")
+        self.erreurs = erreurs
+
 class EvenementFactory:
-    _current_id = 0
+    _types = {}            # {nom du type: TypeEvenement}
+    _types_par_classe = {} # {classe: TypeEvenement}
+
+    @classmethod
+    def enregistrer_type(cls, nom, classe, champs):
+        """Point d'extension: un plugin enregistre un nouveau type sans modifier la fabrique ni l'interface."""
+        type_evenement = TypeEvenement(nom, classe, champs)
+        cls._types[nom] = type_evenement
+        cls._types_par_classe[classe] = type_evenement
+        return type_evenement
+
+    @classmethod
+    def types_disponibles(cls):
+        return list(cls._types)
+
+    @classmethod
+    def schema(cls, type_evenement):
+        try:
+            return cls._types[type_evenement]
+        except KeyError:
+            raise ValueError(f"Type d'événement inconnu: {type_evenement}")
+
+    @classmethod
+    def schema_de(cls, evenement):
+        return cls._types_par_classe[type(evenement)]
+
+    def __init__(self, locataire=None):
+        # Faculté dont la fabrique attribue les identifiants (None: installation unique).
+        self.locataire = locataire
+
     def _generer_id(self):
-        EvenementFactory._current_id += 1
-        return f"EV{EvenementFactory._current_id:03d}"
-
-    def creer_evenement(self, type_evenement, nom, description, date_obj, **kwargs):
-        event_id = self._generer_id()
-        if type_evenement == "Conference":
-            return Conference(event_id, nom, description, date_obj, kwargs.get('nombre_places'), kwargs.get('speaker_principal'))
-        elif type_evenement == "Hackathon":
-            return Hackathon(event_id, nom, description, date_obj, kwargs.get('sponsor'), kwargs.get('duree_heures'))
-        elif type_evenement == "Seminaire":
-            return Seminaire(event_id, nom, description, date_obj, kwargs.get('domaine'))
+        return IDENTIFIANTS.generer(self.locataire, "EV")
+
+    def _reserver_id(self, event_id):
+        IDENTIFIANTS.reserver(event_id, "EV")
+
+    def creer_evenement(self, type_evenement, nom, description, date_obj, event_id=None, recurrence=None, **kwargs):
+        schema = self.schema(type_evenement)
+        arguments = schema.preparer(kwargs)
+        return self._construire(schema, nom, description, date_obj, event_id, recurrence, arguments)
+
+    # Colonnes d'une ligne de lot qui ne sont pas des champs spécifiques du type.
+    COLONNES_COMMUNES = frozenset(("type", "nom", "description", "date", "recurrence"))
+
+    def creer_evenements_batch(self, lignes):
+        """Crée des événements à partir de dictionnaires (type, nom, description, date, recurrence?, champs
+        spécifiques). Toutes les lignes sont validées avant la moindre création: en cas d'erreur,
+        ErreurCreationLot liste chaque ligne fautive et aucun ID n'est consommé. Les IDs du lot sont
+        ensuite réservés en un seul bloc."""
+        preparees = []
+        erreurs = []
+        schemas = self._types
+        dates = {}  # les lignes d'un import partagent peu de dates distinctes: chacune n'est analysée qu'une fois
+        for index, ligne in enumerate(lignes):
+            try:
+                schema = schemas.get(ligne.get("type"))
+                if schema is None:
+                    raise ValueError(f"Type d'événement inconnu: {ligne.get('type')}")
+                nom, description, date_obj = ligne["nom"], ligne["description"], ligne["date"]
+                if isinstance(date_obj, str):
+                    if date_obj not in dates:
+                        dates[date_obj] = date.fromisoformat(date_obj)
+                    date_obj = dates[date_obj]
+                if not nom or not description:
+                    raise ValueError("Nom et description sont requis.")
+                specifiques = {cle: valeur for cle, valeur in ligne.items() if cle not in self.COLONNES_COMMUNES}
+                preparees.append((schema, nom, description, date_obj, ligne.get("recurrence"), schema.preparer(specifiques)))
+            except KeyError as e:
+                erreurs.append((index, f"Colonne manquante: {e.args[0]}"))
+            except ValueError as e:
+                erreurs.append((index, str(e)))
+        if erreurs:
+            raise ErreurCreationLot(erreurs)
+        identifiants = IDENTIFIANTS.generer_lot(self.locataire, "EV", len(preparees))
+        evenements = []
+        for event_id, (schema, nom, description, date_obj, recurrence, arguments) in zip(identifiants, preparees):
+            evenement = schema.classe(event_id, nom, description, date_obj, **arguments)
+            evenement.recurrence = recurrence
+            evenements.append(evenement)
+        return evenements
+
+    def _construire(self, schema, nom, description, date_obj, event_id, recurrence, arguments):
+        if event_id is None:
+            event_id = self._generer_id()
         else:
-            raise ValueError(f"Type d'événement inconnu: {type_evenement}")
+            self._reserver_id(event_id)
+        evenement = schema.classe(event_id, nom, description, date_obj, **arguments)
+        # Une série récurrente reste un seul objet: ses séances sont générées à la demande.
+        evenement.recurrence = recurrence
+        return evenement
+
+EvenementFactory.enregistrer_type("Conference", Conference, [
+    ChampEvenement("nombre_places", "Nombre de places", int),
+    ChampEvenement("speaker_principal", "Speaker Principal")])
+EvenementFactory.enregistrer_type("Hackathon", Hackathon, [
+    ChampEvenement("sponsor", "Sponsor"),
+    ChampEvenement("duree_heures", "Durée (heures)", int)])
+EvenementFactory.enregistrer_type("Seminaire", Seminaire, [
+    ChampEvenement("domaine", "Domaine")])
+
+def charger_plugins(dossier="plugins"):
+    """Importe chaque module du dossier; un plugin enregistre ses types via EvenementFactory.enregistrer_type."""
+    if not os.path.isdir(dossier):
+        return []
+    modules = []
+    for nom_fichier in sorted(os.listdir(dossier)):
+        if not nom_fichier.endswith(".py") or nom_fichier.startswith("_"):
+            continue
+        spec = importlib.util.spec_from_file_location(f"plugins.{nom_fichier[:-3]}", os.path.join(dossier, nom_fichier))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules.append(module)
+    return modules
 
 # --- 2. Strategy (Règles de validation d'inscription) ---
 class Participant:
-    _current_id = 0
-    def __init__(self, nom, email, est_etudiant=True):
-        Participant._current_id += 1
-        self.id = f"P{Participant._current_id:03d}"
+    def __init__(self, nom, email, est_etudiant=True, locataire=None):
+        self.id = IDENTIFIANTS.generer(locataire, "P")
         self.nom = nom
         self.email = email
         self.est_etudiant = est_etudiant
@@ -93,24 +320,40 @@ class IRegleValidation(ABC):
     def valider(self, inscription):
         pass
 
-class RegleValidationHackathon(IRegleValidation):
-    def valider(self, inscription):
-        return inscription.participant.est_etudiant
+# Règles utilisées si le fichier de règles est absent: Hackathon réservé aux étudiants, Conference
+# tant qu'il reste des places, tout autre type accepté.
+REGLES_INSCRIPTION_PAR_DEFAUT = """
+[Hackathon]
+etudiant = participant.est_etudiant
 
-class RegleValidationConference(IRegleValidation):
-    def valider(self, inscription):
-        return inscription.evenement.nombre_places > 0
+[Conference]
+places_disponibles = evenement.nombre_places > 0
+"""
+
+class RegleValidationDSL(IRegleValidation):
+    """Stratégie pilotée par le fichier de règles: le jeu de règles est résolu à chaque validation,
+    ce qui prend en compte les rechargements à chaud."""
+    def __init__(self, moteur_regles):
+        self.moteur_regles = moteur_regles
 
-class RegleValidationGenerale(IRegleValidation):
     def valider(self, inscription):
-        return True
+        return self.moteur_regles.jeu_pour(inscription.evenement).evaluer(inscription.participant, inscription.evenement)
+
+    def expliquer(self, inscription):
+        return self.moteur_regles.jeu_pour(inscription.evenement).expliquer(inscription.participant, inscription.evenement)
 
 class Inscription:
-    def __init__(self, participant, evenement, regle_validation: IRegleValidation):
+    def __init__(self, participant, evenement, regle_validation: IRegleValidation, date_occurrence=None):
         self.participant = participant
         self.evenement = evenement
         self.regle_validation = regle_validation
+        # Séance choisie pour un événement récurrent (None: événement ponctuel ou toute la série).
+        self.date_occurrence = date_occurrence
+        self.date_inscription = date.today()
         self.est_validee = False
+        self.est_annulee = False
+        # Annulée par l'annulation de son événement (ces inscrits reçoivent l'avis d'annulation).
+        self.annulee_avec_evenement = False
         self._observateurs = []
 
     def ajouter_observateur(self, observateur):
@@ -125,13 +368,24 @@ class Inscription:
         for obs in self._observateurs:
             obs.mettre_a_jour(self, message_type)
 
-    def valider_inscription(self):
+    def valider_inscription(self, journaliser=None):
+        """Applique les règles; `journaliser(est_validee)` est appelé avant la modification et la notification."""
         ancienne_validation = self.est_validee
-        self.est_validee = self.regle_validation.valider(self)
+        est_validee = self.regle_validation.valider(self)
+        if journaliser:
+            journaliser(est_validee)
+        self.est_validee = est_validee
         if self.est_validee != ancienne_validation:
             self.notifier_observateurs("inscription_validee" if self.est_validee else "inscription_en_attente")
         return self.est_validee
 
+    def annuler(self, journaliser=None):
+        if journaliser:
+            journaliser()
+        self.est_annulee = True
+        self.est_validee = False
+        self.notifier_observateurs("inscription_annulee")
+
     def set_regle_validation(self, regle_validation: IRegleValidation):
         self.regle_validation = regle_validation
 
@@ -142,39 +396,109 @@ class IObserver(ABC):
         pass
 
 class NotificationService(IObserver):
-    def __init__(self, log_output):
-        self.log_output = log_output
+    def __init__(self, journal_notifications, destinataires_evenement=None, fenetre_digest=30, limites=None, boites=None,
+                 suivi_diffusions=None):
+        # Modèle borné (JournalNotificationsBorne): le widget est rafraîchi par lots par EventApp.
+        self.journal_notifications = journal_notifications
+        # Boîtes de réception par participant (BoitesReception): chaque notification y est conservée.
+        self.boites = boites
+        # Fonction evenement -> inscriptions (séquence), pour prévenir les participants d'une mise à jour.
+        self.destinataires_evenement = destinataires_evenement
+        # Les emails/SMS passent par le digest: regroupés par destinataire et limités par canal.
+        if limites is None:
+            limites = {"email": SeauJetons(50, 5), "sms": SeauJetons(10, 1)}
+        self.digest = MoteurDigest(self._envoyer, fenetre_secondes=fenetre_digest, limites=limites)
+        # Les inscrits d'un événement sont prévenus par lots, à chaque vidage du digest; avec un suivi
+        # (SuiviDiffusions), une diffusion interrompue par un arrêt reprend au démarrage (reprendre_diffusions).
+        self.diffusion = DiffusionParLots(self.digest, suivi=suivi_diffusions)
 
     def mettre_a_jour(self, sujet, message_type):
         msg = ""
         if isinstance(sujet, Evenement):
             if message_type == "mise_a_jour_evenement":
                 msg = f"[NOTIFICATION] L'événement '{sujet.nom}' a été mis à jour: {sujet.description}"
+            elif message_type == "changement_date":
+                msg = f"[NOTIFICATION] L'événement '{sujet.nom}' est déplacé au {sujet.date.isoformat()}."
+            elif message_type == "annulation_evenement":
+                msg = f"[NOTIFICATION] L'événement '{sujet.nom}' du {sujet.date.isoformat()} est annulé."
             else:
                 msg = f"[NOTIFICATION] Un événement ({sujet.nom}) a notifié un changement de type: {message_type}"
+            if self.destinataires_evenement:
+                inscrits = self.destinataires_evenement(sujet)
+                self.diffusion.diffuser("email", inscrits, self.adresse_inscrit, sujet.id, message_type, msg,
+                                        filtre=self.destinataire_actif, cle=self.cle_inscrit,
+                                        par_lot=self._deposer_lot if self.boites else None)
         elif isinstance(sujet, Inscription):
-            statut = "validée" if sujet.est_validee else "en attente"
+            statut = "annulée" if sujet.est_annulee else "validée" if sujet.est_validee else "en attente"
             msg = f"[NOTIFICATION] L'inscription de '{sujet.participant.nom}' à '{sujet.evenement.nom}' est maintenant {statut}."
+            # Le participant n'a pas de numéro de téléphone: l'avis part par email, à son adresse.
+            self.digest.soumettre("email", sujet.participant.email, sujet.evenement.id, message_type,
+                                  f"Votre inscription à {sujet.evenement.nom} est {statut}.")
+            if self.boites:
+                self.boites.deposer((sujet.participant.id,), sujet.evenement.id, message_type,
+                                    f"Votre inscription à {sujet.evenement.nom} est {statut}.")
         
-        self.log_output.config(state='normal')
-        self.log_output.insert(tk.END, msg + "\n")
-        self.log_output.see(tk.END)
-        self.log_output.config(state='disabled')
+        self.journal_notifications.ajouter(msg)
+
+    @staticmethod
+    def adresse_inscrit(inscription):
+        return inscription.participant.email
+
+    @staticmethod
+    def cle_inscrit(inscription):
+        return inscription.participant.id
+
+    @staticmethod
+    def destinataire_actif(inscription):
+        # Évalué à l'envoi (diffusion par lots): l'avis d'annulation d'un événement parvient encore à ses inscrits.
+        return not inscription.est_annulee or inscription.annulee_avec_evenement
+
+    def rappeler(self, inscription, occurrence, libelle):
+        """Rappel avant une séance (libelle: "J-7", "J-1" ou "H-1"), envoyé par email via le digest."""
+        evenement = inscription.evenement
+        message = f"Rappel ({libelle}): '{evenement.nom}' a lieu le {occurrence.isoformat()}."
+        self.digest.soumettre("email", inscription.participant.email, evenement.id, f"rappel_{libelle}", message)
+        if self.boites:
+            self.boites.deposer((inscription.participant.id,), evenement.id, f"rappel_{libelle}", message)
+        self.journal_notifications.ajouter(f"[RAPPEL {libelle}] '{evenement.nom}' ({occurrence.isoformat()}) "
+                                           f"pour {inscription.participant.nom}.")
+
+    def vider_digest(self, forcer=False):
+        self.diffusion.traiter(forcer)
+        envoyes = self.digest.vider(forcer)
+        self.diffusion.confirmer()
+        return envoyes
+
+    def reprendre_diffusions(self, inscrits_par_evenement_id):
+        """Relance les diffusions interrompues par un arrêt (`inscrits_par_evenement_id(evenement_id)`)."""
+        return self.diffusion.reprendre(inscrits_par_evenement_id, self.adresse_inscrit,
+                                        filtre=self.destinataire_actif, cle=self.cle_inscrit,
+                                        par_lot=self._deposer_lot if self.boites else None)
+
+    def _deposer_lot(self, lot, evenement_id, message_type, msg):
+        # Les boîtes des inscrits sont alimentées avec la diffusion, lot par lot, et non toutes d'un coup
+        # sur la boucle Tk (le texte est enregistré une fois par lot).
+        self.boites.deposer((i.participant.id for i in lot), evenement_id, message_type, msg)
+
+    def _envoyer(self, canal, destinataire, sujet, corps):
+        if canal == "email":
+            self.envoyer_email(destinataire, sujet, corps)
+        else:
+            self.envoyer_sms(destinataire, corps)
 
     def envoyer_email(self, destinataire, sujet, message):
-        self.log_output.config(state='normal')
-        self.log_output.insert(tk.END, f"  --> EMAIL envoyé à {destinataire}: Sujet='{sujet}', Message='{message}'\n")
-        self.log_output.see(tk.END)
-        self.log_output.config(state='disabled')
+        self.journal_notifications.ajouter(f"  --> EMAIL envoyé à {destinataire}: Sujet='{sujet}', Message='{message}'")
 
     def envoyer_sms(self, destinataire, message):
-        self.log_output.config(state='normal')
-        self.log_output.insert(tk.END, f"  --> SMS envoyé à {destinataire}: '{message}'\n")
-        self.log_output.see(tk.END)
-        self.log_output.config(state='disabled')
+        self.journal_notifications.ajouter(f"  --> SMS envoyé à {destinataire}: '{message}'")
 
 # --- 4. Bridge (Affichage des événements) ---
 class AffichageEvenement(ABC):
+    # Rendus déjà calculés, indexés par (affichage, plateforme, ID, version): une nouvelle version
+    # de l'événement invalide son rendu sans autre mécanisme.
+    _rendus = OrderedDict()
+    TAILLE_CACHE_RENDUS = 1024
+
     def __init__(self, evenement, implementateur_affichage):
         self._evenement = evenement
         self._implementateur_affichage = implementateur_affichage
@@ -183,6 +507,20 @@ class AffichageEvenement(ABC):
     def afficher(self):
         pass
 
+    def afficher_en_cache(self):
+        version = getattr(self._evenement, "version", None)
+        if version is None:
+            return self.afficher()
+        cle = (type(self), type(self._implementateur_affichage), self._evenement.id, version)
+        rendu = self._rendus.get(cle)
+        if rendu is None:
+            rendu = self._rendus[cle] = self.afficher()
+            if len(self._rendus) > self.TAILLE_CACHE_RENDUS:
+                self._rendus.popitem(last=False)
+        else:
+            self._rendus.move_to_end(cle)
+        return rendu
+
 class AffichageSimpleEvenement(AffichageEvenement):
     def afficher(self):
         return self._implementateur_affichage.afficher_evenement_simple(self._evenement)
@@ -201,11 +539,12 @@ class IImplementateurAffichage(ABC):
         pass
 
 class AffichageWeb(IImplementateurAffichage):
+    # Nom et description sont saisis par les organisateurs et publiés sur le site: toujours échappés.
     def afficher_evenement_simple(self, evenement):
-        return f"<div class='card'><h3>{evenement.nom}</h3><p>{evenement.date.strftime('%Y-%m-%d')}</p></div>"
+        return f"<div class='card'><h3>{html.escape(evenement.nom)}</h3><p>{evenement.date.strftime('%Y-%m-%d')}</p></div>"
 
     def afficher_evenement_detaille(self, evenement):
-        return f"<div class='page'><h1>{evenement.nom}</h1><p>{evenement.get_details()}</p></div>"
+        return f"<div class='page'><h1>{html.escape(evenement.nom)}</h1><p>{html.escape(evenement.get_details())}</p></div>"
 
 class AffichageMobile(IImplementateurAffichage):
     def afficher_evenement_simple(self, evenement):
@@ -221,21 +560,69 @@ class IEvenementService(ABC):
         pass
 
 class EvenementServiceReel(IEvenementService):
-    def __init__(self, evenements_db):
+    def __init__(self, evenements_db, cache=None, journaliser=None):
         self._evenements_db = evenements_db
+        # CacheDeuxNiveaux optionnel, partagé entre processus et invalidé par le flux de mutations.
+        self._cache = cache
+        # journaliser(operation, donnees): enregistre les modifications faites via le service.
+        self._journaliser = journaliser
 
-    def get_details_evenement(self, evenement_id, utilisateur=None):
+    def mettre_a_jour_description(self, evenement_id, nouvelle_description, version_attendue):
+        """Mise à jour conditionnelle; lève ConflitVersion si l'événement a changé depuis `version_attendue`."""
         evenement = self._evenements_db.get(evenement_id)
-        if evenement:
-            return evenement.get_details()
-        return "Événement non trouvé."
+        if evenement is None:
+            raise ValueError(f"Événement non trouvé: {evenement_id}")
+        return evenement.mettre_a_jour_description(nouvelle_description, version_attendue, self._avant_modification(
+            "mettre_a_jour_description", {"id": evenement_id, "description": nouvelle_description}))
+
+    def modifier_places(self, evenement_id, nombre_places, version_attendue):
+        evenement = self._evenements_db.get(evenement_id)
+        if evenement is None or not hasattr(evenement, "nombre_places"):
+            raise ValueError(f"Événement sans nombre de places: {evenement_id}")
+        return evenement.modifier(version_attendue, self._avant_modification(
+            "modifier_places", {"id": evenement_id, "nombre_places": nombre_places}), nombre_places=nombre_places)
+
+    def modifier_date(self, evenement_id, nouvelle_date, version_attendue):
+        evenement = self._evenements_db.get(evenement_id)
+        if evenement is None:
+            raise ValueError(f"Événement non trouvé: {evenement_id}")
+        return evenement.changer_date(nouvelle_date, version_attendue, self._avant_modification(
+            "modifier_date", {"id": evenement_id, "date": nouvelle_date.isoformat()}))
+
+    def annuler_evenement(self, evenement_id, version_attendue):
+        """Annule l'événement et, dans la même entrée du journal, toutes ses inscriptions."""
+        evenement = self._evenements_db.get(evenement_id)
+        if evenement is None:
+            raise ValueError(f"Événement non trouvé: {evenement_id}")
+        return evenement.annuler(version_attendue, self._avant_modification("annuler_evenement", {"id": evenement_id}))
+
+    def _avant_modification(self, operation, donnees):
+        # Journalisée avec la version qu'elle va produire, avant que l'événement ne soit modifié et notifié.
+        if not self._journaliser:
+            return None
+        return lambda version: self._journaliser(operation, dict(donnees, version=version))
+
+    def charger_details(self, evenement_id):
+        evenement = self._evenements_db.get(evenement_id)
+        return evenement.get_details() if evenement else None
+
+    def get_details_evenement(self, evenement_id, utilisateur=None):
+        if self._cache is not None:
+            details = self._cache.obtenir(evenement_id)
+        else:
+            details = self.charger_details(evenement_id)
+        return details if details is not None else "Événement non trouvé."
 
 class AuthentificationService:
-    def __init__(self):
+    def __init__(self, locataire=None):
+        # Sessions propres à une faculté: seuls ses participants peuvent s'y connecter.
+        self.locataire = locataire
         self.utilisateurs_connectes = set()
         self.inscriptions = {}
 
     def connecter_utilisateur(self, utilisateur_id):
+        if locataire_de(utilisateur_id) != self.locataire:
+            raise PermissionError(f"ACCÈS REFUSÉ: {utilisateur_id} n'appartient pas à cette faculté.")
         self.utilisateurs_connectes.add(utilisateur_id)
 
     def est_connecte(self, utilisateur_id):
@@ -246,31 +633,96 @@ class AuthentificationService:
             self.inscriptions[participant_id] = []
         self.inscriptions[participant_id].append(evenement_id)
 
+    def desinscrire_participant_auth(self, participant_id, evenement_id):
+        evenements = self.inscriptions.get(participant_id)
+        if evenements and evenement_id in evenements:
+            evenements.remove(evenement_id)
+
     def est_inscrit(self, participant_id, evenement_id):
         return participant_id in self.inscriptions and evenement_id in self.inscriptions[participant_id]
 
+    def evenements_inscrits(self, participant_id):
+        return frozenset(self.inscriptions.get(participant_id, ()))
+
 class EvenementServiceProxy(IEvenementService):
-    def __init__(self, evenements_db, authentification_service):
-        self._evenement_service_reel = EvenementServiceReel(evenements_db)
+    def __init__(self, evenements_db, authentification_service, cache=None, service_reel=None, routeur=None):
+        self._evenement_service_reel = service_reel or EvenementServiceReel(evenements_db, cache)
         self._authentification_service = authentification_service
+        # RouteurLocataires optionnel: les identifiants d'une autre faculté lui sont transmis.
+        self._routeur = routeur
+        self._index_visibilite = None
+
+    @property
+    def index_visibilite(self):
+        # Construit à la première liste: un proxy ouvert pour une seule consultation ne parcourt pas le catalogue.
+        # Les événements ajoutés ensuite y sont enregistrés par l'application (enregistrer_evenement).
+        if self._index_visibilite is None:
+            self._index_visibilite = IndexVisibilite(self.classe_visibilite)
+            for evenement in self._evenement_service_reel._evenements_db.values():
+                self._index_visibilite.enregistrer_evenement(evenement)
+        return self._index_visibilite
+
+    @staticmethod
+    def classe_visibilite(evenement):
+        classe = classe_visibilite(evenement)
+        if isinstance(evenement, Hackathon):
+            classe |= INSCRIPTION_REQUISE
+        return classe
+
+    def mettre_a_jour_description(self, evenement_id, nouvelle_description, version_attendue, utilisateur=None):
+        if not utilisateur or not self._authentification_service.est_connecte(utilisateur.id):
+            raise PermissionError("ACCÈS REFUSÉ: La modification d'un événement nécessite une connexion.")
+        return self._evenement_service_reel.mettre_a_jour_description(evenement_id, nouvelle_description, version_attendue)
 
     def get_details_evenement(self, evenement_id, utilisateur=None):
+        if self._routeur and locataire_de(evenement_id) != self._authentification_service.locataire:
+            return self._routeur.get_details_evenement(evenement_id, utilisateur)
         evenement = self._evenement_service_reel._evenements_db.get(evenement_id)
         
         if evenement:
-            if "Secrète" in evenement.nom and (not utilisateur or not self._authentification_service.est_connecte(utilisateur.id)):
-                return "ACCÈS REFUSÉ: Cet événement est secret et nécessite une connexion."
-            
-            if isinstance(evenement, Hackathon) and (not utilisateur or not self._authentification_service.est_inscrit(utilisateur.id, evenement_id)):
-                return "ACCÈS REFUSÉ: Détails du Hackathon réservés aux participants inscrits."
+            # Le type est lu par nom pour fonctionner aussi sur les vues du catalogue colonnaire.
+            motif = motif_refus(self.classe_visibilite(evenement),
+                                bool(utilisateur) and self._authentification_service.est_connecte(utilisateur.id),
+                                bool(utilisateur) and self._authentification_service.est_inscrit(utilisateur.id, evenement_id))
+            if motif:
+                return f"ACCÈS REFUSÉ: {MOTIFS_REFUS[motif]}"
 
         return self._evenement_service_reel.get_details_evenement(evenement_id, utilisateur)
 
+    def lister_evenements(self, utilisateur=None, tri="date", decroissant=False, curseur=None, limite=50, masques=True):
+        """Une page du catalogue vue par `utilisateur`, en un seul appel: (page, curseur suivant).
+        Les événements inaccessibles sont résumés sans leurs détails, avec le motif du refus."""
+        connecte = bool(utilisateur) and self._authentification_service.est_connecte(utilisateur.id)
+        inscrits = self._authentification_service.evenements_inscrits(utilisateur.id) if utilisateur else frozenset()
+        return self.index_visibilite.lister(connecte, inscrits, tri, decroissant, curseur, limite, masques)
+
 # --- Application Tkinter ---
 class EventApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, dossier_journal="journal_evenements", fichier_notifications="notifications.log.gz",
+                 fichier_regles="regles_inscription.ini", fichier_cache="cache_evenements.sqlite",
+                 fichier_catalogue="catalogue_evenements.evcat", fichier_presences="presences.jsonl",
+                 fichier_cle_badges="cle_badges.bin", fichier_rappels="rappels.sqlite", port_pointage=8765, port_flux=8766,
+                 source_flux=None, locataire=None, racine_locataires=RACINE_PAR_DEFAUT, fichier_trafic=None,
+                 dossier_site="site_evenements", fichier_boites="boites_reception.sqlite"):
         super().__init__()
         self.title("Plateforme de Gestion des Événements Universitaires")
+        # Une fenêtre gère une faculté: ses fichiers sont rangés dans racine_locataires/<code>/ et
+        # ses identifiants portent son code. Sans faculté, l'installation unique historique.
+        self.locataire = valider_code(locataire) if locataire else None
+        self.racine_locataires = racine_locataires
+        if self.locataire:
+            self.title(f"Plateforme de Gestion des Événements Universitaires — {self.locataire}")
+            chemins = chemins_locataire(self.locataire, racine_locataires, dossier_journal=dossier_journal,
+                                        fichier_notifications=fichier_notifications, fichier_cache=fichier_cache,
+                                        fichier_catalogue=fichier_catalogue, fichier_presences=fichier_presences,
+                                        fichier_cle_badges=fichier_cle_badges, fichier_rappels=fichier_rappels,
+                                        fichier_trafic=fichier_trafic, dossier_site=dossier_site,
+                                        fichier_boites=fichier_boites)
+            dossier_journal, fichier_notifications = chemins["dossier_journal"], chemins["fichier_notifications"]
+            fichier_cache, fichier_catalogue = chemins["fichier_cache"], chemins["fichier_catalogue"]
+            fichier_presences, fichier_cle_badges = chemins["fichier_presences"], chemins["fichier_cle_badges"]
+            fichier_rappels, fichier_trafic = chemins["fichier_rappels"], chemins["fichier_trafic"]
+            dossier_site, fichier_boites = chemins["dossier_site"], chemins["fichier_boites"]
         self.geometry("1000x750") # Slightly larger window
 
         # --- Apply a modern theme ---
@@ -290,45 +742,831 @@ class EventApp(tk.Tk):
         self.style.map('TNotebook.Tab', background=[('selected', '#ffffff')], foreground=[('selected', 'black')]) # Selected tab color
 
         # --- Initialisation des Services et Données ---
-        self.evenement_factory = EvenementFactory()
+        self.evenement_factory = EvenementFactory(self.locataire)
         self.evenements = {}  # Stockage des événements créés: {id: Evenement_obj}
-        self.participants = {} # Stockage des participants: {id: Participant_obj}
+        self.participants = AnnuaireParticipants() # {id: Participant_obj}, avec index email (unique) et nom
         self.inscriptions = [] # Stockage des inscriptions: [Inscription_obj, ...]
+        self.inscriptions_par_cle = {} # {cle_inscription(...): Inscription_obj}, pour le pointage des badges
+        self.inscriptions_par_evenement = {} # {evenement_id: [Inscription_obj, ...]}, dans l'ordre d'inscription
 
-        self.auth_service = AuthentificationService()
+        self.auth_service = AuthentificationService(self.locataire)
+        self.verificateur_conflits = VerificateurConflits()
+        self.regle_validation = RegleValidationDSL(MoteurRegles(fichier_regles, source_par_defaut=REGLES_INSCRIPTION_PAR_DEFAUT))
         self.notification_log = scrolledtext.ScrolledText(self, width=80, height=8, state='disabled', wrap=tk.WORD, font=('Consolas', 9))
-        self.notification_service = NotificationService(self.notification_log)
-        self.evenement_service_proxy = EvenementServiceProxy(self.evenements, self.auth_service)
+        self.journal_notifications = JournalNotificationsBorne(capacite=500, fichier_archive=fichier_notifications)
+        if self.regle_validation.moteur_regles.derniere_erreur:
+            self.journal_notifications.ajouter(f"[RÈGLES] {fichier_regles} invalide, règles par défaut appliquées: "
+                                               f"{self.regle_validation.moteur_regles.derniere_erreur}")
+        # Boîte de réception de chaque participant: alimentée par l'instance principale uniquement.
+        self.boites_reception = None
+        if fichier_boites and not source_flux:
+            self.boites_reception = BoitesReception(fichier_boites)
+        # Avancement des diffusions aux inscrits, à côté des rappels: repris au démarrage après un arrêt.
+        self.suivi_diffusions = None
+        if fichier_rappels and not source_flux:
+            self.suivi_diffusions = SuiviDiffusions(fichier_rappels)
+        self.notification_service = NotificationService(self.journal_notifications, destinataires_evenement=self._inscrits_evenement,
+                                                        boites=self.boites_reception, suivi_diffusions=self.suivi_diffusions)
+        self.cache_details = None
+        if fichier_cache:
+            self.cache_details = CacheDeuxNiveaux(fichier_cache, self._charger_details_evenement,
+                                                  version_objet=self._version_evenement)
+        self.evenement_service = EvenementServiceReel(self.evenements, self.cache_details, self._journaliser)
+        # Les autres facultés sont consultées dans leur catalogue publié, ouvert à la demande et évincé
+        # au-delà de NB_LOCATAIRES_OUVERTS; chaque catalogue ouvert reprend de lui-même les republications.
+        self.registre_locataires = RegistreLocataires(self._ouvrir_locataire, capacite=self.NB_LOCATAIRES_OUVERTS)
+        self.nom_catalogue = os.path.basename(fichier_catalogue) if fichier_catalogue else None
+        self.evenement_service_proxy = EvenementServiceProxy(self.evenements, self.auth_service, self.cache_details,
+                                                             service_reel=self.evenement_service,
+                                                             routeur=RouteurLocataires(self.registre_locataires))
+        self._version_edition = None # version de l'événement lue au moment de sa sélection pour modification
 
         self.current_user = None
+        # Salle d'attente devant les inscriptions et validations: file équitable lors des pics (ouverture d'un
+        # Hackathon populaire), débit d'admission calé sur la durée mesurée de ces opérations. Toutes les
+        # demandes sont saisies par l'organisateur: pas de limite par participant.
+        self.salle_attente = SalleAttente(rafale_utilisateur=None)
+        # Places occupées et listes d'attente; les promotions sont traitées périodiquement.
+        self.planificateur_promotions = PlanificateurPromotions(self._capacite_evenement, self._promouvoir_inscription)
+        # Pointage des présences: badges signés vérifiés par un serveur local auquel se connectent les scanners.
+        # Le serveur n'est démarré qu'une fois les inscriptions chargées.
+        self.service_pointage = None
+        self.serveur_pointage = None
+        self.port_pointage = port_pointage
+        if fichier_presences:
+            self.service_pointage = ServicePointage(GenerateurBadges.depuis_fichier(fichier_cle_badges),
+                                                    RegistrePresences(fichier_presences), self._inscription_pointable)
+        # Snapshot colonnaire lu par les processus de consultation (mmap), republié après chaque mutation.
+        self.fichier_catalogue = fichier_catalogue
+        self._catalogue_a_publier = bool(fichier_catalogue)
+        # Lignes du catalogue par ID, gardées d'une publication à l'autre: le thread de publication ne
+        # recalcule que celles des événements modifiés (None: tous, à la première publication).
+        self._lignes_catalogue = {}
+        self._evenements_catalogue = None
+        self._ecriture_catalogue = None
+        # Catalogue public statique (pages web rendues par le Bridge): seules les pages des événements modifiés
+        # sont reconstruites. La première génération complète se fait en arrière-plan.
+        self.generateur_site = None
+        self._generation_site = None
+        self._evenements_site = set()
+        if dossier_site and not source_flux:
+            self.generateur_site = GenerateurSite(dossier_site, AffichageWeb(), EvenementServiceProxy.classe_visibilite)
+        # Rappels J-7/J-1/H-1 des inscriptions validées: minuteries persistantes, envoyées par l'instance principale.
+        self.planificateur_rappels = None
+        if fichier_rappels and not source_flux:
+            self.planificateur_rappels = PlanificateurRappels(fichier_rappels, self._inscriptions_seance, self._envoyer_rappel,
+                                                              self._occurrence_suivante)
+
+        # Flux des modifications servi aux autres fenêtres/outils (Server-Sent Events). Avec `source_flux`
+        # ("hôte:port"), cette instance suit au contraire celle qui sert le flux, en lecture seule.
+        self.flux_modifications = FluxModifications(instantane=self._instantane_etat)
+        self.serveur_flux = None
+        self.port_flux = port_flux
+        self.source_flux = source_flux
+        self._modifications_recues = deque()
+        self._arret_suivi = threading.Event()
+
+        # --- Journal d'écriture anticipée: chaque mutation du domaine y est enregistrée ---
+        # Il est relu en arrière-plan après le premier affichage (voir _demarrer_chargement).
+        self.journal = None
+        # Agrégats des inscriptions, tenus à jour par le même flux de mutations que le journal.
+        self.statistiques = StatistiquesInscriptions()
+        # Suggestions d'événements par participant, alimentées par le même flux de mutations.
+        self.recommandations = MoteurRecommandations()
+        self.chargement_termine = False
+        self._apres_chargement = []
+        # Trace des opérations du domaine pour le rejeu (Simulateur_Trafic.py), ouverte une fois les données chargées.
+        self.fichier_trafic = fichier_trafic
+        self.enregistreur_trafic = None
 
         self._create_widgets()
 
+        self.protocol("WM_DELETE_WINDOW", self._fermer)
+        self.after(1000, self._vider_notifications_periodiquement)
+        self.after(self.INTERVALLE_RAFRAICHISSEMENT_LOG, self._rafraichir_journal_notifications)
+        self.after(self.INTERVALLE_RECOMMANDATIONS, self._rafraichir_recommandations)
+        if not source_flux:
+            # En suivi, les promotions sont décidées par l'instance principale et arrivent par le flux.
+            self.after(self.INTERVALLE_PROMOTIONS, self._promouvoir_periodiquement)
+            self.after(self.INTERVALLE_ADMISSION, self._admettre_periodiquement)
+        if self.fichier_catalogue and not source_flux:
+            self.after(self.INTERVALLE_PUBLICATION_CATALOGUE, self._publier_catalogue_periodiquement)
+        if self.generateur_site:
+            self.after(self.INTERVALLE_PUBLICATION_SITE, self._publier_site_periodiquement)
+        if self.cache_details and not source_flux:
+            self.after(self.INTERVALLE_PURGE_CACHE, self._purger_cache_periodiquement)
+        self._demarrer_chargement(dossier_journal)
+
+    # --- Chargement différé: la fenêtre s'affiche avant la relecture du journal ---
+    INTERVALLE_CHARGEMENT = 20
+    # Durée maximale d'une tranche de restauration entre deux passages de la boucle Tk (secondes).
+    BUDGET_TRANCHE = 0.015
+
+    def _demarrer_chargement(self, dossier_journal):
+        if not dossier_journal and not self.source_flux:
+            self._fin_chargement()
+            return
+        resultat = {}
+        def charger():
+            # Lecture du snapshot et rejeu du journal hors du thread Tk; aucun widget n'est touché ici.
+            try:
+                if self.source_flux:
+                    # En suivi, l'état de départ est l'instantané de l'instance principale.
+                    hote, port = self.source_flux.rsplit(":", 1)
+                    seq, etat = lire_instantane(hote, int(port))
+                    resultat["etat"] = EtatDomaine.deserialiser(etat)
+                else:
+                    journal = JournalEvenements(dossier_journal)
+                    seq = journal.seq
+                    resultat["journal"], resultat["etat"] = journal, journal.etat
+                resultat["statistiques"] = StatistiquesInscriptions.depuis_etat(resultat["etat"])
+                resultat["recommandations"] = MoteurRecommandations.depuis_etat(resultat["etat"])
+                resultat["seq"] = seq
+            except Exception as e:
+                resultat["erreur"] = e
+        thread = threading.Thread(target=charger, name="chargement-journal", daemon=True)
+        thread.start()
+        self._afficher_etat_chargement(f"Lecture de l'état de {self.source_flux}..." if self.source_flux else "Lecture du journal...")
+        self.after(self.INTERVALLE_CHARGEMENT, self._attendre_journal, thread, resultat)
+
+    def _attendre_journal(self, thread, resultat):
+        if thread.is_alive():
+            self.after(self.INTERVALLE_CHARGEMENT, self._attendre_journal, thread, resultat)
+            return
+        if "erreur" in resultat:
+            # Les modifications restent bloquées: rien ne doit être écrit hors du journal.
+            self._afficher_etat_chargement("Échec du chargement du journal.")
+            messagebox.showerror("Chargement", f"Impossible de relire le journal: {resultat['erreur']}")
+            return
+        self.journal = resultat.get("journal")
+        self.statistiques = resultat["statistiques"]
+        self.recommandations = resultat["recommandations"]
+        # Le flux reprend à la séquence du journal (ou de l'instantané suivi).
+        self.flux_modifications.seq = resultat["seq"]
+        self._poursuivre_restauration(self._restaurer_depuis_journal(resultat["etat"]))
+
+    def _poursuivre_restauration(self, etapes):
+        echeance = time.perf_counter() + self.BUDGET_TRANCHE
+        for phase, fait, total in etapes:
+            if time.perf_counter() >= echeance:
+                self._afficher_etat_chargement(f"Chargement des {phase}: {fait}/{total}")
+                self.after(1, self._poursuivre_restauration, etapes)
+                return
+        self._fin_chargement()
+
+    def _fin_chargement(self):
+        self.chargement_termine = True
+        if self.fichier_trafic:
+            self.enregistreur_trafic = EnregistreurTrafic(self.fichier_trafic, len(self.inscriptions), self.locataire)
+        self._afficher_etat_chargement("")
+        if self.journal:
+            self.after(200, self._vider_journal_periodiquement)
+        if self.source_flux:
+            self._demarrer_suivi()
+        else:
+            self.create_event_button.state(["!disabled"])
+            self._demarrer_serveurs()
+            if self.generateur_site:
+                self._generation_site = threading.Thread(target=self.generateur_site.construire, name="generation-site",
+                                                         args=(list(self.evenements.values()),), daemon=True)
+                self._generation_site.start()
+            if self.suivi_diffusions:
+                reprises = self.notification_service.reprendre_diffusions(self.inscriptions_par_evenement.get)
+                if reprises:
+                    self.journal_notifications.ajouter(f"[REPRISE] {reprises} diffusion(s) interrompue(s) relancée(s).")
+            if self.planificateur_rappels:
+                # Séances déjà programmées ignorées: seules les inscriptions validées hors ligne sont rattrapées.
+                self._programmer_rappels(self.inscriptions)
+                self.after(self.INTERVALLE_RAPPELS, self._envoyer_rappels_periodiquement)
+        self._update_event_lists()
+        for rappel in self._apres_chargement:
+            rappel()
+        self._apres_chargement = []
+
+    def apres_chargement(self, rappel):
+        """Exécute `rappel` une fois les données chargées (immédiatement si c'est déjà le cas)."""
+        if self.chargement_termine:
+            rappel()
+        else:
+            self._apres_chargement.append(rappel)
+
+    def _afficher_etat_chargement(self, texte):
+        self.etat_chargement_label.config(text=texte)
+
+    def _demarrer_serveurs(self):
+        if self.service_pointage and self.port_pointage is not None:
+            try:
+                self.serveur_pointage = ServeurPointage(self.service_pointage, port=self.port_pointage).demarrer()
+            except OSError as e:
+                self.journal_notifications.ajouter(f"[PRÉSENCES] Serveur de pointage indisponible (port {self.port_pointage}): {e}")
+        if self.journal and self.port_flux is not None:
+            try:
+                self.serveur_flux = ServeurFlux(self.flux_modifications, port=self.port_flux).demarrer()
+            except OSError as e:
+                self.journal_notifications.ajouter(f"[FLUX] Flux des modifications indisponible (port {self.port_flux}): {e}")
+
+    def _donnees_pretes(self):
+        if self.source_flux:
+            messagebox.showinfo("Lecture seule", f"Cette fenêtre suit les modifications de {self.source_flux}: "
+                                                 "effectuez les changements depuis l'instance principale.")
+            return False
+        if not self.chargement_termine:
+            messagebox.showinfo("Chargement", "Les données sont en cours de chargement, veuillez patienter.")
+        return self.chargement_termine
+
+    # --- Persistance (journal + snapshots) ---
+    def _journaliser(self, operation, donnees):
+        if self.journal:
+            # Même verrou que l'instantané servi aux clients du flux: état et séquence restent cohérents.
+            with self.flux_modifications.verrou:
+                seq = self.journal.ajouter(operation, donnees)
+                self.flux_modifications.publier(seq, operation, donnees)
+        self._noter_trafic(operation, donnees)
+        self.statistiques.appliquer(operation, donnees)
+        self.recommandations.appliquer(operation, donnees)
+        # Le même flux de mutations invalide le cache partagé des autres processus.
+        if self.cache_details:
+            self.cache_details.appliquer_evenement_domaine(operation, donnees)
+        if operation in OPERATIONS_INVALIDANTES:
+            self._catalogue_a_publier = bool(self.fichier_catalogue)
+            if self._evenements_catalogue is not None:
+                self._evenements_catalogue.add(donnees["id"])
+            if self.generateur_site:
+                self._evenements_site.add(donnees["id"])
+
+    def _noter_trafic(self, operation, donnees):
+        if self.enregistreur_trafic:
+            self.enregistreur_trafic.noter(operation, donnees)
+
+    def _instantane_etat(self):
+        # Appelé depuis le thread du serveur de flux (GET /etat).
+        with self.flux_modifications.verrou:
+            return json.dumps({"seq": self.journal.seq, "etat": self.journal.etat.serialiser()},
+                              ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _charger_details_evenement(self, evenement_id):
+        evenement = self.evenements.get(evenement_id)
+        return evenement.get_details() if evenement else None
+
+    def _version_evenement(self, evenement_id):
+        # Les détails en cache sont comparés à cette version: une instance en retard sur le flux ne
+        # peut pas imposer aux autres les détails d'une version dépassée.
+        evenement = self.evenements.get(evenement_id)
+        return evenement.version if evenement else 0
+
+    def _serialiser_evenement(self, evenement):
+        schema = EvenementFactory.schema_de(evenement)
+        donnees = {"id": evenement.id, "type": schema.nom, "nom": evenement.nom, "version": evenement.version,
+                   "description": evenement.description, "date": evenement.date.isoformat(),
+                   "recurrence": evenement.recurrence.serialiser() if evenement.recurrence else None}
+        donnees.update(evenement.champs_specifiques())
+        return donnees
+
+    def _enregistrer_evenement(self, evenement):
+        self.evenements[evenement.id] = evenement
+        if not evenement.est_annule:
+            # Un événement annulé (restauré du journal) ne bloque plus ni salle ni intervenant.
+            self.verificateur_conflits.enregistrer_evenement(evenement)
+        self.evenement_service_proxy.index_visibilite.enregistrer_evenement(evenement)
+        evenement.ajouter_observateur(self.notification_service)
+
+    # Chaque mutation est journalisée avant d'être appliquée: un échec d'écriture ne laisse pas d'état fantôme.
+    def _ajouter_evenement(self, evenement):
+        self._journaliser("creer_evenement", self._serialiser_evenement(evenement))
+        self._enregistrer_evenement(evenement)
+
+    def _ajouter_participant(self, participant):
+        self.participants.verifier(participant)  # ErreurEmailDuplique si l'email est déjà pris
+        self._journaliser("creer_participant", {"id": participant.id, "nom": participant.nom,
+                                                "email": participant.email, "est_etudiant": participant.est_etudiant})
+        self.participants.ajouter(participant)
+
+    def _choisir_regle(self, evenement):
+        # Les règles par type/par événement sont résolues par le moteur de règles (fichier rechargé à chaud).
+        return self.regle_validation
+
+    def _restaurer_depuis_journal(self, etat):
+        """Générateur: restaure l'état par petites étapes et produit (phase, fait, total) après chacune,
+        pour que la boucle Tk reprenne la main entre deux tranches."""
+        total = len(etat.evenements)
+        for fait, donnees in enumerate(etat.evenements.values(), 1):
+            self._enregistrer_evenement(self._evenement_depuis_donnees(donnees))
+            yield "événements", fait, total
+        self._update_event_lists()
+
+        participants = []
+        total = len(etat.participants)
+        for fait, (participant_id, donnees) in enumerate(etat.participants.items(), 1):
+            participants.append(self._participant_depuis_donnees(participant_id, donnees))
+            yield "participants", fait, total
+        self.participants.charger(participants)
+        self._update_participant_list()
+
+        total = len(etat.inscriptions)
+        for fait, donnees in enumerate(etat.inscriptions):
+            yield "inscriptions", fait, total
+            self._restaurer_inscription(donnees)
+
+    def _evenement_depuis_donnees(self, donnees):
+        kwargs = {champ.nom: donnees.get(champ.nom) for champ in EvenementFactory.schema(donnees["type"]).champs}
+        evenement = self.evenement_factory.creer_evenement(donnees["type"], donnees["nom"], donnees["description"],
+                                                           date.fromisoformat(donnees["date"]), event_id=donnees["id"],
+                                                           recurrence=RegleRecurrence.deserialiser(donnees.get("recurrence")), **kwargs)
+        evenement.version = donnees.get("version", 1)
+        evenement.est_annule = donnees.get("est_annule", False)
+        return evenement
+
+    def _participant_depuis_donnees(self, participant_id, donnees):
+        participant = Participant(donnees["nom"], donnees["email"], donnees["est_etudiant"], self.locataire)
+        participant.id = participant_id
+        IDENTIFIANTS.reserver(participant_id, "P")
+        return participant
+
+    def _restaurer_inscription(self, donnees):
+        participant = self.participants[donnees["participant_id"]]
+        evenement = self.evenements[donnees["evenement_id"]]
+        date_occurrence = date.fromisoformat(donnees["date_occurrence"]) if donnees.get("date_occurrence") else None
+        inscription = Inscription(participant, evenement, self._choisir_regle(evenement), date_occurrence)
+        inscription.est_validee = donnees.get("est_validee", False)
+        inscription.est_annulee = donnees.get("est_annulee", False)
+        # Avis d'annulation de l'événement encore dû à l'inscrit (diffusion reprise au démarrage).
+        inscription.annulee_avec_evenement = donnees.get("annulee_avec_evenement", False)
+        inscription.date_inscription = date.fromisoformat(donnees["date_inscription"]) if donnees.get("date_inscription") else None
+        inscription.ajouter_observateur(self.notification_service)
+        index = len(self.inscriptions)
+        self.inscriptions.append(inscription)
+        self.inscriptions_par_cle[cle_inscription(evenement.id, participant.id, date_occurrence)] = inscription
+        self.inscriptions_par_evenement.setdefault(evenement.id, []).append(inscription)
+        if inscription.est_annulee or evenement.est_annule:
+            return
+        self.auth_service.inscrire_participant_auth(participant.id, evenement.id)
+        self.verificateur_conflits.enregistrer_inscription(participant.id, evenement, date_occurrence)
+        if inscription.est_validee:
+            self.planificateur_promotions.occuper(evenement.id, index)
+        elif donnees.get("en_attente_depuis") is not None:
+            self.planificateur_promotions.mettre_en_attente(evenement.id, index, participant.est_etudiant,
+                                                            donnees["en_attente_depuis"])
+
+    # --- Suivi d'une autre instance (lecture seule) ---
+    INTERVALLE_SUIVI = 100
+
+    def _demarrer_suivi(self):
+        hote, port = self.source_flux.rsplit(":", 1)
+        threading.Thread(target=suivre_flux, name="suivi-flux", daemon=True,
+                         args=(hote, int(port), self.flux_modifications.seq,
+                               lambda *modification: self._modifications_recues.append(modification), self._arret_suivi)).start()
+        self._afficher_etat_chargement(f"Lecture seule: suit {self.source_flux}")
+        self.after(self.INTERVALLE_SUIVI, self._appliquer_modifications_recues)
+
+    def _appliquer_modifications_recues(self):
+        # Les modifications reçues sont appliquées par lot, puis seules les vues concernées sont rafraîchies.
+        operations = set()
+        evenements_modifies = set()
+        while self._modifications_recues:
+            seq, operation, donnees = self._modifications_recues.popleft()
+            if operation == "reinitialiser":
+                # Trop en retard pour l'historique conservé par l'instance principale.
+                self._arret_suivi.set()
+                self._afficher_etat_chargement(f"Suivi interrompu ({self.source_flux}): relancez la fenêtre pour resynchroniser.")
+                return
+            self._appliquer_modification(operation, donnees)
+            self.flux_modifications.seq = seq
+            operations.add(operation)
+            if "id" in donnees and operation != "creer_participant":
+                evenements_modifies.add(donnees["id"])
+
+        if "creer_evenement" in operations:
+            self._update_event_lists(conserver_selection=True)
+        if operations & {"creer_participant", "mettre_a_jour_participant"}:
+            self._update_participant_list()
+        if operations & {"inscrire_participant", "valider_inscription", "mettre_en_attente", "annuler_inscription",
+                         "annuler_evenement", "mettre_a_jour_participant"} and self._onglet_construit("inscriptions"):
+            self._update_inscription_listbox()
+        if self._onglet_construit("evenements") and self.event_view_id_var.get().split(" - ")[0] in evenements_modifies:
+            self._display_selected_event()
+        if operations:
+            self._afficher_etat_chargement(f"Lecture seule: suit {self.source_flux} (séquence {self.flux_modifications.seq})")
+        self.after(self.INTERVALLE_SUIVI, self._appliquer_modifications_recues)
+
+    def _appliquer_modification(self, operation, donnees):
+        """Reproduit sur les objets une mutation journalisée par l'instance suivie (sans notification)."""
+        if operation == "creer_evenement":
+            self._enregistrer_evenement(self._evenement_depuis_donnees(donnees))
+        elif operation == "mettre_a_jour_description":
+            evenement = self.evenements[donnees["id"]]
+            evenement.description = donnees["description"]
+            evenement.version = donnees.get("version", evenement.version + 1)
+        elif operation == "modifier_places":
+            evenement = self.evenements[donnees["id"]]
+            evenement.nombre_places = donnees["nombre_places"]
+            evenement.version = donnees.get("version", evenement.version + 1)
+        elif operation == "modifier_date":
+            evenement = self.evenements[donnees["id"]]
+            ancienne_date = evenement.date
+            evenement.date = date.fromisoformat(donnees["date"])
+            evenement.version = donnees.get("version", evenement.version + 1)
+            self._evenement_deplace(evenement, ancienne_date)
+        elif operation == "annuler_evenement":
+            evenement = self.evenements[donnees["id"]]
+            evenement.est_annule = True
+            evenement.version = donnees.get("version", evenement.version + 1)
+            self._evenement_annule(evenement)
+        elif operation == "creer_participant":
+            self.participants.charger([self._participant_depuis_donnees(donnees["id"], donnees)])
+        elif operation == "mettre_a_jour_participant":
+            participant = self.participants[donnees["id"]]
+            if participant.nom != donnees["nom"]:
+                self.participants.renommer(participant, donnees["nom"])
+            participant.est_etudiant = donnees["est_etudiant"]
+        elif operation == "inscrire_participant":
+            self._restaurer_inscription(donnees)
+        elif operation == "valider_inscription":
+            inscription = self.inscriptions[donnees["index"]]
+            inscription.est_validee = donnees["est_validee"]
+            if inscription.est_validee:
+                self.planificateur_promotions.occuper(inscription.evenement.id, donnees["index"])
+            else:
+                # Refusée par les règles: comme chez l'instance suivie, elle quitte la liste d'attente.
+                self.planificateur_promotions.liberer(inscription.evenement.id, donnees["index"])
+        elif operation == "mettre_en_attente":
+            inscription = self.inscriptions[donnees["index"]]
+            self.planificateur_promotions.mettre_en_attente(inscription.evenement.id, donnees["index"],
+                                                            inscription.participant.est_etudiant, donnees.get("horodatage"))
+        elif operation == "annuler_inscription":
+            inscription = self.inscriptions[donnees["index"]]
+            inscription.est_annulee, inscription.est_validee = True, False
+            self.planificateur_promotions.liberer(inscription.evenement.id, donnees["index"])
+        self.statistiques.appliquer(operation, donnees)
+        self.recommandations.appliquer(operation, donnees)
+
+    def _vider_journal_periodiquement(self):
+        self.journal.vider()
+        self.after(200, self._vider_journal_periodiquement)
+
+    # Les mutations sont regroupées: au plus une réécriture du catalogue toutes les 2 secondes.
+    INTERVALLE_PUBLICATION_CATALOGUE = 2000
+    # Catalogues d'autres facultés gardés ouverts pour le routage du proxy.
+    NB_LOCATAIRES_OUVERTS = 8
+
+    def _ouvrir_locataire(self, locataire):
+        """Ensemble de travail d'une autre faculté: son catalogue publié, consulté via son propre proxy."""
+        if not locataire or locataire == self.locataire or not self.nom_catalogue:
+            raise LocataireInconnu(locataire)
+        chemin = os.path.join(self.racine_locataires, valider_code(locataire), self.nom_catalogue)
+        catalogue = CatalogueColonnaire(chemin, intervalle_verification=self.INTERVALLE_PUBLICATION_CATALOGUE / 1000)
+        return EvenementServiceProxy(catalogue, AuthentificationService(locataire))
+
+    def _publier_catalogue(self, attendre=False):
+        """Publie le catalogue depuis un thread (`attendre`: à la fermeture, dans ce thread-ci)."""
+        if self._ecriture_catalogue and self._ecriture_catalogue.is_alive():
+            if not attendre:
+                return  # publication précédente en cours: celle-ci attend le prochain passage
+            self._ecriture_catalogue.join()
+        if not (self._catalogue_a_publier and self.chargement_termine):
+            return
+        if self._evenements_catalogue is None:
+            modifies = list(self.evenements.values())
+        else:
+            modifies = [self.evenements[evenement_id] for evenement_id in self._evenements_catalogue]
+        self._evenements_catalogue = set()
+        self._catalogue_a_publier = False
+        if attendre:
+            self._ecrire_catalogue(modifies)
+            return
+        self._ecriture_catalogue = threading.Thread(target=self._ecrire_catalogue, name="publication-catalogue",
+                                                    args=(modifies,), daemon=True)
+        self._ecriture_catalogue.start()
+
+    def _ecrire_catalogue(self, modifies):
+        # Thread de publication (un seul à la fois), seul à toucher aux lignes gardées. Un événement
+        # modifié pendant le calcul de sa ligne est de nouveau marqué: il sera republié au passage suivant.
+        for evenement in modifies:
+            self._lignes_catalogue[evenement.id] = ligne_catalogue(evenement)
+        ecrire_lignes(self.fichier_catalogue, list(self._lignes_catalogue.values()))
+
+    def _publier_catalogue_periodiquement(self):
+        self._publier_catalogue()
+        self.after(self.INTERVALLE_PUBLICATION_CATALOGUE, self._publier_catalogue_periodiquement)
+
+    # Invalidations du cache partagé gardées 5 minutes: les lecteurs se synchronisent bien plus souvent.
+    INTERVALLE_PURGE_CACHE = 60000
+    RETENTION_INVALIDATIONS = 300
+
+    def _purger_cache_periodiquement(self):
+        self.cache_details.purger(self.RETENTION_INVALIDATIONS)
+        self.after(self.INTERVALLE_PURGE_CACHE, self._purger_cache_periodiquement)
+
+    # Pages du site statique reconstruites au plus une fois par seconde, pour les seuls événements modifiés.
+    INTERVALLE_PUBLICATION_SITE = 1000
+
+    def _publier_site(self):
+        # Pendant la génération complète, les modifications s'accumulent: elles seront reprises ensuite.
+        if self._evenements_site and self._generation_site and not self._generation_site.is_alive():
+            modifies, self._evenements_site = self._evenements_site, set()
+            self.generateur_site.mettre_a_jour([self.evenements[e] for e in modifies if e in self.evenements])
+
+    def _publier_site_periodiquement(self):
+        self._publier_site()
+        self.after(self.INTERVALLE_PUBLICATION_SITE, self._publier_site_periodiquement)
+
+    # --- Listes d'attente ---
+    INTERVALLE_PROMOTIONS = 500
+
+    def _capacite_evenement(self, evenement_id):
+        return getattr(self.evenements.get(evenement_id), "nombre_places", None)
+
+    def _promouvoir_inscription(self, evenement_id, index):
+        inscription = self.inscriptions[index]
+        if inscription.est_annulee:
+            return False
+        # valider_inscription() applique les règles et émet la notification "inscription_validee".
+        est_validee = inscription.valider_inscription(
+            lambda est_validee: self._journaliser("valider_inscription", {"index": index, "est_validee": est_validee}))
+        if est_validee:
+            self._programmer_rappels([inscription])
+        return est_validee
+
+    def _promouvoir_periodiquement(self):
+        if self.planificateur_promotions.executer():
+            self._update_inscription_listbox()
+        self.after(self.INTERVALLE_PROMOTIONS, self._promouvoir_periodiquement)
+
+    # --- Suggestions d'événements ---
+    INTERVALLE_RECOMMANDATIONS = 500
+    # Temps de calcul des suggestions par passage (secondes), pour ne pas figer l'interface.
+    BUDGET_RECOMMANDATIONS = 0.01
+    NB_SUGGESTIONS = 5
+
+    def _rafraichir_recommandations(self):
+        self.recommandations.rafraichir(self.BUDGET_RECOMMANDATIONS)
+        self.after(self.INTERVALLE_RECOMMANDATIONS, self._rafraichir_recommandations)
+
+    def _suggerer_evenements(self):
+        participant = self._participant_saisi(self.participant_id_var.get())
+        if not participant:
+            messagebox.showerror("Suggestions", "Veuillez sélectionner un participant.")
+            return
+        suggestions = [self.evenements[e] for e in self.recommandations.recommander(participant.id, self.NB_SUGGESTIONS)
+                       if e in self.evenements]
+        if not suggestions:
+            messagebox.showinfo("Suggestions", f"Aucun événement à venir à suggérer à {participant.nom}.")
+            return
+        # La première suggestion est présélectionnée pour l'inscription.
+        self.event_id_var.set(f"{suggestions[0].id} - {suggestions[0].nom}")
+        self._update_occurrence_list()
+        messagebox.showinfo("Suggestions", f"Événements suggérés à {participant.nom}:\n\n" +
+                            "\n".join(f"{e.date.isoformat()}  {e.id} - {e.nom}" for e in suggestions))
+
+    # --- Rappels avant les séances ---
+    INTERVALLE_RAPPELS = 1000
+    # Candidats parcourus au plus par passage: un grand événement est rappelé en plusieurs passages.
+    LOT_RAPPELS = 5000
+
+    def _prochaine_seance(self, evenement, apres):
+        if evenement.recurrence is None:
+            return evenement.date if evenement.date >= apres else None
+        return next(evenement.recurrence.occurrences(evenement.date, apres), None)
+
+    def _programmer_rappels(self, inscriptions):
+        if not self.planificateur_rappels:
+            return
+        aujourd_hui = date.today()
+        seances = set()
+        for inscription in inscriptions:
+            if not inscription.est_validee or inscription.est_annulee:
+                continue
+            # Inscription à toute une série: la séance suivante est programmée après le dernier rappel.
+            occurrence = inscription.date_occurrence or self._prochaine_seance(inscription.evenement, aujourd_hui)
+            if occurrence is not None and occurrence >= aujourd_hui:
+                seances.add((inscription.evenement.id, occurrence))
+        if seances:
+            self.planificateur_rappels.programmer_lot(sorted(seances))
+
+    def _inscriptions_seance(self, evenement_id, occurrence):
+        # Liste complétée en fin seulement: le planificateur y reprend à la position atteinte.
+        return self.inscriptions_par_evenement.get(evenement_id)
+
+    def _envoyer_rappel(self, inscription, evenement_id, occurrence, libelle):
+        if inscription.est_validee and not inscription.est_annulee and inscription.date_occurrence in (None, occurrence):
+            self.notification_service.rappeler(inscription, occurrence, libelle)
+
+    def _occurrence_suivante(self, evenement_id, occurrence):
+        evenement = self.evenements.get(evenement_id)
+        if evenement is None or evenement.recurrence is None:
+            return None
+        if not any(i.est_validee and not i.est_annulee and i.date_occurrence is None
+                   for i in self.inscriptions_par_evenement.get(evenement_id, ())):
+            return None
+        return self._prochaine_seance(evenement, occurrence + timedelta(days=1))
+
+    def _envoyer_rappels_periodiquement(self):
+        self.planificateur_rappels.executer(self.LOT_RAPPELS)
+        self.after(self.INTERVALLE_RAPPELS, self._envoyer_rappels_periodiquement)
+
+    def _evenement_deplace(self, evenement, ancienne_date):
+        """Réindexe un événement après un changement de date; les séances choisies et les rappels suivent."""
+        inscriptions = self.inscriptions_par_evenement.get(evenement.id, ())
+        actives = [i for i in inscriptions if not i.est_annulee]
+        self.verificateur_conflits.retirer_evenement(evenement, {i.participant.id for i in actives})
+        decalage = evenement.date - ancienne_date
+        for inscription in inscriptions:
+            if inscription.date_occurrence:
+                del self.inscriptions_par_cle[cle_inscription(evenement.id, inscription.participant.id, inscription.date_occurrence)]
+                inscription.date_occurrence += decalage
+                self.inscriptions_par_cle[cle_inscription(evenement.id, inscription.participant.id, inscription.date_occurrence)] = inscription
+        self.verificateur_conflits.enregistrer_evenement(evenement)
+        for inscription in actives:
+            self.verificateur_conflits.enregistrer_inscription(inscription.participant.id, evenement, inscription.date_occurrence)
+        self.evenement_service_proxy.index_visibilite.enregistrer_evenement(evenement)
+        if self.planificateur_rappels:
+            self.planificateur_rappels.replanifier(evenement.id, decalage.days)
+
+    def _evenement_annule(self, evenement):
+        """Reporte l'annulation d'un événement sur ses inscriptions, places, créneaux et rappels (la notification
+        des inscrits, elle, est diffusée par lots)."""
+        participants = set()
+        for inscription in self.inscriptions_par_evenement.get(evenement.id, ()):
+            if not inscription.est_annulee:
+                inscription.est_annulee, inscription.est_validee = True, False
+                inscription.annulee_avec_evenement = True
+                participants.add(inscription.participant.id)
+                self.auth_service.desinscrire_participant_auth(inscription.participant.id, evenement.id)
+        self.verificateur_conflits.retirer_evenement(evenement, participants)
+        self.planificateur_promotions.retirer_evenement(evenement.id)
+        if self.planificateur_rappels:
+            self.planificateur_rappels.annuler(evenement.id)
+
+    # Modifications d'un événement et de ce qui en dépend, sans boîte de dialogue (interface et rejeu du trafic).
+    # Chacune retourne la nouvelle version; ConflitVersion si `version_attendue` n'est plus la version actuelle.
+    def _modifier_places(self, evenement, nombre_places, version_attendue):
+        version = self.evenement_service.modifier_places(evenement.id, nombre_places, version_attendue)
+        self.planificateur_promotions.capacite_modifiee(evenement.id)
+        return version
+
+    def _modifier_date(self, evenement, nouvelle_date, version_attendue):
+        ancienne_date = evenement.date
+        version = self.evenement_service.modifier_date(evenement.id, nouvelle_date, version_attendue)
+        self._evenement_deplace(evenement, ancienne_date)
+        return version
+
+    def _annuler_evenement(self, evenement, version_attendue):
+        version = self.evenement_service.annuler_evenement(evenement.id, version_attendue)
+        self._evenement_annule(evenement)
+        return version
+
+    # --- Présences ---
+    def _inscription_pointable(self, cle):
+        # Appelé depuis les threads du serveur de pointage: lecture seule des inscriptions.
+        inscription = self.inscriptions_par_cle.get(cle)
+        return inscription is not None and inscription.est_validee and not inscription.est_annulee
+
+    def _afficher_badge(self):
+        selected_item_id = self.inscription_tree.selection()
+        if not selected_item_id or not self.service_pointage:
+            messagebox.showerror("Badge", "Veuillez sélectionner une inscription.")
+            return
+        inscription = self.inscriptions[int(selected_item_id[0])]
+        if not inscription.est_validee:
+            messagebox.showwarning("Badge", "Le badge n'est délivré qu'aux inscriptions validées.")
+            return
+        jeton = self.service_pointage.generateur.emettre(
+            cle_inscription(inscription.evenement.id, inscription.participant.id, inscription.date_occurrence))
+        self.clipboard_clear()
+        self.clipboard_append(jeton)
+        messagebox.showinfo("Badge", f"Badge de {inscription.participant.nom} pour '{inscription.evenement.nom}' "
+                                     f"(copié dans le presse-papiers):\n\n{jeton}")
+
+    def _inscrits_evenement(self, evenement):
+        # La liste elle-même (pas une copie): la diffusion la parcourt par lots.
+        return self.inscriptions_par_evenement.get(evenement.id, ())
+
+    def _vider_notifications_periodiquement(self):
+        self.notification_service.vider_digest()
+        self._actualiser_non_lus()
+        self.after(1000, self._vider_notifications_periodiquement)
+
+    # Rafraîchissement du widget à fréquence fixe (~10 images/s) au lieu d'une écriture par notification.
+    INTERVALLE_RAFRAICHISSEMENT_LOG = 100
+
+    def _rafraichir_journal_notifications(self):
+        nouvelles = self.journal_notifications.extraire_nouvelles()
+        if nouvelles:
+            self.notification_log.config(state='normal')
+            self.notification_log.insert(tk.END, "\n".join(nouvelles) + "\n")
+            nb_lignes = int(self.notification_log.index('end-1c').split('.')[0]) - 1
+            if nb_lignes > self.journal_notifications.capacite:
+                self.notification_log.delete('1.0', f"{nb_lignes - self.journal_notifications.capacite + 1}.0")
+            self.notification_log.see(tk.END)
+            self.notification_log.config(state='disabled')
+        self.after(self.INTERVALLE_RAFRAICHISSEMENT_LOG, self._rafraichir_journal_notifications)
+
+    def _rechercher_notifications(self):
+        motif = self.notification_search_entry.get()
+        if not motif:
+            messagebox.showwarning("Recherche", "Veuillez saisir un texte à rechercher.")
+            return
+        self._attendre_recherche(self.journal_notifications.rechercher(motif))
+
+    def _attendre_recherche(self, recherche):
+        # La recherche tourne dans un thread: on l'interroge sans bloquer la boucle Tk.
+        if not recherche.termine:
+            self.after(50, self._attendre_recherche, recherche)
+            return
+        fenetre = tk.Toplevel(self)
+        fenetre.title(f"Notifications contenant '{recherche.motif}' ({len(recherche.resultats)})")
+        resultats = scrolledtext.ScrolledText(fenetre, width=100, height=25, wrap=tk.WORD, font=('Consolas', 9))
+        resultats.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        resultats.insert(tk.END, "\n".join(recherche.resultats) or "Aucun résultat.")
+        resultats.config(state='disabled')
+
+    def _fermer(self):
+        self.notification_service.vider_digest(forcer=True)
+        self.journal_notifications.fermer()
+        if self.journal:
+            self.journal.fermer()
+        if self.cache_details:
+            self.cache_details.fermer()
+        if self.fichier_catalogue:
+            self._publier_catalogue(attendre=True)
+        if self.generateur_site:
+            self._publier_site()
+            if not self._generation_site or not self._generation_site.is_alive():
+                self.generateur_site.fermer()
+        if self.serveur_pointage:
+            self.serveur_pointage.arreter()
+        if self.serveur_flux:
+            self.serveur_flux.arreter()
+        self._arret_suivi.set()
+        if self.service_pointage:
+            self.service_pointage.registre.fermer()
+        if self.planificateur_rappels:
+            self.planificateur_rappels.fermer()
+        if self.suivi_diffusions:
+            self.suivi_diffusions.fermer()
+        if self.enregistreur_trafic:
+            self.enregistreur_trafic.fermer()
+        if self.boites_reception:
+            self.boites_reception.fermer()
+        self.registre_locataires.fermer()
+        self.destroy()
+
     def _create_widgets(self):
         # --- Main frame for tabs (Notebook) ---
         self.notebook = ttk.Notebook(self) # Use ttk.Notebook
         self.notebook.pack(expand=True, fill="both", padx=15, pady=15) # Add more padding
 
-        # Onglet "Créer Événement"
-        self._create_event_tab()
-        # Onglet "Gérer Inscriptions"
-        self._create_inscription_tab()
-        # Onglet "Voir Événements"
-        self._create_view_events_tab()
-        # Onglet "Proxy & Notifications"
-        self._create_proxy_notification_tab()
+        # Les onglets sont des cadres vides jusqu'à leur première sélection: seul le premier est construit
+        # avant l'affichage de la fenêtre.
+        self._cadres_onglets = []
+        for cle, titre, _ in self.ONGLETS:
+            frame = ttk.Frame(self.notebook, padding="15 15 15 15")
+            self.notebook.add(frame, text=titre)
+            self._cadres_onglets.append(frame)
+        self._onglets_construits = set()
+        self._construire_onglet(self.ONGLETS[0][0])
+        self.notebook.bind("<<NotebookTabChanged>>", self._onglet_selectionne)
 
         # Notification Log at the bottom
         log_frame = ttk.LabelFrame(self, text="Journal des Notifications") # Use ttk.LabelFrame
         log_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=15, pady=5)
+        search_frame = ttk.Frame(log_frame)
+        search_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(search_frame, text="Rechercher dans l'historique:").pack(side=tk.LEFT, padx=5)
+        self.notification_search_entry = ttk.Entry(search_frame)
+        self.notification_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(search_frame, text="Rechercher", command=self._rechercher_notifications).pack(side=tk.LEFT, padx=5)
+        self.etat_chargement_label = ttk.Label(search_frame, text="")
+        self.etat_chargement_label.pack(side=tk.RIGHT, padx=5)
         self.notification_log.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.notification_log.config(state='normal')
         self.notification_log.delete(1.0, tk.END)
         self.notification_log.config(state='disabled')
 
-    def _create_event_tab(self):
-        frame = ttk.Frame(self.notebook, padding="15 15 15 15") # Use ttk.Frame with padding
-        self.notebook.add(frame, text="Créer Événement")
+    # (clé, titre, méthode de construction), dans l'ordre des onglets.
+    ONGLETS = (("creer", "Créer Événement", "_create_event_tab"),
+               ("inscriptions", "Gérer Inscriptions", "_create_inscription_tab"),
+               ("evenements", "Voir Événements", "_create_view_events_tab"),
+               ("proxy", "Proxy & Notifications", "_create_proxy_notification_tab"))
+
+    def _construire_onglet(self, cle):
+        if cle in self._onglets_construits:
+            return
+        for index, (cle_onglet, _, methode) in enumerate(self.ONGLETS):
+            if cle_onglet == cle:
+                getattr(self, methode)(self._cadres_onglets[index])
+        self._onglets_construits.add(cle)
+        # Un onglet construit tardivement se remplit avec les données déjà chargées.
+        if self.chargement_termine and cle != "creer":
+            self._update_event_lists()
+            self._update_participant_list()
+
+    def _onglet_selectionne(self, event=None):
+        self._construire_onglet(self.ONGLETS[self.notebook.index("current")][0])
+
+    def _onglet_construit(self, cle):
+        return cle in self._onglets_construits
+
+    def _create_event_tab(self, frame):
 
         # Use ttk.Label and ttk.Entry for consistent styling
         ttk.Label(frame, text="Nom:").grid(row=0, column=0, sticky="w", pady=5, padx=5)
@@ -346,16 +1584,29 @@ class EventApp(tk.Tk):
         ttk.Label(frame, text="Type d'Événement:").grid(row=3, column=0, sticky="w", pady=5, padx=5)
         self.event_type_var = tk.StringVar(self)
         self.event_type_var.set("Conference")
-        event_type_options = ["Conference", "Hackathon", "Seminaire"]
+        event_type_options = EvenementFactory.types_disponibles()
         self.event_type_menu = ttk.Combobox(frame, textvariable=self.event_type_var, values=event_type_options, state="readonly")
         self.event_type_menu.grid(row=3, column=1, sticky="ew", pady=5, padx=5)
         self.event_type_menu.bind("<<ComboboxSelected>>", self._update_event_specific_fields)
 
+        ttk.Label(frame, text="Répétition:").grid(row=4, column=0, sticky="w", pady=5, padx=5)
+        self.event_recurrence_var = tk.StringVar(self)
+        self.event_recurrence_var.set("Aucune")
+        ttk.Combobox(frame, textvariable=self.event_recurrence_var, values=["Aucune", "quotidienne", "hebdomadaire", "mensuelle"],
+                     state="readonly").grid(row=4, column=1, sticky="ew", pady=5, padx=5)
+
+        ttk.Label(frame, text="Nombre de séances (vide = sans fin):").grid(row=5, column=0, sticky="w", pady=5, padx=5)
+        self.event_nb_seances_entry = ttk.Entry(frame)
+        self.event_nb_seances_entry.grid(row=5, column=1, sticky="ew", pady=5, padx=5)
+
         self.specific_frame = ttk.Frame(frame, padding="10 0 0 0") # Padding for nested frame
-        self.specific_frame.grid(row=4, column=0, columnspan=2, sticky="ew", pady=5)
+        self.specific_frame.grid(row=6, column=0, columnspan=2, sticky="ew", pady=5)
         self._update_event_specific_fields()
 
-        ttk.Button(frame, text="Créer Événement", command=self._create_event, style='Accent.TButton').grid(row=5, column=0, columnspan=2, pady=15, padx=5)
+        self.create_event_button = ttk.Button(frame, text="Créer Événement", command=self._create_event, style='Accent.TButton')
+        self.create_event_button.grid(row=7, column=0, columnspan=2, pady=15, padx=5)
+        if not self.chargement_termine:
+            self.create_event_button.state(["disabled"])
 
         frame.columnconfigure(1, weight=1)
 
@@ -363,28 +1614,18 @@ class EventApp(tk.Tk):
         for widget in self.specific_frame.winfo_children():
             widget.destroy()
 
-        event_type = self.event_type_var.get()
-        if event_type == "Conference":
-            ttk.Label(self.specific_frame, text="Nombre de places:").grid(row=0, column=0, sticky="w", pady=2, padx=5)
-            self.conf_places_entry = ttk.Entry(self.specific_frame)
-            self.conf_places_entry.grid(row=0, column=1, sticky="ew", pady=2, padx=5)
-            ttk.Label(self.specific_frame, text="Speaker Principal:").grid(row=1, column=0, sticky="w", pady=2, padx=5)
-            self.conf_speaker_entry = ttk.Entry(self.specific_frame)
-            self.conf_speaker_entry.grid(row=1, column=1, sticky="ew", pady=2, padx=5)
-        elif event_type == "Hackathon":
-            ttk.Label(self.specific_frame, text="Sponsor:").grid(row=0, column=0, sticky="w", pady=2, padx=5)
-            self.hack_sponsor_entry = ttk.Entry(self.specific_frame)
-            self.hack_sponsor_entry.grid(row=0, column=1, sticky="ew", pady=2, padx=5)
-            ttk.Label(self.specific_frame, text="Durée (heures):").grid(row=1, column=0, sticky="w", pady=2, padx=5)
-            self.hack_duree_entry = ttk.Entry(self.specific_frame)
-            self.hack_duree_entry.grid(row=1, column=1, sticky="ew", pady=2, padx=5)
-        elif event_type == "Seminaire":
-            ttk.Label(self.specific_frame, text="Domaine:").grid(row=0, column=0, sticky="w", pady=2, padx=5)
-            self.sem_domaine_entry = ttk.Entry(self.specific_frame)
-            self.sem_domaine_entry.grid(row=0, column=1, sticky="ew", pady=2, padx=5)
+        # Les champs sont générés depuis le schéma du type enregistré dans la fabrique.
+        self.specific_entries = {}
+        for row, champ in enumerate(EvenementFactory.schema(self.event_type_var.get()).champs):
+            ttk.Label(self.specific_frame, text=f"{champ.libelle}:").grid(row=row, column=0, sticky="w", pady=2, padx=5)
+            entry = ttk.Entry(self.specific_frame)
+            entry.grid(row=row, column=1, sticky="ew", pady=2, padx=5)
+            self.specific_entries[champ.nom] = entry
         self.specific_frame.columnconfigure(1, weight=1)
 
     def _create_event(self):
+        if not self._donnees_pretes():
+            return
         try:
             name = self.event_name_entry.get()
             desc = self.event_desc_entry.get()
@@ -396,19 +1637,21 @@ class EventApp(tk.Tk):
             
             event_date = date.fromisoformat(date_str)
 
-            kwargs = {}
-            if event_type == "Conference":
-                kwargs['nombre_places'] = int(self.conf_places_entry.get())
-                kwargs['speaker_principal'] = self.conf_speaker_entry.get()
-            elif event_type == "Hackathon":
-                kwargs['sponsor'] = self.hack_sponsor_entry.get()
-                kwargs['duree_heures'] = int(self.hack_duree_entry.get())
-            elif event_type == "Seminaire":
-                kwargs['domaine'] = self.sem_domaine_entry.get()
+            # La fabrique valide et convertit les champs spécifiques selon le schéma du type.
+            kwargs = {nom_champ: entry.get() for nom_champ, entry in self.specific_entries.items()}
+
+            recurrence = None
+            if self.event_recurrence_var.get() != "Aucune":
+                nb_seances = self.event_nb_seances_entry.get()
+                recurrence = RegleRecurrence(self.event_recurrence_var.get(), nombre=int(nb_seances) if nb_seances else None)
 
-            new_event = self.evenement_factory.creer_evenement(event_type, name, desc, event_date, **kwargs)
-            self.evenements[new_event.id] = new_event
-            new_event.ajouter_observateur(self.notification_service)
+            new_event = self.evenement_factory.creer_evenement(event_type, name, desc, event_date, recurrence=recurrence, **kwargs)
+            conflits = self.verificateur_conflits.conflits_evenement(new_event)
+            if conflits and not messagebox.askyesno("Conflit d'horaire", "Ressource déjà réservée:\n" +
+                                                    "\n".join(f"{genre} '{valeur}': {self._formater_occupation(cle)}" for (genre, valeur), cle in conflits[:10]) +
+                                                    "\n\nCréer l'événement malgré tout ?"):
+                return
+            self._ajouter_evenement(new_event)
 
             messagebox.showinfo("Succès", f"Événement '{new_event.nom}' créé avec l'ID: {new_event.id}")
             self._update_event_lists()
@@ -424,12 +1667,12 @@ class EventApp(tk.Tk):
         self.event_desc_entry.delete(0, tk.END)
         self.event_date_entry.delete(0, tk.END)
         self.event_type_var.set("Conference")
+        self.event_recurrence_var.set("Aucune")
+        self.event_nb_seances_entry.delete(0, tk.END)
         self._update_event_specific_fields()
 
 
-    def _create_inscription_tab(self):
-        frame = ttk.Frame(self.notebook, padding="15 15 15 15")
-        self.notebook.add(frame, text="Gérer Inscriptions")
+    def _create_inscription_tab(self, frame):
 
         ttk.Label(frame, text="--- Créer un Participant ---", font=('Segoe UI', 11, 'bold')).grid(row=0, column=0, columnspan=2, sticky="ew", pady=10)
         ttk.Label(frame, text="Nom Participant:").grid(row=1, column=0, sticky="w", pady=2, padx=5)
@@ -440,22 +1683,36 @@ class EventApp(tk.Tk):
         self.part_email_entry.grid(row=2, column=1, sticky="ew", pady=2, padx=5)
         self.part_is_student_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(frame, text="Est étudiant?", variable=self.part_is_student_var).grid(row=3, column=0, columnspan=2, sticky="w", pady=5, padx=5)
-        ttk.Button(frame, text="Créer Participant", command=self._create_participant).grid(row=4, column=0, columnspan=2, pady=10, padx=5)
+        participant_actions = ttk.Frame(frame)
+        participant_actions.grid(row=4, column=0, columnspan=2, pady=10, padx=5)
+        ttk.Button(participant_actions, text="Créer Participant", command=self._create_participant).pack(side=tk.LEFT, padx=5)
+        ttk.Button(participant_actions, text="Importer (CSV)...", command=self._importer_participants_csv).pack(side=tk.LEFT, padx=5)
 
         ttk.Label(frame, text="--- Inscrire un Participant ---", font=('Segoe UI', 11, 'bold')).grid(row=5, column=0, columnspan=2, sticky="ew", pady=10)
         ttk.Label(frame, text="Participant:").grid(row=6, column=0, sticky="w", pady=2, padx=5)
         self.participant_id_var = tk.StringVar(self)
-        self.participant_menu = ttk.Combobox(frame, textvariable=self.participant_id_var, state="readonly")
+        # Combobox éditable: la saisie filtre les participants par nom (ou accepte un email).
+        self.participant_menu = ttk.Combobox(frame, textvariable=self.participant_id_var)
         self.participant_menu.grid(row=6, column=1, sticky="ew", pady=2, padx=5)
+        self.participant_menu.bind("<KeyRelease>", self._filtrer_participants)
 
         ttk.Label(frame, text="Événement:").grid(row=7, column=0, sticky="w", pady=2, padx=5)
         self.event_id_var = tk.StringVar(self)
         self.event_menu_inscription = ttk.Combobox(frame, textvariable=self.event_id_var, state="readonly")
         self.event_menu_inscription.grid(row=7, column=1, sticky="ew", pady=2, padx=5)
+        self.event_menu_inscription.bind("<<ComboboxSelected>>", self._update_occurrence_list)
+
+        ttk.Label(frame, text="Séance:").grid(row=8, column=0, sticky="w", pady=2, padx=5)
+        self.occurrence_var = tk.StringVar(self)
+        self.occurrence_menu = ttk.Combobox(frame, textvariable=self.occurrence_var, state="readonly")
+        self.occurrence_menu.grid(row=8, column=1, sticky="ew", pady=2, padx=5)
 
-        ttk.Button(frame, text="Inscrire", command=self._inscrire_participant, style='Accent.TButton').grid(row=8, column=0, columnspan=2, pady=15, padx=5)
+        inscription_actions = ttk.Frame(frame)
+        inscription_actions.grid(row=9, column=0, columnspan=2, pady=15, padx=5)
+        ttk.Button(inscription_actions, text="Inscrire", command=self._inscrire_participant, style='Accent.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(inscription_actions, text="Suggérer des Événements", command=self._suggerer_evenements).pack(side=tk.LEFT, padx=5)
 
-        ttk.Label(frame, text="--- Inscriptions Actuelles ---", font=('Segoe UI', 11, 'bold')).grid(row=9, column=0, columnspan=2, sticky="ew", pady=10)
+        ttk.Label(frame, text="--- Inscriptions Actuelles ---", font=('Segoe UI', 11, 'bold')).grid(row=10, column=0, columnspan=2, sticky="ew", pady=10)
         # Use ttk.Treeview for a more modern listbox look and feel
         self.inscription_tree = ttk.Treeview(frame, columns=('Participant', 'Event', 'Status'), show='headings', height=8)
         self.inscription_tree.heading('Participant', text='Participant')
@@ -464,20 +1721,36 @@ class EventApp(tk.Tk):
         self.inscription_tree.column('Participant', width=150, anchor='center')
         self.inscription_tree.column('Event', width=150, anchor='center')
         self.inscription_tree.column('Status', width=100, anchor='center')
-        self.inscription_tree.grid(row=10, column=0, columnspan=2, sticky="nsew", pady=5, padx=5)
+        self.inscription_tree.grid(row=11, column=0, columnspan=2, sticky="nsew", pady=5, padx=5)
 
         # Add a scrollbar to the Treeview
         tree_scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.inscription_tree.yview)
-        tree_scrollbar.grid(row=10, column=2, sticky="ns")
+        tree_scrollbar.grid(row=11, column=2, sticky="ns")
         self.inscription_tree.configure(yscrollcommand=tree_scrollbar.set)
 
-        ttk.Button(frame, text="Valider Inscription Sélectionnée", command=self._validate_selected_inscription).grid(row=11, column=0, columnspan=2, pady=10, padx=5)
+        # Une page d'inscriptions à la fois; sans navigation, la dernière page suit les nouvelles inscriptions.
+        self._debut_page_inscriptions = None
+        self._debut_inscriptions_affichees = 0
+        pages_frame = ttk.Frame(frame)
+        pages_frame.grid(row=12, column=0, columnspan=2, pady=2, padx=5)
+        ttk.Button(pages_frame, text="◀ Précédentes", command=lambda: self._changer_page_inscriptions(-1)).pack(side=tk.LEFT, padx=5)
+        self.inscription_page_label = ttk.Label(pages_frame, text="")
+        self.inscription_page_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(pages_frame, text="Suivantes ▶", command=lambda: self._changer_page_inscriptions(1)).pack(side=tk.LEFT, padx=5)
+
+        actions_frame = ttk.Frame(frame)
+        actions_frame.grid(row=13, column=0, columnspan=2, pady=10, padx=5)
+        ttk.Button(actions_frame, text="Valider Inscription Sélectionnée", command=self._validate_selected_inscription).pack(side=tk.LEFT, padx=5)
+        ttk.Button(actions_frame, text="Annuler Inscription Sélectionnée", command=self._cancel_selected_inscription).pack(side=tk.LEFT, padx=5)
+        ttk.Button(actions_frame, text="Badge", command=self._afficher_badge).pack(side=tk.LEFT, padx=5)
 
         frame.columnconfigure(1, weight=1)
-        frame.rowconfigure(10, weight=1) # Allow treeview to expand
+        frame.rowconfigure(11, weight=1) # Allow treeview to expand
 
 
     def _create_participant(self):
+        if not self._donnees_pretes():
+            return
         try:
             name = self.part_name_entry.get()
             email = self.part_email_entry.get()
@@ -485,9 +1758,12 @@ class EventApp(tk.Tk):
             
             if not name or not email:
                 raise ValueError("Nom et email du participant sont requis.")
+            existant = self.participants.par_email(email)
+            if existant:
+                raise ErreurEmailDuplique(email, existant)
 
-            new_participant = Participant(name, email, is_student)
-            self.participants[new_participant.id] = new_participant
+            new_participant = Participant(name, email, is_student, self.locataire)
+            self._ajouter_participant(new_participant)
             messagebox.showinfo("Succès", f"Participant '{new_participant.nom}' créé avec l'ID: {new_participant.id}")
             self._update_participant_list()
             self.part_name_entry.delete(0, tk.END)
@@ -496,86 +1772,300 @@ class EventApp(tk.Tk):
         except Exception as e:
             messagebox.showerror("Erreur participant", str(e))
 
+    def importer_participants(self, lignes):
+        """Import en masse (dicts nom/email/est_etudiant): crée ou met à jour selon l'email normalisé."""
+        crees, mis_a_jour = self.participants.upsert_lot(
+            lignes, lambda nom, email, est_etudiant: Participant(nom, email, est_etudiant, self.locataire))
+        for participant in crees:
+            self._journaliser("creer_participant", {"id": participant.id, "nom": participant.nom,
+                                                    "email": participant.email, "est_etudiant": participant.est_etudiant})
+        for participant in mis_a_jour:
+            self._journaliser("mettre_a_jour_participant", {"id": participant.id, "nom": participant.nom,
+                                                            "est_etudiant": participant.est_etudiant})
+        return crees, mis_a_jour
+
+    def _importer_participants_csv(self):
+        if not self._donnees_pretes():
+            return
+        chemin = filedialog.askopenfilename(title="Importer des participants", filetypes=[("CSV", "*.csv")])
+        if not chemin:
+            return
+        try:
+            with open(chemin, newline="", encoding="utf-8-sig") as f:
+                lignes = [{"nom": ligne.get("nom", ""), "email": ligne.get("email", ""),
+                           "est_etudiant": ligne.get("est_etudiant", "oui").strip().lower() in ("oui", "1", "true", "vrai")}
+                          for ligne in csv.DictReader(f)]
+            crees, mis_a_jour = self.importer_participants(lignes)
+            messagebox.showinfo("Import", f"{len(crees)} participant(s) créé(s), {len(mis_a_jour)} mis à jour.")
+            self._update_participant_list()
+        except Exception as e:
+            messagebox.showerror("Erreur Import", str(e))
+
+    # Nombre de participants proposés dans les listes; la saisie filtre par préfixe de nom.
+    NB_PARTICIPANTS_PROPOSES = 50
+
+    def _options_participants(self, saisie=""):
+        return [f"{p.id} - {p.nom}" for p in self.participants.rechercher(saisie, self.NB_PARTICIPANTS_PROPOSES)]
+
+    def _participant_saisi(self, texte):
+        """Participant désigné par "P001 - Nom" (liste) ou par son email."""
+        texte = texte.strip()
+        return self.participants.get(texte.split(" - ")[0]) or self.participants.par_email(texte)
+
+    def _filtrer_participants(self, event=None):
+        combobox = event.widget if event is not None else self.participant_menu
+        saisie = combobox.get()
+        if " - " in saisie:
+            saisie = saisie.split(" - ", 1)[1]
+        combobox['values'] = self._options_participants(saisie)
+
     def _update_participant_list(self):
-        self.participant_menu['values'] = [f"{p.id} - {p.nom}" for p in self.participants.values()]
-        if self.participants:
-            self.participant_id_var.set(self.participant_menu['values'][0])
-        else:
-            self.participant_id_var.set("")
+        options = self._options_participants()
+        if self._onglet_construit("proxy"):
+            self.current_user_menu['values'] = options
+        if self._onglet_construit("inscriptions"):
+            self.participant_menu['values'] = options
+            self.participant_id_var.set(options[0] if options else "")
         
+    # Nombre de séances proposées pour un événement récurrent (seule cette fenêtre est générée).
+    NB_SEANCES_PROPOSEES = 20
+    TOUTES_LES_SEANCES = "Toutes les séances"
+
+    def _update_occurrence_list(self, event=None):
+        evenement = self.evenements.get(self.event_id_var.get().split(" - ")[0])
+        if not evenement or not evenement.recurrence:
+            self.occurrence_menu['values'] = []
+            self.occurrence_var.set("")
+            return
+        seances = []
+        for occurrence in evenement.occurrences(debut=date.today()):
+            seances.append(occurrence.date.isoformat())
+            if len(seances) >= self.NB_SEANCES_PROPOSEES:
+                break
+        self.occurrence_menu['values'] = [self.TOUTES_LES_SEANCES] + seances
+        self.occurrence_var.set(self.TOUTES_LES_SEANCES)
+
     def _inscrire_participant(self):
+        if not self._donnees_pretes():
+            return
         try:
-            selected_participant_id = self.participant_id_var.get().split(" - ")[0]
             selected_event_id = self.event_id_var.get().split(" - ")[0]
 
-            participant = self.participants.get(selected_participant_id)
+            participant = self._participant_saisi(self.participant_id_var.get())
             evenement = self.evenements.get(selected_event_id)
 
             if not participant or not evenement:
                 raise ValueError("Veuillez sélectionner un participant et un événement valides.")
-
-            regle = RegleValidationGenerale() # Default
-            if isinstance(evenement, Hackathon):
-                regle = RegleValidationHackathon()
-            elif isinstance(evenement, Conference):
-                regle = RegleValidationConference()
-
-            new_inscription = Inscription(participant, evenement, regle)
-            new_inscription.ajouter_observateur(self.notification_service)
-            self.inscriptions.append(new_inscription)
-            
-            self.auth_service.inscrire_participant_auth(participant.id, evenement.id)
-
-            messagebox.showinfo("Succès", f"Inscription de {participant.nom} à '{evenement.nom}' ajoutée. Validation en attente.")
-            self._update_inscription_listbox()
+            if evenement.est_annule:
+                raise ValueError(f"'{evenement.nom}' est annulé.")
+
+            date_occurrence = None
+            seance = self.occurrence_var.get()
+            if evenement.recurrence and seance and seance != self.TOUTES_LES_SEANCES:
+                date_occurrence = date.fromisoformat(seance)
+                if not est_occurrence(evenement, date_occurrence):
+                    raise ValueError(f"Le {seance} n'est pas une séance de '{evenement.nom}'.")
+
+            conflits = self.verificateur_conflits.conflits_inscription(participant.id, evenement, date_occurrence)
+            if conflits and not messagebox.askyesno("Conflit d'horaire", f"{participant.nom} est déjà inscrit(e) sur ce créneau:\n" +
+                                                    "\n".join(self._formater_occupation(cle) for cle in conflits[:10]) +
+                                                    "\n\nInscrire malgré tout ?"):
+                return
         except Exception as e:
             messagebox.showerror("Erreur Inscription", str(e))
+            return
+        self._admettre(participant.id, ("inscrire", evenement.id, date_occurrence), "Erreur Inscription",
+                       lambda: self._enregistrer_inscription(participant, evenement, date_occurrence))
+
+    def _enregistrer_inscription(self, participant, evenement, date_occurrence):
+        if evenement.est_annule:
+            # La demande a pu attendre dans la salle d'attente pendant l'annulation.
+            raise ValueError(f"'{evenement.nom}' est annulé.")
+        new_inscription = Inscription(participant, evenement, self._choisir_regle(evenement), date_occurrence)
+        new_inscription.ajouter_observateur(self.notification_service)
+        self._journaliser("inscrire_participant", {"participant_id": participant.id, "evenement_id": evenement.id,
+                                                   "date_occurrence": date_occurrence.isoformat() if date_occurrence else None,
+                                                   "date_inscription": new_inscription.date_inscription.isoformat()})
+        self.inscriptions.append(new_inscription)
+        self.inscriptions_par_cle[cle_inscription(evenement.id, participant.id, date_occurrence)] = new_inscription
+        self.inscriptions_par_evenement.setdefault(evenement.id, []).append(new_inscription)
+
+        self.auth_service.inscrire_participant_auth(participant.id, evenement.id)
+        self.verificateur_conflits.enregistrer_inscription(participant.id, evenement, date_occurrence)
+        return self.INSCRITE, new_inscription
+
+    # Lignes de la liste des inscriptions: seule la page affichée est reconstruite après chaque modification.
+    NB_INSCRIPTIONS_PAR_PAGE = 200
 
     def _update_inscription_listbox(self):
-        # Clear existing items in Treeview
-        for i in self.inscription_tree.get_children():
-            self.inscription_tree.delete(i)
-        
-        for inscr in self.inscriptions:
-            status = "Validée" if inscr.est_validee else "En attente"
-            self.inscription_tree.insert('', tk.END, values=(inscr.participant.nom, inscr.evenement.nom, status))
+        if not self._onglet_construit("inscriptions"):
+            return
+        total = len(self.inscriptions)
+        debut = self._debut_page_inscriptions
+        if debut is None or debut >= total:
+            debut = max(0, total - self.NB_INSCRIPTIONS_PAR_PAGE)
+        fin = min(total, debut + self.NB_INSCRIPTIONS_PAR_PAGE)
+        self._debut_inscriptions_affichees = debut
+        selection = [iid for iid in self.inscription_tree.selection() if debut <= int(iid) < fin]
+        self.inscription_tree.delete(*self.inscription_tree.get_children())
+
+        # L'iid de chaque ligne est l'index de l'inscription dans self.inscriptions.
+        for index in range(debut, fin):
+            inscr = self.inscriptions[index]
+            if inscr.est_annulee:
+                status = "Annulée"
+            elif inscr.est_validee:
+                status = "Validée"
+            elif self.planificateur_promotions.en_attente(inscr.evenement.id, index):
+                status = "Liste d'attente"
+            else:
+                status = "En attente"
+            nom_evenement = inscr.evenement.nom
+            if inscr.date_occurrence:
+                nom_evenement += f" ({inscr.date_occurrence.isoformat()})"
+            self.inscription_tree.insert('', tk.END, iid=str(index), values=(inscr.participant.nom, nom_evenement, status))
+        if selection:
+            self.inscription_tree.selection_set(selection)
+        self.inscription_page_label.config(text=f"Inscriptions {debut + 1}–{fin} sur {total}" if total else "Aucune inscription")
+
+    def _changer_page_inscriptions(self, sens):
+        debut = self._debut_inscriptions_affichees + sens * self.NB_INSCRIPTIONS_PAR_PAGE
+        # Revenir à la dernière page rétablit le suivi des nouvelles inscriptions.
+        self._debut_page_inscriptions = None if debut + self.NB_INSCRIPTIONS_PAR_PAGE >= len(self.inscriptions) else max(0, debut)
+        self._update_inscription_listbox()
 
     def _validate_selected_inscription(self):
+        if not self._donnees_pretes():
+            return
         try:
             selected_item_id = self.inscription_tree.selection()
             if not selected_item_id:
                 messagebox.showerror("Validation", "Veuillez sélectionner une inscription à valider.")
                 return
 
-            # Get the index of the selected item in the original inscriptions list
-            # This is a bit indirect, but necessary because Treeview doesn't store object references directly
-            selected_values = self.inscription_tree.item(selected_item_id[0])['values']
-            
-            inscription_obj = None
-            for inscr in self.inscriptions:
-                if inscr.participant.nom == selected_values[0] and \
-                   inscr.evenement.nom == selected_values[1] and \
-                   ("Validée" if inscr.est_validee else "En attente") == selected_values[2]:
-                   inscription_obj = inscr
-                   break
-            
-            if not inscription_obj:
+            # The Treeview iid is the index of the inscription in self.inscriptions
+            index = int(selected_item_id[0])
+            if not 0 <= index < len(self.inscriptions):
                 messagebox.showerror("Validation", "Inscription introuvable.")
                 return
+        except Exception as e:
+            messagebox.showerror("Erreur Validation", str(e))
+            return
+        self._admettre(self.inscriptions[index].participant.id, ("valider", index), "Erreur Validation",
+                       lambda: self._valider_inscription(index))
+
+    def _valider_inscription(self, index):
+        inscription_obj = self.inscriptions[index]
+        if inscription_obj.est_annulee:
+            return self.DEJA_ANNULEE, inscription_obj
+
+        evenement = inscription_obj.evenement
+        if not inscription_obj.est_validee and self.planificateur_promotions.en_attente(evenement.id):
+            # Des inscrits attendent: les places libres leur reviennent avant toute validation directe.
+            self.planificateur_promotions.promouvoir_attente(evenement.id)
+            if inscription_obj.est_validee:
+                return self.VALIDEE, inscription_obj
+            if self.planificateur_promotions.en_attente(evenement.id, index):
+                return self.LISTE_ATTENTE, inscription_obj
+        if not inscription_obj.est_validee and self.planificateur_promotions.est_complet(evenement.id):
+            horodatage = self.planificateur_promotions.mettre_en_attente(evenement.id, index, inscription_obj.participant.est_etudiant)
+            self._journaliser("mettre_en_attente", {"index": index, "horodatage": horodatage})
+            return self.LISTE_ATTENTE, inscription_obj
+
+        est_validee = inscription_obj.valider_inscription(
+            lambda est_validee: self._journaliser("valider_inscription", {"index": index, "est_validee": est_validee}))
+        if est_validee:
+            self.planificateur_promotions.occuper(evenement.id, index)
+            self._programmer_rappels([inscription_obj])
+            return self.VALIDEE, inscription_obj
+        self.planificateur_promotions.liberer(evenement.id, index)
+        return self.REFUSEE, inscription_obj
+
+    # --- Salle d'attente: inscriptions et validations admises au débit que le service peut absorber ---
+    INTERVALLE_ADMISSION = 50
+    # Résultats des opérations admises, retournés avec l'inscription concernée.
+    INSCRITE, VALIDEE, REFUSEE, LISTE_ATTENTE, DEJA_ANNULEE = "inscrite", "validee", "refusee", "liste_attente", "deja_annulee"
+
+    def _admettre(self, utilisateur_id, cible, titre_erreur, operation, terminer=None):
+        # `operation` retourne (statut, inscription). La mise à jour de la liste des inscriptions fait partie
+        # du coût mesuré; les boîtes de dialogue (attente de l'utilisateur) n'en font pas partie.
+        # `terminer(resultat, erreur)` remplace les boîtes de dialogue (rejeu du trafic): un refus de la salle
+        # d'attente lui est alors transmis comme erreur.
+        def operation_mesuree():
+            try:
+                return operation()
+            finally:
+                self._update_inscription_listbox()
+
+        def signaler(resultat, erreur):
+            if erreur is not None:
+                messagebox.showerror(titre_erreur, str(erreur))
+                return
+            statut, inscription = resultat
+            participant, evenement = inscription.participant.nom, inscription.evenement.nom
+            if statut == self.INSCRITE:
+                messagebox.showinfo("Succès", f"Inscription de {participant} à '{evenement}' ajoutée. Validation en attente.")
+            elif statut == self.VALIDEE:
+                messagebox.showinfo("Validation", f"Inscription de {participant} à '{evenement}' validée avec succès !")
+            elif statut == self.LISTE_ATTENTE:
+                messagebox.showinfo("Validation", f"'{evenement}' est complet: {participant} est placé(e) en liste d'attente "
+                                                  f"({self.planificateur_promotions.en_attente(inscription.evenement.id)} personne(s)). "
+                                                  "L'inscription sera validée automatiquement dès qu'une place se libère.")
+            elif statut == self.DEJA_ANNULEE:
+                messagebox.showerror("Validation", "Cette inscription a été annulée.")
+            else:
+                explication = ""
+                if hasattr(inscription.regle_validation, "expliquer"):
+                    explication = "\n\n" + "\n".join(inscription.regle_validation.expliquer(inscription))
+                messagebox.showwarning("Validation", f"Validation de l'inscription de {participant} à '{evenement}' a échoué "
+                                                     f"selon les règles spécifiques.{explication}")
 
-            if inscription_obj.valider_inscription():
-                messagebox.showinfo("Validation", f"Inscription de {inscription_obj.participant.nom} à '{inscription_obj.evenement.nom}' validée avec succès !")
+        try:
+            ticket = self.salle_attente.demander(utilisateur_id, operation_mesuree, terminer or signaler, cible)
+        except (FileSaturee, LimiteUtilisateur) as e:
+            if terminer:
+                terminer(None, e)
             else:
-                messagebox.showwarning("Validation", f"Validation de l'inscription de {inscription_obj.participant.nom} à '{inscription_obj.evenement.nom}' a échoué selon les règles spécifiques.")
-            
-            self._update_inscription_listbox()
+                messagebox.showwarning("Salle d'attente", str(e))
+            return
+        if terminer or ticket.statut == ADMIS:
+            return
+        position, attente = self.salle_attente.position(ticket)
+        messagebox.showinfo("Salle d'attente", f"Forte affluence: demande n°{ticket.numero} en file d'attente (position {position}, "
+                                               f"attente estimée {attente:.0f}s). Elle sera traitée automatiquement.")
+
+    def _admettre_periodiquement(self):
+        self.salle_attente.traiter()
+        self.after(self.INTERVALLE_ADMISSION, self._admettre_periodiquement)
+
+    def _cancel_selected_inscription(self):
+        if not self._donnees_pretes():
+            return
+        try:
+            selected_item_id = self.inscription_tree.selection()
+            if not selected_item_id:
+                messagebox.showerror("Annulation", "Veuillez sélectionner une inscription à annuler.")
+                return
+            if self._annuler_inscription(int(selected_item_id[0])):
+                self._update_inscription_listbox()
         except Exception as e:
-            messagebox.showerror("Erreur Validation", str(e))
+            messagebox.showerror("Erreur Annulation", str(e))
+
+    def _annuler_inscription(self, index):
+        """Annule l'inscription d'index `index`; retourne False si elle l'était déjà."""
+        inscription_obj = self.inscriptions[index]
+        if inscription_obj.est_annulee:
+            return False
+        inscription_obj.annuler(lambda: self._journaliser("annuler_inscription", {"index": index}))
+        self.auth_service.desinscrire_participant_auth(inscription_obj.participant.id, inscription_obj.evenement.id)
+        self.verificateur_conflits.retirer_inscription(inscription_obj.participant.id, inscription_obj.evenement,
+                                                       inscription_obj.date_occurrence)
+        # La place libérée sera attribuée au premier de la liste d'attente au prochain passage.
+        self.planificateur_promotions.liberer(inscription_obj.evenement.id, index)
+        return True
 
 
-    def _create_view_events_tab(self):
-        frame = ttk.Frame(self.notebook, padding="15 15 15 15")
-        self.notebook.add(frame, text="Voir Événements")
+    def _create_view_events_tab(self, frame):
 
         ttk.Label(frame, text="Sélectionner un Événement:").grid(row=0, column=0, sticky="w", pady=5, padx=5)
         self.event_view_id_var = tk.StringVar(self)
@@ -600,6 +2090,12 @@ class EventApp(tk.Tk):
         self.event_display_output = scrolledtext.ScrolledText(frame, width=60, height=15, state='disabled', wrap=tk.WORD, font=('Consolas', 10))
         self.event_display_output.grid(row=4, column=0, columnspan=2, sticky="nsew", pady=5, padx=5)
 
+        rapports_frame = ttk.Frame(frame)
+        rapports_frame.grid(row=5, column=0, columnspan=2, pady=10, padx=5)
+        ttk.Button(rapports_frame, text="Audit des Conflits d'Horaire", command=self._auditer_conflits).pack(side=tk.LEFT, padx=5)
+        ttk.Button(rapports_frame, text="Statistiques", command=self._afficher_statistiques).pack(side=tk.LEFT, padx=5)
+        ttk.Button(rapports_frame, text="Exporter (CSV)...", command=self._exporter_statistiques).pack(side=tk.LEFT, padx=5)
+
         frame.columnconfigure(1, weight=1)
         frame.rowconfigure(4, weight=1)
 
@@ -626,20 +2122,75 @@ class EventApp(tk.Tk):
         if display_type == "Détaillé":
             affichage_strategy = AffichageDetailleEvenement(evenement, implementateur)
 
-        rendered_output = affichage_strategy.afficher()
+        rendered_output = affichage_strategy.afficher_en_cache()
+        if self.service_pointage:
+            nb_valides = sum(1 for i in self.inscriptions if i.evenement is evenement and i.est_validee)
+            rendered_output += f"\nPrésents: {self.service_pointage.registre.compteurs().get(evenement.id, 0)} / {nb_valides} inscrit(s) validé(s)"
         self.event_display_output.insert(tk.END, rendered_output)
         self.event_display_output.config(state='disabled')
 
-    def _create_proxy_notification_tab(self):
-        frame = ttk.Frame(self.notebook, padding="15 15 15 15")
-        self.notebook.add(frame, text="Proxy & Notifications")
+    def _formater_occupation(self, cle):
+        evenement_id, jour = cle
+        evenement = self.evenements.get(evenement_id)
+        nom = evenement.nom if evenement else evenement_id
+        return f"{nom} ({evenement_id}) le {jour.isoformat()}"
+
+    def _auditer_conflits(self):
+        # Les événements et inscriptions annulés n'occupent plus de créneau.
+        conflits = audit_conflits([e for e in self.evenements.values() if not e.est_annule],
+                                  [i for i in self.inscriptions if not i.est_annulee and not i.evenement.est_annule])
+        self.event_display_output.config(state='normal')
+        self.event_display_output.delete(1.0, tk.END)
+        if not conflits:
+            self.event_display_output.insert(tk.END, "Aucun conflit d'horaire détecté.")
+        else:
+            noms_participants = {p.id: p.nom for p in self.participants.values()}
+            lignes = [f"{len(conflits)} conflit(s) d'horaire détecté(s):"]
+            for genre, valeur, premier, second in conflits:
+                if genre == "participant":
+                    genre, valeur = "participant", noms_participants.get(valeur, valeur)
+                lignes.append(f"- {genre} '{valeur}': {self._formater_occupation(premier)} / {self._formater_occupation(second)}")
+            self.event_display_output.insert(tk.END, "\n".join(lignes))
+        self.event_display_output.config(state='disabled')
+
+    def _afficher_statistiques(self):
+        seq, lignes = self.statistiques.rapport_evenements()
+        presents = self.service_pointage.registre.compteurs() if self.service_pointage else None
+        texte = [f"Statistiques des inscriptions (état après {seq} mutation(s))", ""]
+        for ligne in lignes:
+            remplissage = f"{ligne['taux_remplissage']:.0%}" if ligne["taux_remplissage"] is not None else "-"
+            etudiants = f"{ligne['part_etudiants']:.0%}" if ligne["part_etudiants"] is not None else "-"
+            texte.append(f"{ligne['evenement_id']} - {ligne['nom']}: {ligne['inscriptions']} inscription(s), "
+                         f"{ligne['validees']} validée(s), {ligne['liste_attente']} en liste d'attente, "
+                         f"{ligne['annulees']} annulée(s); remplissage {remplissage}, étudiants {etudiants}")
+        texte += ["", "Entonnoir: " + " -> ".join(f"{etape} {nombre}" for etape, nombre in self.statistiques.entonnoir(presents)),
+                  "Inscriptions par jour: " + ", ".join(f"{jour}: {nombre}" for jour, nombre in self.statistiques.inscriptions_par_jour())]
+        self.event_display_output.config(state='normal')
+        self.event_display_output.delete(1.0, tk.END)
+        self.event_display_output.insert(tk.END, "\n".join(texte))
+        self.event_display_output.config(state='disabled')
+
+    def _exporter_statistiques(self):
+        chemin = filedialog.asksaveasfilename(title="Exporter les statistiques", defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if not chemin:
+            return
+        try:
+            _, lignes = self.statistiques.rapport_evenements()
+            exporter_csv(chemin, lignes, COLONNES_EVENEMENTS)
+            messagebox.showinfo("Export", f"{len(lignes)} ligne(s) exportée(s) vers {chemin}.")
+        except OSError as e:
+            messagebox.showerror("Erreur Export", str(e))
+
+    def _create_proxy_notification_tab(self, frame):
 
         ttk.Label(frame, text="--- Gérer l'Utilisateur Actuel (pour Proxy) ---", font=('Segoe UI', 11, 'bold')).grid(row=0, column=0, columnspan=2, sticky="ew", pady=10)
         ttk.Label(frame, text="Utilisateur:").grid(row=1, column=0, sticky="w", pady=2, padx=5)
         self.current_user_var = tk.StringVar(self)
-        self.current_user_menu = ttk.Combobox(frame, textvariable=self.current_user_var, state="readonly")
+        self.current_user_menu = ttk.Combobox(frame, textvariable=self.current_user_var)
         self.current_user_menu.grid(row=1, column=1, sticky="ew", pady=2, padx=5)
         self.current_user_menu.bind("<<ComboboxSelected>>", self._set_current_user)
+        self.current_user_menu.bind("<KeyRelease>", self._filtrer_participants)
+        self.current_user_menu.bind("<Return>", self._set_current_user)
 
         ttk.Button(frame, text="Se Connecter", command=self._login_current_user).grid(row=2, column=0, sticky="ew", pady=5, padx=5)
         ttk.Button(frame, text="Se Déconnecter", command=self._logout_current_user).grid(row=2, column=1, sticky="ew", pady=5, padx=5)
@@ -651,7 +2202,9 @@ class EventApp(tk.Tk):
         self.event_proxy_id_var = tk.StringVar(self)
         self.event_menu_proxy = ttk.Combobox(frame, textvariable=self.event_proxy_id_var, state="readonly")
         self.event_menu_proxy.grid(row=5, column=1, sticky="ew", pady=2, padx=5)
-        ttk.Button(frame, text="Voir Détails (via Proxy)", command=self._get_event_details_via_proxy, style='Accent.TButton').grid(row=6, column=0, columnspan=2, pady=15, padx=5)
+        ttk.Button(frame, text="Voir Détails (via Proxy)", command=self._get_event_details_via_proxy, style='Accent.TButton').grid(row=6, column=0, pady=15, padx=5)
+        ttk.Button(frame, text="Lister les Événements (page suivante)", command=self._lister_evenements_via_proxy).grid(row=6, column=1, pady=15, padx=5)
+        self._curseur_liste = None
         self.proxy_output = scrolledtext.ScrolledText(frame, width=60, height=8, state='disabled', wrap=tk.WORD, font=('Consolas', 10))
         self.proxy_output.grid(row=7, column=0, columnspan=2, sticky="nsew", pady=5, padx=5)
 
@@ -660,6 +2213,7 @@ class EventApp(tk.Tk):
         self.event_update_id_var = tk.StringVar(self)
         self.event_menu_update = ttk.Combobox(frame, textvariable=self.event_update_id_var, state="readonly")
         self.event_menu_update.grid(row=9, column=1, sticky="ew", pady=2, padx=5)
+        self.event_menu_update.bind("<<ComboboxSelected>>", self._charger_version_edition)
 
         ttk.Label(frame, text="Nouvelle Description:").grid(row=10, column=0, sticky="w", pady=2, padx=5)
         self.new_description_entry = ttk.Entry(frame)
@@ -667,12 +2221,32 @@ class EventApp(tk.Tk):
 
         ttk.Button(frame, text="Mettre à Jour et Notifier", command=self._update_and_notify_event, style='Accent.TButton').grid(row=11, column=0, columnspan=2, pady=15, padx=5)
 
+        ttk.Label(frame, text="Nombre de places:").grid(row=12, column=0, sticky="w", pady=2, padx=5)
+        self.new_places_entry = ttk.Entry(frame)
+        self.new_places_entry.grid(row=12, column=1, sticky="ew", pady=2, padx=5)
+        ttk.Button(frame, text="Modifier les Places", command=self._update_event_places).grid(row=13, column=0, columnspan=2, pady=5, padx=5)
+
+        ttk.Label(frame, text="Nouvelle date (AAAA-MM-JJ):").grid(row=14, column=0, sticky="w", pady=2, padx=5)
+        self.new_date_entry = ttk.Entry(frame)
+        self.new_date_entry.grid(row=14, column=1, sticky="ew", pady=2, padx=5)
+        ttk.Button(frame, text="Modifier la Date", command=self._update_event_date).grid(row=15, column=0, columnspan=2, pady=5, padx=5)
+        ttk.Button(frame, text="Annuler l'Événement", command=self._cancel_event).grid(row=16, column=0, columnspan=2, pady=5, padx=5)
+
+        ttk.Label(frame, text="--- Boîte de Réception de l'Utilisateur ---", font=('Segoe UI', 11, 'bold')).grid(row=17, column=0, columnspan=2, sticky="ew", pady=10)
+        ttk.Button(frame, text="Messages (page suivante)", command=self._afficher_boite_reception).grid(row=18, column=0, sticky="ew", pady=5, padx=5)
+        ttk.Button(frame, text="Tout Marquer comme Lu", command=self._marquer_boite_lue).grid(row=18, column=1, sticky="ew", pady=5, padx=5)
+        self.boite_status_label = ttk.Label(frame, text="", font=('Segoe UI', 9, 'italic'))
+        self.boite_status_label.grid(row=19, column=0, columnspan=2, sticky="w", pady=5, padx=5)
+        self._curseur_boite = None
+
         frame.columnconfigure(1, weight=1)
         frame.rowconfigure(7, weight=1)
 
     def _set_current_user(self, event=None):
-        selected_user_id = self.current_user_var.get().split(" - ")[0]
-        self.current_user = self.participants.get(selected_user_id)
+        self.current_user = self._participant_saisi(self.current_user_var.get())
+        self._curseur_liste = None
+        self._curseur_boite = None
+        self._actualiser_non_lus()
         if self.current_user:
             self.login_status_label.config(text=f"Statut: Utilisateur sélectionné: {self.current_user.nom}")
         else:
@@ -680,7 +2254,12 @@ class EventApp(tk.Tk):
 
     def _login_current_user(self):
         if self.current_user:
-            self.auth_service.connecter_utilisateur(self.current_user.id)
+            try:
+                self.auth_service.connecter_utilisateur(self.current_user.id)
+            except PermissionError as e:
+                messagebox.showerror("Connexion", str(e))
+                return
+            self._noter_trafic("connecter_utilisateur", {"id": self.current_user.id})
             self.login_status_label.config(text=f"Statut: Connecté en tant que {self.current_user.nom}")
             messagebox.showinfo("Connexion", f"{self.current_user.nom} est maintenant connecté.")
         else:
@@ -689,6 +2268,7 @@ class EventApp(tk.Tk):
     def _logout_current_user(self):
         if self.current_user and self.auth_service.est_connecte(self.current_user.id):
             self.auth_service.utilisateurs_connectes.remove(self.current_user.id)
+            self._noter_trafic("deconnecter_utilisateur", {"id": self.current_user.id})
             self.login_status_label.config(text=f"Statut: Déconnecté.")
             messagebox.showinfo("Déconnexion", f"{self.current_user.nom} est déconnecté.")
             self.current_user = None # Clear current user
@@ -703,10 +2283,76 @@ class EventApp(tk.Tk):
         selected_event_id = self.event_proxy_id_var.get().split(" - ")[0]
         
         details = self.evenement_service_proxy.get_details_evenement(selected_event_id, self.current_user)
+        self._noter_trafic("lire_details", {"id": selected_event_id, "utilisateur": self.current_user.id if self.current_user else None})
         self.proxy_output.insert(tk.END, details)
         self.proxy_output.config(state='disabled')
 
+    # Événements par page de la liste filtrée par le proxy.
+    NB_EVENEMENTS_PAR_PAGE = 20
+
+    def _lister_evenements_via_proxy(self):
+        # Chaque clic affiche la page suivante; après la dernière, la liste repart du début.
+        page, self._curseur_liste = self.evenement_service_proxy.lister_evenements(self.current_user, curseur=self._curseur_liste,
+                                                                                   limite=self.NB_EVENEMENTS_PAR_PAGE)
+        self._noter_trafic("lister_evenements", {"utilisateur": self.current_user.id if self.current_user else None,
+                                                 "limite": self.NB_EVENEMENTS_PAR_PAGE})
+        lignes = [f"{e['date']}  {e['id']} - {e.get('nom', '(confidentiel)')}" + (f"  [{e['motif']}]" if e["masque"] else "")
+                  for e in page]
+        if self._curseur_liste is None:
+            lignes.append("--- Fin de la liste ---")
+        self.proxy_output.config(state='normal')
+        self.proxy_output.delete(1.0, tk.END)
+        self.proxy_output.insert(tk.END, "\n".join(lignes) or "Aucun événement.")
+        self.proxy_output.config(state='disabled')
+
+    # Entrées par page de la boîte de réception.
+    NB_MESSAGES_PAR_PAGE = 20
+
+    def _boite_accessible(self):
+        # La boîte est privée: seul l'utilisateur connecté lit (ou marque) la sienne.
+        if not self.boites_reception:
+            messagebox.showinfo("Boîte de réception", "Les boîtes de réception sont gérées par l'instance principale.")
+            return False
+        if not self.current_user or not self.auth_service.est_connecte(self.current_user.id):
+            messagebox.showwarning("Boîte de réception", "Veuillez vous connecter pour consulter votre boîte de réception.")
+            return False
+        return True
+
+    def _afficher_boite_reception(self):
+        # Comme la liste du proxy: chaque clic affiche la page suivante, des plus récents aux plus anciens.
+        if not self._boite_accessible():
+            return
+        page, self._curseur_boite = self.boites_reception.page(self.current_user.id, curseur=self._curseur_boite,
+                                                               taille=self.NB_MESSAGES_PAR_PAGE)
+        lignes = [f"{'•' if not e['lu'] else ' '} {time.strftime('%Y-%m-%d %H:%M', time.localtime(e['horodatage']))}  "
+                  f"[{e['evenement_id']}] {e['texte']}" for e in page]
+        if self._curseur_boite is None:
+            lignes.append("--- Fin de la boîte de réception ---")
+        self.proxy_output.config(state='normal')
+        self.proxy_output.delete(1.0, tk.END)
+        self.proxy_output.insert(tk.END, "\n".join(lignes))
+        self.proxy_output.config(state='disabled')
+        self._actualiser_non_lus()
+
+    def _marquer_boite_lue(self):
+        if not self._boite_accessible():
+            return
+        self.boites_reception.marquer_lus((self.current_user.id,))
+        self._curseur_boite = None
+        self._actualiser_non_lus()
+
+    def _actualiser_non_lus(self):
+        if not self.boites_reception or not self._onglet_construit("proxy"):
+            return
+        if self.current_user:
+            self.boite_status_label.config(text=f"{self.boites_reception.non_lus(self.current_user.id)} message(s) non lu(s) "
+                                                f"sur {self.boites_reception.taille(self.current_user.id)}")
+        else:
+            self.boite_status_label.config(text="")
+
     def _update_and_notify_event(self):
+        if not self._donnees_pretes():
+            return
         try:
             selected_event_id = self.event_update_id_var.get().split(" - ")[0]
             new_desc = self.new_description_entry.get()
@@ -717,60 +2363,139 @@ class EventApp(tk.Tk):
             if not new_desc:
                 raise ValueError("La nouvelle description ne peut pas être vide.")
 
-            evenement.mettre_a_jour_description(new_desc)
+            self._version_edition = self.evenement_service.mettre_a_jour_description(evenement.id, new_desc,
+                                                                                     self._version_edition)
             messagebox.showinfo("Mise à Jour", f"L'événement '{evenement.nom}' a été mis à jour et les observateurs notifiés.")
             self.new_description_entry.delete(0, tk.END)
             self._update_event_lists()
+        except ConflitVersion as e:
+            self._signaler_conflit_version(e)
+        except Exception as e:
+            messagebox.showerror("Erreur Mise à Jour", str(e))
+
+    def _update_event_places(self):
+        if not self._donnees_pretes():
+            return
+        try:
+            evenement = self.evenements.get(self.event_update_id_var.get().split(" - ")[0])
+            if not evenement or not hasattr(evenement, "nombre_places"):
+                raise ValueError("Veuillez sélectionner un événement avec un nombre de places.")
+            nombre_places = int(self.new_places_entry.get())
+            if nombre_places < 0:
+                raise ValueError("Le nombre de places ne peut pas être négatif.")
+            self._version_edition = self._modifier_places(evenement, nombre_places, self._version_edition)
+            messagebox.showinfo("Mise à Jour", f"'{evenement.nom}' dispose maintenant de {nombre_places} places.")
+            self.new_places_entry.delete(0, tk.END)
+        except ConflitVersion as e:
+            self._signaler_conflit_version(e)
+        except Exception as e:
+            messagebox.showerror("Erreur Mise à Jour", str(e))
+
+    def _update_event_date(self):
+        if not self._donnees_pretes():
+            return
+        try:
+            evenement = self.evenements.get(self.event_update_id_var.get().split(" - ")[0])
+            if not evenement:
+                raise ValueError("Veuillez sélectionner un événement.")
+            nouvelle_date = date.fromisoformat(self.new_date_entry.get().strip())
+            self._version_edition = self._modifier_date(evenement, nouvelle_date, self._version_edition)
+            messagebox.showinfo("Mise à Jour", f"'{evenement.nom}' est déplacé au {nouvelle_date.isoformat()}; "
+                                               "les rappels des inscrits sont reprogrammés.")
+            self.new_date_entry.delete(0, tk.END)
+        except ConflitVersion as e:
+            self._signaler_conflit_version(e)
         except Exception as e:
             messagebox.showerror("Erreur Mise à Jour", str(e))
 
-    def _update_event_lists(self):
+    def _cancel_event(self):
+        if not self._donnees_pretes():
+            return
+        try:
+            evenement = self.evenements.get(self.event_update_id_var.get().split(" - ")[0])
+            if not evenement:
+                raise ValueError("Veuillez sélectionner un événement.")
+            nb_inscrits = sum(not i.est_annulee for i in self.inscriptions_par_evenement.get(evenement.id, ()))
+            if not messagebox.askyesno("Annulation", f"Annuler '{evenement.nom}' et ses {nb_inscrits} inscription(s) ?"):
+                return
+            self._version_edition = self._annuler_evenement(evenement, self._version_edition)
+            self._update_inscription_listbox()
+            messagebox.showinfo("Annulation", f"'{evenement.nom}' est annulé; les {nb_inscrits} inscrit(s) sont prévenus par lots.")
+            self._update_event_lists()
+        except ConflitVersion as e:
+            self._signaler_conflit_version(e)
+        except Exception as e:
+            messagebox.showerror("Erreur Annulation", str(e))
+
+    def _charger_version_edition(self, event=None):
+        evenement = self.evenements.get(self.event_update_id_var.get().split(" - ")[0])
+        self._version_edition = evenement.version if evenement else None
+
+    def _signaler_conflit_version(self, conflit):
+        # La saisie est conservée: l'organisateur peut la réappliquer sur la version actuelle.
+        self._version_edition = conflit.version_actuelle
+        messagebox.showwarning("Conflit de modification", f"{conflit}\n\nDescription actuelle: {conflit.evenement.description}\n\n"
+                                                          "Vérifiez les changements puis validez à nouveau pour les remplacer.")
+
+    def _update_event_lists(self, conserver_selection=False):
         event_options = [f"{e.id} - {e.nom}" for e in self.evenements.values()]
-        
-        self.event_menu_inscription['values'] = event_options
-        self.event_menu_view['values'] = event_options
-        self.event_menu_proxy['values'] = event_options
-        self.event_menu_update['values'] = event_options
-
-        # Set default selections if events exist
-        if event_options:
-            self.event_id_var.set(event_options[0])
-            self.event_view_id_var.set(event_options[0])
-            self.event_proxy_id_var.set(event_options[0])
-            self.event_update_id_var.set(event_options[0])
-        else:
-            self.event_id_var.set("")
-            self.event_view_id_var.set("")
-            self.event_proxy_id_var.set("")
-            self.event_update_id_var.set("")
+        # Select the first event by default (empty if there is none)
+        selection = event_options[0] if event_options else ""
+
+        # Only the tabs already built are filled; the others fill themselves when first shown.
+        menus = []
+        if self._onglet_construit("inscriptions"):
+            menus.append((self.event_menu_inscription, self.event_id_var))
+        if self._onglet_construit("evenements"):
+            menus.append((self.event_menu_view, self.event_view_id_var))
+        if self._onglet_construit("proxy"):
+            menus += [(self.event_menu_proxy, self.event_proxy_id_var), (self.event_menu_update, self.event_update_id_var)]
+        for menu, variable in menus:
+            menu['values'] = event_options
+            # Événements reçus d'une autre instance: la sélection en cours est conservée.
+            if not (conserver_selection and variable.get()):
+                variable.set(selection)
+        if self._onglet_construit("inscriptions"):
+            self._update_occurrence_list()
+            self._update_inscription_listbox()
+        if self._onglet_construit("proxy") and not (conserver_selection and self._version_edition is not None):
+            self._charger_version_edition()
 
-        self._update_inscription_listbox()
         self.after(100, self._update_participant_list)
 
 # --- Point d'entrée de l'application ---
 if __name__ == "__main__":
-    _factory_demo = EvenementFactory()
-    evenements_db = {
-        "EV001": _factory_demo.creer_evenement("Conference", "Conférence Secrète sur la Quantum", "Conférence très confidentielle sur les dernières découvertes de la physique quantique.", date(2025, 8, 20),
-                                               nombre_places=50, speaker_principal="Dr. Elara Vance"),
-        "EV002": _factory_demo.creer_evenement("Hackathon", "Hackathon Blockchain", "Défi de développement d'applications décentralisées (DApps) sur la blockchain Ethereum.", date(2025, 9, 10),
-                                              sponsor="CryptoCorp Solutions", duree_heures=36),
-        "EV003": _factory_demo.creer_evenement("Seminaire", "Séminaire d'Introduction à Python", "Les bases de la programmation en Python, idéal pour les débutants.", date(2025, 10, 5),
-                                              domaine="Programmation"),
-        "EV004": _factory_demo.creer_evenement("Conference", "Conférence Ouverte sur l'IA", "Introduction à l'intelligence artificielle et ses applications dans le monde réel.", date(2025, 11, 1),
-                                              nombre_places=500, speaker_principal="Mme. Ada Lovelace")
-    }
-    
+    # Les plugins font `from appEven import ...`: ils doivent voir ce module-ci, pas une seconde copie.
+    sys.modules.setdefault("appEven", sys.modules[__name__])
+    charger_plugins()
     app = EventApp()
-    app.evenements.update(evenements_db)
-    app._update_event_lists()
-
-    p1 = Participant("Alice Dupont", "alice@univ.com", True)
-    p2 = Participant("Bob Le Prof", "bob@univ.com", False)
-    p3 = Participant("Charlie Etudiant", "charlie@univ.com", True)
-    app.participants[p1.id] = p1
-    app.participants[p2.id] = p2
-    app.participants[p3.id] = p3
-    app._update_participant_list()
-
-    app.mainloop()
\ No newline at end of file
+
+    # Les données de démonstration ne sont créées qu'au premier lancement: ensuite, elles sont restaurées depuis le journal.
+    # Le journal est relu en arrière-plan: la vérification attend la fin du chargement.
+    def creer_donnees_demo():
+        if not app.evenements:
+            _factory_demo = EvenementFactory()
+            evenements_db = {
+                "EV001": _factory_demo.creer_evenement("Conference", "Conférence Secrète sur la Quantum", "Conférence très confidentielle sur les dernières découvertes de la physique quantique.", date(2025, 8, 20),
+                                                       nombre_places=50, speaker_principal="Dr. Elara Vance"),
+                "EV002": _factory_demo.creer_evenement("Hackathon", "Hackathon Blockchain", "Défi de développement d'applications décentralisées (DApps) sur la blockchain Ethereum.", date(2025, 9, 10),
+                                                      sponsor="CryptoCorp Solutions", duree_heures=36),
+                "EV003": _factory_demo.creer_evenement("Seminaire", "Séminaire d'Introduction à Python", "Les bases de la programmation en Python, idéal pour les débutants.", date(2025, 10, 5),
+                                                      domaine="Programmation"),
+                "EV004": _factory_demo.creer_evenement("Conference", "Conférence Ouverte sur l'IA", "Introduction à l'intelligence artificielle et ses applications dans le monde réel.", date(2025, 11, 1),
+                                                      nombre_places=500, speaker_principal="Mme. Ada Lovelace")
+            }
+            for evenement in evenements_db.values():
+                app._ajouter_evenement(evenement)
+            app._update_event_lists()
+
+            p1 = Participant("Alice Dupont", "alice@univ.com", True)
+            p2 = Participant("Bob Le Prof", "bob@univ.com", False)
+            p3 = Participant("Charlie Etudiant", "charlie@univ.com", True)
+            app._ajouter_participant(p1)
+            app._ajouter_participant(p2)
+            app._ajouter_participant(p3)
+            app._update_participant_list()
+
+    app.apres_chargement(creer_donnees_demo)
+    app.mainloop()
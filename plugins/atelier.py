@@ -0,0 +1,18 @@
+# --- Plugin: type d'événement "Atelier" ---
+# Chargé au démarrage par charger_plugins(): aucune modification de la fabrique ni de l'interface.
+from appEven import ChampEvenement, Evenement, EvenementFactory
+
+
+class Atelier(Evenement):
+    def __init__(self, id, nom, description, date, animateur, nombre_postes):
+        super().__init__(id, nom, description, date)
+        self.animateur = animateur
+        self.nombre_postes = nombre_postes
+
+    def get_details(self):
+        return f"{self.afficher_info_base()}\n  Type: Atelier\n  Animateur: {self.animateur}\n  Postes: {self.nombre_postes}\n  Description: {self.description}"
+
+
+EvenementFactory.enregistrer_type("Atelier", Atelier, [
+    ChampEvenement("animateur", "Animateur"),
+    ChampEvenement("nombre_postes", "Nombre de postes", int)])